@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+batch_run.py - 여러 실행(execution) export를 한 번에 화면 그룹핑 (야간 배치용)
+
+- 입력: 디렉터리(내부 *.json) / glob 패턴 / JSON 파일 경로 (여러 개 지정 가능)
+- 실행(execution)마다 별도 프로세스에서 UIScreenshotAnalyzer 실행
+  * 동시 실행 수 제한 (--workers)
+  * 실행별 타임아웃 (--timeout, 초과 시 프로세스 강제 종료)
+  * 한 실행이 예외/크래시로 죽어도 나머지 실행에는 영향 없음
+- 출력 (--out 디렉터리):
+  * <이름>.json      실행별 결과 (UIScreenshotAnalyzer.to_dict + status)
+  * logs/<이름>.log  실행별 엔진 진행 로그
+  * batch_report.json 전체 집계 (상태/단계별 시간/총 소요 시간)
+
+사용 예:
+    python batch_run.py data/actions --out batch_results --workers 4 --timeout 300
+    python batch_run.py "exports/**/*.json" --out batch_results
+"""
+
+import sys
+import os
+import glob
+import json
+import time
+import argparse
+import contextlib
+import multiprocessing
+import traceback
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+
+# =========================
+# 입력 수집
+# =========================
+
+def collect_inputs(patterns: List[str]) -> List[str]:
+    """디렉터리/glob/파일 경로 -> 중복 없는 JSON 파일 경로 목록 (입력 순서 유지)"""
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "*.json")))
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def output_names(paths: List[str]) -> Dict[str, str]:
+    """입력 경로 -> 결과 파일 이름 (파일명이 겹치면 번호를 붙임)"""
+    names: Dict[str, str] = {}
+    used: Dict[str, int] = {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        count = used.get(stem, 0)
+        used[stem] = count + 1
+        names[path] = stem if count == 0 else f"{stem}_{count}"
+    return names
+
+
+def write_json(path: str, data: Any) -> None:
+    """임시 파일에 쓴 뒤 교체 (중간에 죽어도 깨진 결과 파일이 남지 않도록)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# =========================
+# 워커 (실행 하나 = 프로세스 하나)
+# =========================
+
+def run_execution(json_path: str, result_path: str, log_path: str, params: Dict[str, Any]) -> None:
+    """자식 프로세스 진입점: 분석 실행 후 결과 JSON 기록"""
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            from pages.test2 import UIScreenshotAnalyzer
+
+            analyzer = UIScreenshotAnalyzer(json_path=json_path, **params)
+            analyzer.run()
+            result = analyzer.to_dict()
+            result["status"] = "ok"
+        except Exception as e:
+            traceback.print_exc()
+            result = {
+                "json_path": json_path,
+                "status": "error",
+                "error": f"{type(e).__name__}: {e}",
+            }
+        result["elapsed"] = time.perf_counter() - start
+        write_json(result_path, result)
+
+
+# =========================
+# 스케줄러
+# =========================
+
+class BatchRunner:
+    """
+    실행별 프로세스 스케줄러
+    ProcessPoolExecutor는 실행 중인 작업을 중단할 수 없어서,
+    타임아웃 시 강제 종료할 수 있도록 실행마다 Process를 직접 띄운다.
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        out_dir: str,
+        workers: int = 4,
+        timeout: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None,
+        poll_interval: float = 0.2,
+    ) -> None:
+        self.paths = paths
+        self.out_dir = out_dir
+        self.log_dir = os.path.join(out_dir, "logs")
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.params = params or {}
+        self.poll_interval = poll_interval
+        self.names = output_names(paths)
+        # Windows와 동일하게 동작하도록 spawn 사용
+        self.ctx = multiprocessing.get_context("spawn")
+
+    def _start(self, path: str) -> Dict[str, Any]:
+        name = self.names[path]
+        job = {
+            "json_path": path,
+            "result_path": os.path.join(self.out_dir, f"{name}.json"),
+            "log_path": os.path.join(self.log_dir, f"{name}.log"),
+        }
+        # 이전 실행 결과가 남아 있으면 크래시를 성공으로 오인하므로 삭제
+        if os.path.exists(job["result_path"]):
+            os.remove(job["result_path"])
+        process = self.ctx.Process(
+            target=run_execution,
+            args=(path, job["result_path"], job["log_path"], self.params),
+            daemon=True,
+        )
+        process.start()
+        job["process"] = process
+        job["start"] = time.perf_counter()
+        return job
+
+    def _finish(self, job: Dict[str, Any], status: Optional[str] = None) -> Dict[str, Any]:
+        """작업 종료 처리 -> 집계용 요약 dict"""
+        elapsed = time.perf_counter() - job["start"]
+        entry: Dict[str, Any] = {
+            "json_path": job["json_path"],
+            "result_path": job["result_path"],
+            "log_path": job["log_path"],
+            "elapsed": elapsed,
+        }
+
+        if status == "timeout":
+            entry["status"] = "timeout"
+            entry["error"] = f"{self.timeout}초 초과로 강제 종료"
+            write_json(job["result_path"], {"json_path": job["json_path"], **entry})
+            return entry
+
+        if not os.path.exists(job["result_path"]):
+            # 결과를 쓰기 전에 프로세스가 죽음 (메모리 부족, 세그폴트 등)
+            entry["status"] = "crashed"
+            entry["error"] = f"exit code {job['process'].exitcode}"
+            write_json(job["result_path"], {"json_path": job["json_path"], **entry})
+            return entry
+
+        with open(job["result_path"], "r", encoding="utf-8") as f:
+            result = json.load(f)
+        entry["status"] = result.get("status", "error")
+        if "error" in result:
+            entry["error"] = result["error"]
+        stats = result.get("stats", {})
+        entry["actions"] = stats.get("actions")
+        entry["clusters"] = stats.get("clusters")
+        entry["timings"] = stats.get("timings", {})
+        return entry
+
+    def run(self, on_done=None) -> Dict[str, Any]:
+        """모든 실행을 처리하고 집계 리포트 반환 (on_done(entry, done, total) 진행 콜백)"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        pending = list(self.paths)
+        running: List[Dict[str, Any]] = []
+        entries: Dict[str, Dict[str, Any]] = {}
+        batch_start = time.perf_counter()
+
+        while pending or running:
+            while pending and len(running) < self.workers:
+                running.append(self._start(pending.pop(0)))
+
+            time.sleep(self.poll_interval)
+
+            still_running = []
+            for job in running:
+                process = job["process"]
+                if process.is_alive():
+                    if self.timeout and time.perf_counter() - job["start"] > self.timeout:
+                        process.terminate()
+                        process.join(5)
+                        if process.is_alive():
+                            process.kill()
+                            process.join()
+                        entry = self._finish(job, status="timeout")
+                    else:
+                        still_running.append(job)
+                        continue
+                else:
+                    process.join()
+                    entry = self._finish(job)
+
+                entries[job["json_path"]] = entry
+                if on_done:
+                    on_done(entry, len(entries), len(self.paths))
+            running = still_running
+
+        wall_time = time.perf_counter() - batch_start
+        return self.build_report([entries[p] for p in self.paths], wall_time)
+
+    def build_report(self, entries: List[Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+        """집계 리포트: 상태별 개수 / 총 소요 시간 / 단계별 시간 합계"""
+        status_counts: Dict[str, int] = {}
+        stage_totals: Dict[str, float] = {}
+        for entry in entries:
+            status_counts[entry["status"]] = status_counts.get(entry["status"], 0) + 1
+            for stage, seconds in (entry.get("timings") or {}).items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+        elapsed = [e["elapsed"] for e in entries]
+        return {
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "params": self.params,
+            "executions": len(entries),
+            "status_counts": status_counts,
+            "wall_time": wall_time,
+            "sum_elapsed": sum(elapsed),
+            "max_elapsed": max(elapsed) if elapsed else 0.0,
+            "stage_totals": stage_totals,
+            "results": entries,
+        }
+
+
+# =========================
+# main
+# =========================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="메뉴얼 에이전트 - 여러 실행 일괄 화면 그룹핑")
+    parser.add_argument("inputs", nargs="+", help="actions JSON 디렉터리 / glob 패턴 / 파일 경로")
+    parser.add_argument("--out", default="batch_results", help="결과 디렉터리 (기본=batch_results)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="동시 실행 프로세스 수 (기본=CPU 수)")
+    parser.add_argument("--timeout", type=float, default=600, help="실행별 타임아웃 초 (0=무제한, 기본=600)")
+    parser.add_argument("--phash-threshold", type=int, default=18, help="pHash 거리 임계값 (기본=18)")
+    parser.add_argument("--ssim-threshold", type=float, default=0.95, help="SSIM 임계값 (기본=0.95)")
+    parser.add_argument("--no-filter-clicks", action="store_true", help="클릭이 없는 클러스터도 포함")
+    parser.add_argument("--segmentation", choices=["greedy", "pelt"], default="greedy", help="화면 경계 결정 방식 (기본=greedy)")
+    parser.add_argument("--penalty", type=float, default=9.0, help="PELT 경계당 페널티 (기본=9.0)")
+    parser.add_argument("--no-dom-fingerprint", action="store_true", help="DOM 골격 지문 사전 판별 끄기")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print(f"❌ 오류: 입력에 해당하는 JSON 파일이 없습니다: {args.inputs}")
+        sys.exit(1)
+
+    params = {
+        "phash_threshold": args.phash_threshold,
+        "ssim_threshold": args.ssim_threshold,
+        "filter_no_clicks": not args.no_filter_clicks,
+        "segmentation": args.segmentation,
+        "penalty": args.penalty,
+        "use_dom_fingerprint": not args.no_dom_fingerprint,
+    }
+
+    print("=" * 100)
+    print(f"🗂️ 일괄 화면 그룹핑: 실행 {len(paths)}개, 프로세스 {args.workers}개, 타임아웃 {args.timeout or '없음'}초")
+    print(f"  ▸ 결과 디렉터리: {args.out}")
+    print("=" * 100)
+
+    icons = {"ok": "✅", "error": "❌", "timeout": "⏱️", "crashed": "💥"}
+
+    def on_done(entry: Dict[str, Any], done: int, total: int) -> None:
+        icon = icons.get(entry["status"], "❓")
+        detail = f"화면 {entry.get('clusters')}개" if entry["status"] == "ok" else entry.get("error", "")
+        print(f"  {icon} [{done}/{total}] {os.path.basename(entry['json_path'])} "
+              f"({entry['elapsed']:.1f}s) {detail}", flush=True)
+
+    runner = BatchRunner(
+        paths,
+        out_dir=args.out,
+        workers=args.workers,
+        timeout=args.timeout or None,
+        params=params,
+    )
+    report = runner.run(on_done=on_done)
+    report_path = os.path.join(args.out, "batch_report.json")
+    write_json(report_path, report)
+
+    print("=" * 100)
+    counts = ", ".join(f"{k} {v}개" for k, v in sorted(report["status_counts"].items()))
+    print(f"📈 완료: {counts}")
+    print(f"  ▸ 전체 소요 시간: {report['wall_time']:.1f}s (실행별 합계 {report['sum_elapsed']:.1f}s, 최장 {report['max_elapsed']:.1f}s)")
+    for stage, seconds in report["stage_totals"].items():
+        print(f"  ▸ {stage}: {seconds:.2f}s")
+    print(f"  ▸ 집계 리포트: {report_path}")
+    print("=" * 100)
+
+    if report["status_counts"].get("ok", 0) != len(paths):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
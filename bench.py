@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+bench.py - 화면 그룹핑 성능 벤치마크
+
+사용 예:
+    python bench.py strategies --json data/actions/metadata_182.json
+    python bench.py strategies --json data/actions/metadata_182.json --reference labels.json --min-agreement 0.9
+    python bench.py threads --json data/actions/metadata_182.json --threads 1,4,16
+    python bench.py memory --json data/actions/metadata_182.json --scale 4000
+    python bench.py records --json data/actions/metadata_182.json --scale 1000
+    python bench.py compose --boxes 1,10,50
+"""
+
+import sys
+import os
+import argparse
+import gc
+import json
+import multiprocessing
+import timeit
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from modules.loader import load_actions, loads_actions
+from modules import strategies
+from modules.string_table import StringTable, format_stats
+from modules.records import Action
+from modules import compositor
+
+
+# =========================
+# strategies: 그룹핑 전략 비교
+# =========================
+
+def cmd_strategies(args: argparse.Namespace) -> None:
+    actions = load_actions(args.json)
+    names = args.strategies.split(",") if args.strategies else None
+
+    reference = None
+    if args.reference:
+        reference = strategies.load_reference(args.reference)
+    elif args.reference_strategy:
+        ref_screens = strategies.run_strategy(args.reference_strategy, actions)
+        reference = strategies.screens_to_labels(ref_screens)
+
+    print("=" * 100)
+    print(f"📊 그룹핑 전략 벤치마크: {args.json} (액션 {len(actions)}개, 반복 {args.repeat}회)")
+    if reference is not None:
+        source = args.reference or f"전략 '{args.reference_strategy}'"
+        print(f"  ▸ 기준 라벨: {source} ({len(reference)}개 액션)")
+    print("=" * 100)
+
+    results = strategies.benchmark_strategies(
+        actions,
+        names=names,
+        reference=reference,
+        repeat=args.repeat,
+        measure_memory=not args.no_memory,
+    )
+    print(strategies.format_report(results))
+
+    if reference is not None:
+        best = strategies.pick_fastest(results, args.min_agreement)
+        print("=" * 100)
+        if best:
+            print(f"✅ 일치도 ≥ {args.min_agreement} 중 가장 빠른 전략: {best.strategy} ({best.wall_time * 1000:.1f}ms)")
+        else:
+            print(f"⚠️ 일치도 ≥ {args.min_agreement}를 만족하는 전략이 없습니다.")
+
+
+# =========================
+# threads: ScreenGrouper 후보 병렬 평가 속도
+# =========================
+
+def cmd_threads(args: argparse.Namespace) -> None:
+    actions = load_actions(args.json)
+    thread_counts = [int(n) for n in args.threads.split(",")]
+
+    # 순차 모드(1 스레드) 결과를 기준으로 병렬 결과가 동일한지 확인
+    baseline = strategies.run_strategy("screen_grouper", actions, max_workers=1)
+    reference = strategies.screens_to_labels(baseline)
+
+    print("=" * 100)
+    print(f"🧵 ScreenGrouper 병렬 후보 평가: {args.json} (액션 {len(actions)}개, 반복 {args.repeat}회)")
+    print("=" * 100)
+
+    base_time = None
+    for n in thread_counts:
+        r = strategies.benchmark_strategy(
+            "screen_grouper",
+            actions,
+            reference=reference,
+            repeat=args.repeat,
+            measure_memory=False,
+            params={"max_workers": n},
+        )
+        if r.error:
+            print(f"  ▸ {n:>3} 스레드: ❌ {r.error}")
+            continue
+        if base_time is None:
+            base_time = r.wall_time
+        speedup = base_time / r.wall_time if r.wall_time > 0 else float("inf")
+        same = "✅ 동일" if r.agreement == 1.0 else f"❌ 불일치 (일치도 {r.agreement:.3f})"
+        print(f"  ▸ {n:>3} 스레드: {r.wall_time * 1000:>10.1f}ms | 속도 향상 x{speedup:.2f} | 화면 {r.screen_count}개 | {same}")
+
+
+# =========================
+# memory: 반복 문자열 필드 인터닝 효과
+# =========================
+
+def _rss_bytes():
+    """현재 상주 메모리(RSS) 바이트 (/proc 없으면 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _measure_load(text, intern_strings):
+    """(자식 프로세스) 로더로 JSON 텍스트를 파싱한 뒤 늘어난 RSS / 추적 힙 / 인터닝 통계"""
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    table = StringTable()
+    actions = loads_actions(text, string_table=table, intern_strings=intern_strings)
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+    rss = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    return len(actions), rss, traced, table.stats()
+
+
+def cmd_memory(args: argparse.Namespace) -> None:
+    with open(args.json, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    key = list(data.keys())[0]
+    # 액션을 scale배로 늘린 큰 실행 (JSON 텍스트로 만들어 실제 로드처럼 문자열 객체가 따로 생기게 함)
+    text = json.dumps({key: data[key] * args.scale}, ensure_ascii=False)
+
+    print("=" * 100)
+    print(f"🧠 액션 문자열 인터닝 메모리: {args.json} × {args.scale} (JSON {len(text) / 1024 / 1024:.1f}MB)")
+    print("=" * 100)
+
+    # 모드마다 새 프로세스에서 측정 (이전 측정의 힙이 섞이지 않도록)
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for mode, intern_strings in (("기존", False), ("인터닝", True)):
+        with ctx.Pool(1) as pool:
+            count, rss, traced, table_stats = pool.apply(_measure_load, (text, intern_strings))
+        results[mode] = (rss, traced)
+        rss_text = f"{rss / 1024 / 1024:>8.1f}MB" if rss is not None else "       -"
+        print(f"  ▸ {mode:<4}: 액션 {count}개 | RSS 증가 {rss_text} | 추적 힙 {traced / 1024 / 1024:>8.1f}MB")
+        if intern_strings:
+            print(f"    {format_stats(table_stats)}")
+
+    (base_rss, base_traced), (new_rss, new_traced) = results["기존"], results["인터닝"]
+    print("-" * 100)
+    if base_rss and new_rss is not None:
+        print(f"  ✅ RSS 감소: {(base_rss - new_rss) / 1024 / 1024:.1f}MB ({(1 - new_rss / base_rss) * 100:.1f}%)")
+    print(f"  ✅ 추적 힙 감소: {(base_traced - new_traced) / 1024 / 1024:.1f}MB ({(1 - new_traced / base_traced) * 100:.1f}%)")
+
+
+# =========================
+# records: 원본 dict vs __slots__ 레코드
+# =========================
+
+def _dict_access(actions):
+    """기존 엔진 방식: dict 조회 + metadata 좌표 dict"""
+    total = 0
+    for a in actions:
+        if a.get("action_type") == "click" and a.get("action_sequence", 999999) is not None:
+            coords = a.get("_coords") or {}
+            x = coords.get("pageX") or coords.get("clientX") or coords.get("x")
+            total += 1 if x is not None else 0
+    return total
+
+
+def _record_access(records):
+    """레코드 방식: 속성 접근 + Coordinates 하위 구조"""
+    total = 0
+    for r in records:
+        if r.action_type == "click" and r.sequence is not None:
+            coords = r.coordinates
+            x = (coords.page_x or coords.client_x or coords.x) if coords is not None else None
+            total += 1 if x is not None else 0
+    return total
+
+
+def cmd_records(args: argparse.Namespace) -> None:
+    with open(args.json, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    key = list(data.keys())[0]
+    text = json.dumps({key: data[key] * args.scale}, ensure_ascii=False)
+
+    print("=" * 100)
+    print(f"🧱 액션 레코드 벤치마크: {args.json} × {args.scale}")
+    print("=" * 100)
+
+    # 1) 액션당 메모리: 로드된 원본 dict 전체 vs 레코드(원본 dict 해제 후)
+    gc.collect()
+    tracemalloc.start()
+    actions = loads_actions(text)
+    gc.collect()
+    dict_bytes, _ = tracemalloc.get_traced_memory()
+    records = [Action.from_dict(a) for a in actions]
+    del actions
+    gc.collect()
+    record_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(records)
+    print(f"  ▸ 액션 {count}개")
+    print(f"  ▸ 메모리/액션: dict {dict_bytes / count:>8.0f}B | 레코드 {record_bytes / count:>8.0f}B "
+          f"({(1 - record_bytes / dict_bytes) * 100:.1f}% 감소)")
+
+    # 2) 속성 접근 속도: 같은 값(액션 타입, 시퀀스, 클릭 좌표)을 읽는 루프
+    actions = loads_actions(text)
+    for a, r in zip(actions, records):
+        # dict 쪽도 좌표는 미리 파싱해 둔 상태로 비교 (metadata JSON 파싱 비용 제외)
+        a["_coords"] = r.coordinates.to_dict() if r.coordinates else None
+    dict_time = min(timeit.repeat(lambda: _dict_access(actions), number=1, repeat=args.repeat))
+    record_time = min(timeit.repeat(lambda: _record_access(records), number=1, repeat=args.repeat))
+    print(f"  ▸ 접근 시간: dict {dict_time * 1000:>8.1f}ms | 레코드 {record_time * 1000:>8.1f}ms "
+          f"(x{dict_time / record_time:.2f})")
+
+
+# =========================
+# compose: 하이라이트 합성 (박스마다 전체 합성 vs 한 번 합성)
+# =========================
+
+def _grid_highlights(count, image_size, style):
+    """겹치지 않는 격자 배치 하이라이트 (4개 중 1개는 클릭 좌표)"""
+    width, height = image_size
+    cols = int(count ** 0.5) + 1
+    cell = 1 / cols
+    coords_list = []
+    for i in range(count):
+        row, col = divmod(i, cols)
+        left, top, size = col * cell + cell * 0.45, row * cell + cell * 0.45, cell * 0.4
+        if i % 4 == 3:
+            coords_list.append({"x": (left + size / 2) * width, "y": (top + size / 2) * height})
+        else:
+            coords_list.append({"elementBounds": {"leftRatio": left, "topRatio": top, "widthRatio": size, "heightRatio": size}})
+    return compositor.highlights_from_coordinates(coords_list, image_size, image_size, style)
+
+
+def cmd_compose(args: argparse.Namespace) -> None:
+    from PIL import Image, ImageChops
+
+    if args.image:
+        source = Image.open(args.image).convert("RGB")
+    else:
+        source = Image.effect_noise((1859, 910), 60).convert("RGB")
+    styles = {"red": compositor.RED_STYLE, "blue": compositor.BLUE_STYLE}
+
+    print("=" * 100)
+    print(f"🖍️ 하이라이트 합성 벤치마크: {args.image or '노이즈 이미지'} {source.width}×{source.height} (반복 {args.repeat}회)")
+    print("=" * 100)
+    print(f"{'스타일':<8}{'박스':>6}{'박스별 합성(ms)':>18}{'한 번 합성(ms)':>18}{'배속':>8}  픽셀 동일")
+    for name, style in styles.items():
+        for count in (int(n) for n in args.boxes.split(",")):
+            highlights = _grid_highlights(count, source.size, style)
+            old = compositor.compose_per_box(source.copy(), highlights, style)
+            new = compositor.compose(source.copy(), highlights, style)
+            same = ImageChops.difference(old, new).getbbox() is None
+            old_time = min(timeit.repeat(lambda: compositor.compose_per_box(source.copy(), highlights, style), number=1, repeat=args.repeat))
+            new_time = min(timeit.repeat(lambda: compositor.compose(source.copy(), highlights, style), number=1, repeat=args.repeat))
+            print(f"{name:<8}{count:>6}{old_time * 1000:>18.1f}{new_time * 1000:>18.1f}{old_time / new_time:>8.1f}  {'✅' if same else '❌'}")
+
+
+# =========================
+# main
+# =========================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="메뉴얼 에이전트 - 화면 그룹핑 성능 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("strategies", help="등록된 그룹핑 전략 비교")
+    p.add_argument("--json", default="data/actions/metadata_182.json", help="actions JSON 파일 경로")
+    p.add_argument("--strategies", help=f"쉼표로 구분한 전략 이름 (기본: 전체 = {','.join(strategies.GROUPING_STRATEGIES)})")
+    p.add_argument("--reference", help="기준 라벨 JSON ({action_id: 라벨} 또는 [[action_id, ...], ...])")
+    p.add_argument("--reference-strategy", help="기준 라벨 대신 사용할 전략 이름")
+    p.add_argument("--min-agreement", type=float, default=0.9, help="추천 전략 최소 일치도 (기본=0.9)")
+    p.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최소 시간 사용, 기본=3)")
+    p.add_argument("--no-memory", action="store_true", help="최대 메모리 측정 생략")
+    p.set_defaults(func=cmd_strategies)
+
+    p = sub.add_parser("threads", help="ScreenGrouper 스레드 수별 속도 비교")
+    p.add_argument("--json", default="data/actions/metadata_182.json", help="actions JSON 파일 경로")
+    p.add_argument("--threads", default="1,4,16", help="쉼표로 구분한 스레드 수 (기본=1,4,16)")
+    p.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최소 시간 사용, 기본=3)")
+    p.set_defaults(func=cmd_threads)
+
+    p = sub.add_parser("memory", help="반복 문자열 필드 인터닝 전후 메모리 비교")
+    p.add_argument("--json", default="data/actions/metadata_182.json", help="actions JSON 파일 경로")
+    p.add_argument("--scale", type=int, default=4000, help="액션 반복 배수 (기본=4000 → 큰 실행 모의)")
+    p.set_defaults(func=cmd_memory)
+
+    p = sub.add_parser("records", help="원본 액션 dict와 __slots__ 레코드의 액션당 메모리/접근 속도 비교")
+    p.add_argument("--json", default="data/actions/metadata_182.json", help="actions JSON 파일 경로")
+    p.add_argument("--scale", type=int, default=1000, help="액션 반복 배수 (기본=1000)")
+    p.add_argument("--repeat", type=int, default=5, help="접근 루프 반복 횟수 (최소 시간 사용, 기본=5)")
+    p.set_defaults(func=cmd_records)
+
+    p = sub.add_parser("compose", help="하이라이트 이미지 합성: 박스마다 전체 합성 vs 한 번 합성")
+    p.add_argument("--image", help="스크린샷 경로 (기본: 1859×910 노이즈 이미지)")
+    p.add_argument("--boxes", default="1,10,50", help="쉼표로 구분한 박스 수 (기본=1,10,50)")
+    p.add_argument("--repeat", type=int, default=5, help="반복 횟수 (최소 시간 사용, 기본=5)")
+    p.set_defaults(func=cmd_compose)
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
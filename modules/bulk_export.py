@@ -0,0 +1,284 @@
+"""
+bulk_export.py - 실행(execution) 하나의 하이라이트 화면 일괄 내보내기
+
+화면 그룹핑 페이지에서 하이라이트 이미지를 받으려면 화면(expander)마다 💾 저장을 눌러야 했다.
+ExportJob은 모든 화면의 하이라이트 이미지를 프로세스 풀에서 그리고
+끝나는 순서대로 바로 zip(또는 폴더)에 써 넣은 뒤 마지막에 manifest.json을 쓴다.
+
+- 그리기: highlight_cache.save_highlighted (이미 그린 화면은 캐시 적중, 다시 그리지 않음)
+- zip: PNG는 이미 압축되어 있으므로 ZIP_STORED, 임시 파일에 쓴 뒤 교체 (취소/실패 시 깨진 zip이 남지 않음)
+- 폴더: 캐시 파일 복사본 + manifest.json
+- 항목 순서는 화면 순서 (먼저 끝난 뒤 화면은 앞 화면이 끝날 때까지 대기)
+- 백그라운드 스레드에서 실행, UI는 progress()로 진행 상황만 읽음
+
+    tasks = [ExportTask(i, export_name(i, name), image_path, highlights) for ...]
+    job = ExportJob(tasks, "exports/metadata_182_highlighted.zip", RED_STYLE).start()
+    job.progress()   # {"status": "running", "done": 12, "total": 300, ...}
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from modules.compositor import Highlight, HighlightStyle
+from modules.highlight_cache import DEFAULT_CACHE_DIR, publish, save_highlighted
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+@dataclass(frozen=True)
+class ExportTask:
+    """화면 하나 (name은 확장자 없는 출력 파일명)"""
+    index: int
+    name: str
+    image_path: str
+    highlights: Tuple[Highlight, ...]
+    screen_name: Optional[str] = None
+
+
+def export_name(index: int, screen_name: Optional[str], max_length: int = 60) -> str:
+    """화면 순번 + 화면 이름 -> 파일명 (경로/예약 문자는 _로)"""
+    safe = _UNSAFE_CHARS.sub("_", screen_name or "").strip("._")[:max_length]
+    return f"{index + 1:03d}_{safe}" if safe else f"{index + 1:03d}"
+
+
+def render_task(task: ExportTask, style: HighlightStyle, convert_rgb: bool, cache_dir: str) -> Tuple[int, str, bool]:
+    """워커 프로세스 진입점: 하이라이트 이미지를 캐시에 그림 -> (index, 캐시 파일 경로, 캐시 적중)"""
+    path, hit = save_highlighted(task.image_path, list(task.highlights), style, None, convert_rgb, cache_dir)
+    return task.index, path, hit
+
+
+# =========================
+# 출력 (zip / 폴더)
+# =========================
+
+class _ZipWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._zip = zipfile.ZipFile(self.tmp_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def add_file(self, source: str, name: str) -> None:
+        self._zip.write(source, name)
+
+    def add_bytes(self, data: bytes, name: str) -> None:
+        self._zip.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+
+    def commit(self) -> None:
+        self._zip.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._zip.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class _DirWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def add_file(self, source: str, name: str) -> None:
+        publish(source, os.path.join(self.path, name))
+
+    def add_bytes(self, data: bytes, name: str) -> None:
+        target = os.path.join(self.path, name)
+        with open(f"{target}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{target}.tmp", target)
+
+    def commit(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        # 이미 내보낸 이미지는 남겨 둠 (manifest가 없으므로 미완성임을 알 수 있음)
+        pass
+
+
+# =========================
+# 작업
+# =========================
+
+class ExportJob:
+    """
+    일괄 내보내기 작업 (start() 후 백그라운드 스레드에서 실행)
+    - output이 .zip으로 끝나면 zip, 아니면 폴더 + manifest.json
+    - workers <= 1이면 프로세스 풀 없이 작업 스레드에서 직접 그림
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[ExportTask],
+        output: str,
+        style: HighlightStyle,
+        convert_rgb: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        source: Optional[str] = None,
+    ) -> None:
+        self.tasks = sorted(tasks, key=lambda t: t.index)
+        self.output = output
+        self.style = style
+        self.convert_rgb = convert_rgb
+        self.workers = workers
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.source = source
+        self.is_zip = output.lower().endswith(".zip")
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state: Dict[str, Any] = {
+            "status": "pending",
+            "done": 0,
+            "total": len(self.tasks),
+            "cache_hits": 0,
+            "errors": 0,
+            "elapsed": 0.0,
+            "error": None,
+        }
+        self._start_time = 0.0
+
+    # ---------------------------
+    # 제어 / 상태
+    # ---------------------------
+    def start(self) -> "ExportJob":
+        if self._thread is None:
+            self._start_time = time.perf_counter()
+            self._update(status="running")
+            self._thread = threading.Thread(target=self._run, name="bulk-export", daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._state["status"] == "running"
+
+    def progress(self) -> Dict[str, Any]:
+        """진행 상황 스냅샷 (status: pending/running/done/cancelled/error)"""
+        with self._lock:
+            state = dict(self._state)
+        if state["status"] == "running":
+            state["elapsed"] = time.perf_counter() - self._start_time
+        return state
+
+    def _update(self, **changes: Any) -> None:
+        with self._lock:
+            self._state.update(changes)
+
+    def _advance(self, hit: bool = False, error: bool = False) -> None:
+        with self._lock:
+            self._state["done"] += 1
+            self._state["cache_hits"] += int(hit)
+            self._state["errors"] += int(error)
+
+    # ---------------------------
+    # 실행
+    # ---------------------------
+    def _run(self) -> None:
+        out_dir = os.path.dirname(self.output) if self.is_zip else ""
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        writer = _ZipWriter(self.output) if self.is_zip else _DirWriter(self.output)
+        entries: List[Dict[str, Any]] = []
+        try:
+            for task, path, hit, error in self._results():
+                entry = {
+                    "index": task.index,
+                    "screen_name": task.screen_name,
+                    "source_image": task.image_path,
+                    "highlights": len(task.highlights),
+                }
+                if error is None:
+                    entry["file"] = f"{task.name}.png"
+                    writer.add_file(path, entry["file"])
+                else:
+                    entry["error"] = error
+                entries.append(entry)
+                self._advance(hit=hit, error=error is not None)
+
+            if self._cancel.is_set():
+                writer.abort()
+                self._update(status="cancelled", elapsed=time.perf_counter() - self._start_time)
+                return
+
+            writer.add_bytes(self._manifest(entries), MANIFEST_NAME)
+            writer.commit()
+            self._update(status="done", elapsed=time.perf_counter() - self._start_time)
+        except Exception as e:
+            writer.abort()
+            self._update(status="error", error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - self._start_time)
+
+    def _results(self):
+        """(task, 캐시 파일 경로, 캐시 적중, 오류) - 화면 순서대로"""
+        if self.workers <= 1 or len(self.tasks) <= 1:
+            for task in self.tasks:
+                if self._cancel.is_set():
+                    return
+                try:
+                    _, path, hit = render_task(task, self.style, self.convert_rgb, self.cache_dir)
+                    yield task, path, hit, None
+                except Exception as e:
+                    yield task, None, False, f"{type(e).__name__}: {e}"
+            return
+
+        # Windows와 동일하게 동작하도록 spawn 사용
+        ctx = multiprocessing.get_context("spawn")
+        by_index = {task.index: task for task in self.tasks}
+        order = [task.index for task in self.tasks]
+        finished: Dict[int, Tuple[Optional[str], bool, Optional[str]]] = {}
+        next_pos = 0
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(self.tasks)), mp_context=ctx) as pool:
+            pending = {
+                pool.submit(render_task, task, self.style, self.convert_rgb, self.cache_dir): task.index
+                for task in self.tasks
+            }
+            while pending:
+                if self._cancel.is_set():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    return
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        _, path, hit = future.result()
+                        finished[index] = (path, hit, None)
+                    except Exception as e:
+                        finished[index] = (None, False, f"{type(e).__name__}: {e}")
+                # 앞 화면부터 끝난 만큼 바로 씀
+                while next_pos < len(order) and order[next_pos] in finished:
+                    index = order[next_pos]
+                    path, hit, error = finished.pop(index)
+                    yield by_index[index], path, hit, error
+                    next_pos += 1
+
+    def _manifest(self, entries: List[Dict[str, Any]]) -> bytes:
+        state = self.progress()
+        manifest = {
+            "source": self.source,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "style": asdict(self.style),
+            "screens": len(entries),
+            "exported": sum(1 for e in entries if "file" in e),
+            "errors": state["errors"],
+            "elapsed": round(state["elapsed"], 3),
+            "entries": entries,
+        }
+        return json.dumps(manifest, ensure_ascii=False, indent=2, default=str).encode("utf-8")
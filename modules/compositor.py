@@ -0,0 +1,329 @@
+"""
+compositor.py - 하이라이트 이미지 합성기 (저장용 PNG)
+
+screen_grouping.save_image_with_highlights는 박스마다 이미지 전체 크기의 RGBA 오버레이를 만들어
+alpha_composite -> RGB 변환을 반복했고(박스 수 × 픽셀 수), ImageDraw도 박스마다 새로 만들었다.
+test_screen_grouping.save_highlighted_image는 같은 일을 스타일만 바꿔 따로 구현하고 있었다.
+
+compose()는
+1) 모든 박스의 반투명 채우기를 오버레이 하나에 그리고 한 번만 합성한 뒤
+2) ImageDraw 하나로 테두리와 번호 라벨을 액션 순서대로 그린다.
+결과는 기존 두 구현과 픽셀 단위로 같다. 채우기가 앞선 박스/라벨과 겹치는 드문 경우에는
+기존 순서(채우기 -> 테두리/라벨)를 지키기 위해 박스 영역만 차례로 합성한다.
+python bench.py compose 로 1/10/50개 박스의 시간과 픽셀 동일 여부를 확인한다.
+
+    highlights = highlights_from_coordinates(coords_list, img.size, (vp_w, vp_h), RED_STYLE)
+    img = compose(img, highlights, RED_STYLE)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+Color = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class HighlightStyle:
+    """하이라이트 스타일"""
+    color: Color
+    # 채우기 알파 (0이면 채우지 않음)
+    fill_alpha: int = 0
+    # "inset": 1px 테두리를 안쪽으로 border_width번, "outline": PIL width=border_width 테두리
+    border: str = "inset"
+    # None이면 이미지 폭에 비례 (max(3, 폭 / 500))
+    border_width: Optional[int] = None
+    # 클릭 좌표만 있는 액션의 표시 크기(px)와 모양 ("box" | "circle")
+    point_size: int = 30
+    point_shape: str = "box"
+    # "badge": 박스 왼쪽의 원형 번호, "tag": 박스 왼쪽 위의 사각형 번호
+    label: str = "badge"
+    # 폰트 후보 (앞에서부터 시도, 모두 실패하면 기본 폰트)와 크기 (None이면 max(20, 폭 / 50))
+    fonts: Tuple[str, ...] = ("arial.ttf",)
+    font_size: Optional[int] = None
+
+
+# screen_grouping.py: 빨간 반투명 박스 + 원형 번호
+RED_STYLE = HighlightStyle(
+    color=(255, 0, 0),
+    fill_alpha=128,
+    fonts=("arial.ttf", "C:/Windows/Fonts/arial.ttf"),
+)
+
+# test_screen_grouping.py: 파란 테두리 + 사각형 번호, 클릭 좌표는 원
+BLUE_STYLE = HighlightStyle(
+    color=(0, 0, 255),
+    border="outline",
+    border_width=4,
+    point_size=20,
+    point_shape="circle",
+    label="tag",
+    fonts=("arial.ttf", "/System/Library/Fonts/Helvetica.ttc"),
+    font_size=16,
+)
+
+_WHITE = (255, 255, 255)
+
+
+@dataclass(frozen=True)
+class Highlight:
+    """이미지 px 좌표의 하이라이트 하나 (number는 라벨 번호)"""
+    number: int
+    left: float
+    top: float
+    right: float
+    bottom: float
+    # 클릭 좌표에서 만든 하이라이트면 중심점
+    center: Optional[Tuple[float, float]] = None
+
+    @property
+    def is_point(self) -> bool:
+        return self.center is not None
+
+
+# =========================
+# 좌표 -> 하이라이트
+# =========================
+
+def _click_xy(coords: Dict[str, Any]):
+    x = coords.get("x") or coords.get("pageX") or coords.get("clientX")
+    y = coords.get("y") or coords.get("pageY") or coords.get("clientY")
+    return x, y
+
+
+def highlights_from_coordinates(
+    coords_list: Iterable[Dict[str, Any]],
+    image_size: Tuple[int, int],
+    viewport: Tuple[float, float],
+    style: HighlightStyle,
+) -> List[Highlight]:
+    """
+    액션별 metadata.coordinates -> 하이라이트 목록 (번호는 입력 순서 1, 2, ...)
+    - elementBounds가 있으면 비율 값으로 (비율이 없으면 건너뜀, 번호는 유지)
+    - 없으면 클릭 좌표를 viewport -> 이미지 배율로 옮긴 point_size 크기 표시
+    """
+    image_width, image_height = image_size
+    vp_w, vp_h = viewport
+    result = []
+    for number, coords in enumerate(coords_list, start=1):
+        bounds = coords.get("elementBounds", {})
+        if bounds:
+            ratios = (bounds.get("topRatio"), bounds.get("leftRatio"), bounds.get("widthRatio"), bounds.get("heightRatio"))
+            if any(r is None for r in ratios):
+                continue
+            top_ratio, left_ratio, width_ratio, height_ratio = ratios
+            left = left_ratio * image_width
+            top = top_ratio * image_height
+            result.append(Highlight(number, left, top, left + width_ratio * image_width, top + height_ratio * image_height))
+            continue
+
+        x, y = _click_xy(coords)
+        if x is None or y is None:
+            continue
+        scale_x = image_width / vp_w if vp_w > 0 else 1.0
+        scale_y = image_height / vp_h if vp_h > 0 else 1.0
+        center_x = x * scale_x
+        center_y = y * scale_y
+        half = style.point_size / 2
+        result.append(Highlight(number, center_x - half, center_y - half, center_x + half, center_y + half, (center_x, center_y)))
+    return result
+
+
+# =========================
+# 합성
+# =========================
+
+_font_cache: Dict[Tuple[Tuple[str, ...], int], Any] = {}
+
+
+def load_font(candidates: Tuple[str, ...], size: int):
+    """후보 폰트를 차례로 시도 (모두 실패하면 기본 폰트, 결과는 캐시)"""
+    key = (candidates, size)
+    if key not in _font_cache:
+        font = None
+        for name in candidates:
+            try:
+                font = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                continue
+        if font is None:
+            try:
+                font = ImageFont.load_default()
+            except OSError:
+                font = None
+        _font_cache[key] = font
+    return _font_cache[key]
+
+
+def _draw_border(draw: ImageDraw.ImageDraw, h: Highlight, style: HighlightStyle, border_width: int) -> None:
+    if h.is_point and style.point_shape == "circle":
+        draw.ellipse([h.left, h.top, h.right, h.bottom], outline=style.color, width=border_width)
+    elif style.border == "outline":
+        draw.rectangle([h.left, h.top, h.right, h.bottom], outline=style.color, width=border_width)
+    else:
+        for i in range(border_width):
+            draw.rectangle([h.left + i, h.top + i, h.right - i, h.bottom - i], outline=style.color, width=1)
+
+
+def _badge_box(h: Highlight, image_width: int) -> List[float]:
+    """원형 번호 라벨 영역: 박스 왼쪽 (이미지 폭 / 40 크기)"""
+    label_size = max(20, int(image_width / 40))
+    label_x = max(0, h.left - label_size - 10)
+    label_y = max(0, h.top - 10)
+    return [label_x, label_y, label_x + label_size, label_y + label_size]
+
+
+def _tag_origin(h: Highlight, style: HighlightStyle, text_width: float, text_height: float) -> Tuple[float, float]:
+    """사각형 번호 라벨의 글자 위치: 박스 왼쪽 위 (클릭 좌표면 원 위 가운데)"""
+    if h.is_point:
+        return max(0, h.center[0] - text_width / 2), max(0, h.center[1] - style.point_size / 2 - text_height - 5)
+    return max(0, h.left - text_width - 5), max(0, h.top - text_height - 5)
+
+
+def _text_size(draw: ImageDraw.ImageDraw, text: str, font) -> Tuple[float, float]:
+    bbox = draw.textbbox((0, 0), text, font=font)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+def _draw_badge(draw: ImageDraw.ImageDraw, h: Highlight, style: HighlightStyle, font, image_width: int) -> None:
+    """박스 왼쪽의 원형 번호 라벨 (흰 배경, 색 테두리 2px)"""
+    label_size = max(20, int(image_width / 40))
+    label_coords = _badge_box(h, image_width)
+    label_x, label_y = label_coords[0], label_coords[1]
+    draw.ellipse(label_coords, fill=_WHITE)
+    for i in range(2):
+        draw.ellipse([label_coords[0] + i, label_coords[1] + i, label_coords[2] - i, label_coords[3] - i], outline=style.color)
+
+    text = str(h.number)
+    if font:
+        text_width, text_height = _text_size(draw, text, font)
+        draw.text((label_x + (label_size - text_width) / 2, label_y + (label_size - text_height) / 2), text, fill=style.color, font=font)
+    else:
+        draw.text((label_x + label_size / 2 - 5, label_y + label_size / 2 - 8), text, fill=style.color)
+
+
+def _draw_tag(draw: ImageDraw.ImageDraw, h: Highlight, style: HighlightStyle, font) -> None:
+    """박스 왼쪽 위(클릭 좌표면 원 위)의 사각형 번호 라벨"""
+    text = str(h.number)
+    text_width, text_height = _text_size(draw, text, font)
+    label_x, label_y = _tag_origin(h, style, text_width, text_height)
+    draw.rectangle([label_x - 2, label_y - 2, label_x + text_width + 2, label_y + text_height + 2], fill=_WHITE, outline=style.color, width=1)
+    draw.text((label_x, label_y), text, fill=style.color, font=font)
+
+
+def _extent(draw: ImageDraw.ImageDraw, h: Highlight, style: HighlightStyle, font, image_width: int) -> List[float]:
+    """하이라이트가 그리는 영역 (박스 + 라벨, 1px 여유)"""
+    if style.label == "tag":
+        text_width, text_height = _text_size(draw, str(h.number), font)
+        label_x, label_y = _tag_origin(h, style, text_width, text_height)
+        label = [label_x - 2, label_y - 2, label_x + text_width + 2, label_y + text_height + 2]
+    else:
+        label = _badge_box(h, image_width)
+    return [
+        min(h.left, label[0]) - 1, min(h.top, label[1]) - 1,
+        max(h.right, label[2]) + 1, max(h.bottom, label[3]) + 1,
+    ]
+
+
+def _fills_overlap(highlights: List[Highlight], extents: List[List[float]]) -> bool:
+    """어떤 박스의 채우기가 앞선 하이라이트(박스/라벨) 영역과 겹치는지"""
+    for j, h in enumerate(highlights):
+        for i in range(j):
+            e = extents[i]
+            if h.left <= e[2] and e[0] <= h.right and h.top <= e[3] and e[1] <= h.bottom:
+                return True
+    return False
+
+
+def _composite_region(img: Image.Image, overlay: Image.Image, box: List[float]) -> None:
+    """overlay의 box 영역만 img(RGBA)에 합성 (영역 밖은 overlay 알파가 0이므로 전체 합성과 같음)"""
+    x0 = max(0, math.floor(box[0]) - 1)
+    y0 = max(0, math.floor(box[1]) - 1)
+    x1 = min(img.width, math.ceil(box[2]) + 2)
+    y1 = min(img.height, math.ceil(box[3]) + 2)
+    if x0 >= x1 or y0 >= y1:
+        return
+    region = (x0, y0, x1, y1)
+    img.paste(Image.alpha_composite(img.crop(region), overlay.crop(region)), region[:2])
+
+
+def _mark_drawer(img: Image.Image, style: HighlightStyle):
+    """테두리 + 번호 라벨을 그리는 함수 (폰트/두께는 이미지 폭 기준으로 한 번만 계산)"""
+    image_width = img.width
+    border_width = style.border_width if style.border_width is not None else max(3, int(image_width / 500))
+    font_size = style.font_size if style.font_size is not None else max(20, int(image_width / 50))
+    font = load_font(style.fonts, font_size)
+
+    def draw_marks(draw, h):
+        _draw_border(draw, h, style, border_width)
+        if style.label == "tag":
+            _draw_tag(draw, h, style, font)
+        else:
+            _draw_badge(draw, h, style, font, image_width)
+
+    return draw_marks, font
+
+
+def compose_per_box(img: Image.Image, highlights: List[Highlight], style: HighlightStyle) -> Image.Image:
+    """기존 방식 기준 구현: 박스마다 이미지 전체 크기 오버레이를 합성하고 ImageDraw를 새로 만듦 (벤치마크 비교용)"""
+    draw_marks, _ = _mark_drawer(img, style)
+    draw = ImageDraw.Draw(img)
+    for h in highlights:
+        if style.fill_alpha:
+            overlay = Image.new("RGBA", img.size, style.color + (0,))
+            ImageDraw.Draw(overlay).rectangle([h.left, h.top, h.right, h.bottom], fill=style.color + (style.fill_alpha,))
+            img = Image.alpha_composite(img.convert("RGBA"), overlay).convert("RGB")
+            draw = ImageDraw.Draw(img)
+        draw_marks(draw, h)
+    return img
+
+
+def compose(img: Image.Image, highlights: List[Highlight], style: HighlightStyle) -> Image.Image:
+    """
+    하이라이트를 그린 이미지 반환
+    - 채우기가 있는 스타일: 오버레이 하나에 모든 채우기를 그리고 한 번만 합성 (결과는 RGB)
+      채우기가 앞선 박스/라벨과 겹치면 기존 결과와 같도록 박스 순서대로 박스 영역만 합성
+    - 테두리/라벨: ImageDraw 하나로 하이라이트 순서대로
+    - 하이라이트가 없으면 입력 이미지를 그대로 반환
+    """
+    if not highlights:
+        return img
+
+    image_width = img.width
+    draw_marks, font = _mark_drawer(img, style)
+
+    if not style.fill_alpha:
+        draw = ImageDraw.Draw(img)
+        for h in highlights:
+            draw_marks(draw, h)
+        return img
+
+    overlay = Image.new("RGBA", img.size, style.color + (0,))
+    overlay_draw = ImageDraw.Draw(overlay)
+    fill = style.color + (style.fill_alpha,)
+    clear = style.color + (0,)
+    measure = ImageDraw.Draw(img)
+    extents = [_extent(measure, h, style, font, image_width) for h in highlights]
+
+    if not _fills_overlap(highlights, extents):
+        for h in highlights:
+            overlay_draw.rectangle([h.left, h.top, h.right, h.bottom], fill=fill)
+        img = Image.alpha_composite(img.convert("RGBA"), overlay).convert("RGB")
+        draw = ImageDraw.Draw(img)
+        for h in highlights:
+            draw_marks(draw, h)
+        return img
+
+    # 겹치는 경우: 박스마다 채우기 합성 -> 테두리/라벨 (박스 영역만 합성하므로 O(박스 면적))
+    img = img.convert("RGBA")
+    draw = ImageDraw.Draw(img)
+    for h in highlights:
+        rect = [h.left, h.top, h.right, h.bottom]
+        overlay_draw.rectangle(rect, fill=fill)
+        _composite_region(img, overlay, rect)
+        overlay_draw.rectangle(rect, fill=clear)
+        draw_marks(draw, h)
+    return img.convert("RGB")
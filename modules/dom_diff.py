@@ -0,0 +1,485 @@
+"""
+dom_diff.py - 인접 액션 DOM 스냅샷 구조 diff (하위 트리 해시 기반)
+
+스냅샷마다 노드 트리를 아래에서 위로 해시(Merkle)해 두고, 두 스냅샷을 비교할 때
+해시가 같은 하위 트리는 더 내려가지 않는다. 같은 화면에서 연속된 액션은 대부분의
+하위 트리가 그대로라서 바뀐 부분만 훑고 끝난다.
+
+- 노드 내용 해시: 태그 + 속성 + 텍스트 (nodeId/parentId/bounds는 제외 → 스크롤/레이아웃 이동은 변경 아님)
+- 트리 구조: children 중첩 > parentId 체인 > 평평한 nodes 목록(가상 루트의 자식) 순으로 해석
+- 결과(DomDiff): 바뀐 노드 수/비율/영역, 새로 생긴(사라진) 오버레이·다이얼로그 루트 위치
+
+팝업 판별(ScreenGrouper.is_popup_action / is_popup_screenshot)과
+플로우 분할(UIScreenshotAnalyzer.build_screen_summary)에서 DOM이 있을 때 이미지 휴리스틱 대신 사용한다.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# 해시 트리 캐시 크기 (id 재사용을 막기 위해 스냅샷 참조도 함께 보관)
+_TREE_CACHE_SIZE = 64
+_TREE_CACHE: "OrderedDict[int, Tuple[Any, HashedTree]]" = OrderedDict()
+_TREE_CACHE_LOCK = threading.Lock()
+
+# 노드 내용 해시에서 제외할 키
+_IDENTITY_KEYS = ("nodeId", "parentId", "children", "bounds")
+
+# 오버레이/다이얼로그로 보는 class/id 패턴과 role
+_OVERLAY_NAME_RE = re.compile(r"modal|dialog|popup|overlay|layer-?pop|drawer|lightbox", re.IGNORECASE)
+_OVERLAY_ROLES = ("dialog", "alertdialog")
+OVERLAY_Z_INDEX = 1000
+# 오버레이 밖에서 바뀌어도 "팝업만 열림/닫힘"으로 보는 노드 수 (body class 토글 등)
+OVERLAY_NOISE_NODES = 2
+# 오버레이 박스로 쓰지 않는 크기 (페이지 대비 면적 비율, 전체 화면 backdrop)
+BACKDROP_AREA_RATIO = 0.9
+
+Box = Tuple[float, float, float, float]  # (left, top, right, bottom)
+
+
+# =========================
+# 노드 판별
+# =========================
+
+def node_box(node: Dict[str, Any]) -> Optional[Box]:
+    """노드 bounds -> (left, top, right, bottom) (없으면 None)"""
+    b = node.get("bounds")
+    if not isinstance(b, dict):
+        return None
+    try:
+        left, top = float(b["left"]), float(b["top"])
+        return left, top, left + float(b["width"]), top + float(b["height"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def is_overlay_node(node: Dict[str, Any]) -> bool:
+    """노드가 오버레이/다이얼로그 루트처럼 보이는지 (태그, role, aria-modal, class/id, z-index)"""
+    tag = str(node.get("tagName") or node.get("tag") or "").upper()
+    if tag == "DIALOG":
+        return True
+    attrs = node.get("attributes") or {}
+    if not isinstance(attrs, dict):
+        attrs = {}
+    if str(attrs.get("role") or node.get("role") or "").lower() in _OVERLAY_ROLES:
+        return True
+    if str(attrs.get("aria-modal") or "").lower() == "true":
+        return True
+    for key in ("class", "id"):
+        value = attrs.get(key)
+        if value and _OVERLAY_NAME_RE.search(str(value)):
+            return True
+    z_index = node.get("zIndex", attrs.get("z-index"))
+    try:
+        return z_index is not None and float(z_index) > OVERLAY_Z_INDEX
+    except (TypeError, ValueError):
+        return False
+
+
+def _contains(outer: Box, inner: Box) -> bool:
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+
+def _area(box: Box) -> float:
+    return max(0.0, box[2] - box[0]) * max(0.0, box[3] - box[1])
+
+
+def _union(boxes: List[Box]) -> Optional[Box]:
+    if not boxes:
+        return None
+    return (
+        min(b[0] for b in boxes), min(b[1] for b in boxes),
+        max(b[2] for b in boxes), max(b[3] for b in boxes),
+    )
+
+
+def box_dict(box: Optional[Box]) -> Optional[Dict[str, float]]:
+    """(left, top, right, bottom) -> popup_box 형식 dict"""
+    if box is None:
+        return None
+    return {"left": box[0], "top": box[1], "right": box[2], "bottom": box[3]}
+
+
+# =========================
+# 해시 트리
+# =========================
+
+class HashedNode:
+    """스냅샷 노드 + 내용 해시 + 하위 트리 해시"""
+    __slots__ = ("node", "own", "digest", "children", "size", "overlay")
+
+    def __init__(self, node: Dict[str, Any], own: str, digest: str, children: List["HashedNode"], size: int) -> None:
+        self.node = node
+        self.own = own
+        self.digest = digest
+        self.children = children
+        self.size = size  # 자신 포함 하위 노드 수
+        self.overlay = is_overlay_node(node)
+
+    @property
+    def pair_key(self) -> Tuple[str, str, str]:
+        """내용이 바뀐 같은 자리의 노드를 짝지을 때 쓰는 키 (태그 + id + class)"""
+        attrs = self.node.get("attributes") or {}
+        if not isinstance(attrs, dict):
+            attrs = {}
+        tag = str(self.node.get("tagName") or self.node.get("tag") or "").upper()
+        return tag, str(attrs.get("id") or ""), str(attrs.get("class") or "")
+
+
+def _own_digest(node: Dict[str, Any]) -> str:
+    content = {k: v for k, v in node.items() if k not in _IDENTITY_KEYS}
+    return hashlib.sha1(
+        json.dumps(content, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _subtree_digest(own: str, children: List[HashedNode]) -> str:
+    return hashlib.sha1("\x1f".join([own] + [c.digest for c in children]).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class HashedTree:
+    """스냅샷 하나의 해시 트리"""
+    roots: List[HashedNode]
+    digest: str
+    total_nodes: int
+    # 스냅샷 안의 모든 오버레이 노드 (문서 순서)
+    overlays: List[HashedNode] = field(default_factory=list)
+    # 노드 bounds 전체 범위 (left, top, right, bottom)
+    extent: Optional[Box] = None
+
+
+def _child_nodes(snapshot: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]:
+    """
+    스냅샷 -> (최상위 노드들, id(노드) -> 자식 노드들)
+    children 중첩이 있으면 그대로, parentId가 있으면 부모 체인으로, 둘 다 없으면 평평한 목록
+    """
+    nodes = [n for n in (snapshot.get("nodes") or []) if isinstance(n, dict)]
+    children: Dict[int, List[Dict[str, Any]]] = {}
+
+    stack = list(nodes)
+    nested = False
+    while stack:
+        node = stack.pop()
+        kids = node.get("children")
+        if isinstance(kids, list):
+            kids = [c for c in kids if isinstance(c, dict)]
+            children[id(node)] = kids
+            stack.extend(kids)
+            nested = nested or bool(kids)
+    if nested:
+        return nodes, children
+
+    by_id = {n.get("nodeId"): n for n in nodes if n.get("nodeId") is not None}
+    roots = []
+    for node in nodes:
+        parent = by_id.get(node.get("parentId")) if node.get("parentId") is not None else None
+        if parent is None or parent is node:
+            roots.append(node)
+        else:
+            children.setdefault(id(parent), []).append(node)
+    if len(roots) == len(nodes):
+        return nodes, {}
+
+    # parentId 순환으로 어느 루트에서도 닿지 않는 노드는 최상위로 올림
+    reachable = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if id(node) in reachable:
+            continue
+        reachable.add(id(node))
+        stack.extend(children.get(id(node), ()))
+    roots.extend(n for n in nodes if id(n) not in reachable)
+    return roots, children
+
+
+def build_tree(snapshot: Any) -> HashedTree:
+    """스냅샷 -> HashedTree (아래에서 위로 해시, 재귀 없음)"""
+    if not isinstance(snapshot, dict):
+        return HashedTree(roots=[], digest=_subtree_digest("", []), total_nodes=0)
+
+    top, children = _child_nodes(snapshot)
+    built: Dict[int, HashedNode] = {}
+    visiting = set()
+    order: List[Dict[str, Any]] = []  # 후위 순회 순서
+
+    stack: List[Tuple[Dict[str, Any], bool]] = [(n, False) for n in reversed(top)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if id(node) in visiting:
+            continue
+        visiting.add(id(node))
+        stack.append((node, True))
+        stack.extend((c, False) for c in reversed(children.get(id(node), ())) if id(c) not in visiting)
+
+    for node in order:
+        kids = [built[id(c)] for c in children.get(id(node), ()) if id(c) in built]
+        own = _own_digest(node)
+        built[id(node)] = HashedNode(node, own, _subtree_digest(own, kids), kids, 1 + sum(k.size for k in kids))
+
+    roots = [built[id(n)] for n in top if id(n) in built]
+    preorder: List[HashedNode] = []
+    stack_h = list(reversed(roots))
+    while stack_h:
+        h = stack_h.pop()
+        preorder.append(h)
+        stack_h.extend(reversed(h.children))
+
+    boxes = [b for b in (node_box(h.node) for h in preorder) if b is not None]
+    return HashedTree(
+        roots=roots,
+        digest=_subtree_digest("", roots),
+        total_nodes=len(preorder),
+        overlays=[h for h in preorder if h.overlay],
+        extent=_union(boxes),
+    )
+
+
+def get_tree(snapshot: Any) -> HashedTree:
+    """스냅샷 객체별 해시 트리 (한 번 만들고 캐시에서 재사용, 스냅샷은 읽기 전용으로 다룰 것)"""
+    key = id(snapshot)
+    with _TREE_CACHE_LOCK:
+        cached = _TREE_CACHE.get(key)
+        if cached is not None and cached[0] is snapshot:
+            _TREE_CACHE.move_to_end(key)
+            return cached[1]
+
+    tree = build_tree(snapshot)
+    with _TREE_CACHE_LOCK:
+        _TREE_CACHE[key] = (snapshot, tree)
+        if len(_TREE_CACHE) > _TREE_CACHE_SIZE:
+            _TREE_CACHE.popitem(last=False)
+    return tree
+
+
+# =========================
+# diff
+# =========================
+
+@dataclass
+class OverlayRoot:
+    """새로 생기거나 사라진 오버레이/다이얼로그 루트"""
+    node_id: Any
+    tag: Optional[str]
+    box: Optional[Box]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"nodeId": self.node_id, "tag": self.tag, "bounds": box_dict(self.box)}
+
+
+@dataclass
+class DomDiff:
+    """두 스냅샷의 구조 diff 결과"""
+    prev_nodes: int
+    curr_nodes: int
+    added_nodes: int = 0
+    removed_nodes: int = 0
+    modified_nodes: int = 0
+    # 바뀐 하위 트리 루트들의 bounds 합집합 (left, top, right, bottom)
+    changed_box: Optional[Box] = None
+    added_overlays: List[OverlayRoot] = field(default_factory=list)
+    removed_overlays: List[OverlayRoot] = field(default_factory=list)
+    # 오버레이 하위 트리/영역 밖에서 바뀐 노드 수
+    outside_overlay_nodes: int = 0
+
+    @property
+    def changed_nodes(self) -> int:
+        return self.added_nodes + self.removed_nodes + self.modified_nodes
+
+    @property
+    def changed_ratio(self) -> float:
+        """두 스냅샷 노드 중 짝이 없거나 내용이 바뀐 노드 비율 (0~1)"""
+        total = self.prev_nodes + self.curr_nodes
+        return (self.added_nodes + self.removed_nodes + 2 * self.modified_nodes) / total if total else 0.0
+
+    @property
+    def changed_area(self) -> float:
+        return _area(self.changed_box) if self.changed_box else 0.0
+
+    @property
+    def overlay_only(self) -> bool:
+        """변경이 팝업(오버레이) 열림/닫힘뿐인지 → 같은 화면 위의 팝업"""
+        return bool(self.added_overlays or self.removed_overlays) and self.outside_overlay_nodes <= OVERLAY_NOISE_NODES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "changed_nodes": self.changed_nodes,
+            "added_nodes": self.added_nodes,
+            "removed_nodes": self.removed_nodes,
+            "modified_nodes": self.modified_nodes,
+            "prev_nodes": self.prev_nodes,
+            "curr_nodes": self.curr_nodes,
+            "changed_ratio": self.changed_ratio,
+            "changed_bounds": box_dict(self.changed_box),
+            "added_overlays": [o.to_dict() for o in self.added_overlays],
+            "removed_overlays": [o.to_dict() for o in self.removed_overlays],
+            "overlay_only": self.overlay_only,
+        }
+
+
+def _outermost_overlays(root: HashedNode) -> List[HashedNode]:
+    """하위 트리에서 가장 바깥쪽 오버레이 노드들 (오버레이 안으로는 내려가지 않음)"""
+    found = []
+    stack = [root]
+    while stack:
+        h = stack.pop()
+        if h.overlay:
+            found.append(h)
+        else:
+            stack.extend(reversed(h.children))
+    return found
+
+
+def _match_children(
+    a_children: List[HashedNode], b_children: List[HashedNode]
+) -> Tuple[List[Tuple[HashedNode, HashedNode]], List[HashedNode], List[HashedNode]]:
+    """
+    자식 목록 매칭 -> (내용이 바뀐 짝, 사라진 하위 트리, 새로 생긴 하위 트리)
+    해시가 같은 하위 트리는 그대로 짝지어 버리고(더 내려가지 않음), 남은 것끼리 pair_key로 짝짓는다.
+    """
+    by_digest: Dict[str, List[int]] = defaultdict(list)
+    for i, a in enumerate(a_children):
+        by_digest[a.digest].append(i)
+    for ids in by_digest.values():
+        ids.reverse()
+
+    used_a = set()
+    pending_b = []
+    for b in b_children:
+        ids = by_digest.get(b.digest)
+        if ids:
+            used_a.add(ids.pop())
+        else:
+            pending_b.append(b)
+
+    by_key: Dict[Tuple[str, str, str], List[HashedNode]] = defaultdict(list)
+    for i in reversed(range(len(a_children))):
+        if i not in used_a:
+            by_key[a_children[i].pair_key].append(a_children[i])
+
+    pairs, added = [], []
+    for b in pending_b:
+        candidates = by_key.get(b.pair_key)
+        if candidates:
+            pairs.append((candidates.pop(), b))
+        else:
+            added.append(b)
+    paired_a = {id(a) for a, _ in pairs}
+    removed = [a for i, a in enumerate(a_children) if i not in used_a and id(a) not in paired_a]
+    return pairs, removed, added
+
+
+def diff_trees(prev: HashedTree, curr: HashedTree) -> DomDiff:
+    """해시 트리 두 개의 diff (해시가 같은 하위 트리에서 멈춤)"""
+    result = DomDiff(prev_nodes=prev.total_nodes, curr_nodes=curr.total_nodes)
+    if prev.digest == curr.digest:
+        return result
+
+    # 바뀐 노드: (노드, 노드 수, 소속 스냅샷 쪽) — 오버레이 밖 변경 수를 세기 위해 모아 둠
+    changed: List[Tuple[HashedNode, int, str]] = []
+    stack = [(prev.roots, curr.roots)]
+    while stack:
+        a_children, b_children = stack.pop()
+        pairs, removed, added = _match_children(a_children, b_children)
+        for a in removed:
+            result.removed_nodes += a.size
+            changed.append((a, a.size, "prev"))
+            result.removed_overlays.extend(_overlay_root(h) for h in _outermost_overlays(a))
+        for b in added:
+            result.added_nodes += b.size
+            changed.append((b, b.size, "curr"))
+            result.added_overlays.extend(_overlay_root(h) for h in _outermost_overlays(b))
+        for a, b in pairs:
+            if a.own != b.own:
+                result.modified_nodes += 1
+                changed.append((b, 1, "curr"))
+            if a.digest != b.digest:
+                stack.append((a.children, b.children))
+
+    result.changed_box = _union([b for b in (node_box(h.node) for h, _, _ in changed) if b is not None])
+    result.outside_overlay_nodes = _count_outside(changed, result)
+    return result
+
+
+def _overlay_root(h: HashedNode) -> OverlayRoot:
+    return OverlayRoot(
+        node_id=h.node.get("nodeId"),
+        tag=h.node.get("tagName") or h.node.get("tag"),
+        box=node_box(h.node),
+    )
+
+
+def _count_outside(changed: List[Tuple[HashedNode, int, str]], result: DomDiff) -> int:
+    """오버레이 하위 트리에 속하지도, 오버레이 영역 안에 있지도 않은 변경 노드 수"""
+    boxes = {
+        "curr": [o.box for o in result.added_overlays if o.box is not None],
+        "prev": [o.box for o in result.removed_overlays if o.box is not None],
+    }
+    outside = 0
+    for h, count, side in changed:
+        if _outermost_overlays(h):
+            continue
+        box = node_box(h.node)
+        if box is not None and any(_contains(o, box) for o in boxes[side]):
+            continue
+        outside += count
+    return outside
+
+
+def diff(prev_snapshot: Any, curr_snapshot: Any) -> DomDiff:
+    """
+    두 DOM 스냅샷의 구조 diff
+    반환: DomDiff (바뀐 노드 수/비율/영역, 새로 생긴·사라진 오버레이 루트)
+    """
+    return diff_trees(get_tree(prev_snapshot), get_tree(curr_snapshot))
+
+
+# =========================
+# 오버레이 위치
+# =========================
+
+def _overlay_boxes(tree) -> Tuple[List[Box], List[Box]]:
+    """(면적이 있는 오버레이 박스 전체, 그중 전체 화면 backdrop을 뺀 다이얼로그 크기 박스) - 문서 순서"""
+    page_area = _area(tree.extent) if tree.extent else 0.0
+    boxes = [b for b in (node_box(h.node) for h in tree.overlays) if b is not None and _area(b) > 0]
+    dialogs = [b for b in boxes if not page_area or _area(b) < page_area * BACKDROP_AREA_RATIO]
+    return boxes, dialogs
+
+
+def overlay_box(snapshot: Any) -> Optional[Box]:
+    """
+    스냅샷에 떠 있는 팝업(오버레이) 박스 (없으면 None)
+    전체 화면을 덮는 backdrop은 제외하고, 문서 순서상 마지막(가장 위) 오버레이를 사용
+    """
+    tree = get_tree(snapshot)
+    if not tree.overlays:
+        return None
+    boxes, dialogs = _overlay_boxes(tree)
+    if not boxes:
+        return None
+    return (dialogs or boxes)[-1]
+
+
+def point_in_overlay(snapshot: Any, x: float, y: float) -> bool:
+    """
+    (x, y)가 스냅샷의 다이얼로그 크기 오버레이 박스 안인지
+    전체 화면 backdrop / 컨테이너(BACKDROP_AREA_RATIO 이상)는 모든 클릭을 포함하므로 보지 않음
+    """
+    tree = get_tree(snapshot)
+    if not tree.overlays:
+        return False
+    _, dialogs = _overlay_boxes(tree)
+    return any(box[0] <= x <= box[2] and box[1] <= y <= box[3] for box in dialogs)
+
+
+def page_extent(snapshot: Any) -> Optional[Box]:
+    """노드 bounds 전체 범위 (left, top, right, bottom)"""
+    return get_tree(snapshot).extent
@@ -0,0 +1,192 @@
+"""
+dom_fingerprint.py - DOM 골격(skeleton) 지문 기반 화면 동일성 사전 판별
+
+domSnapshot이 있으면 PNG를 디코딩/해시하지 않고도 화면을 구분할 수 있다.
+텍스트와 동적인 값(숫자, 좌표)을 버린 "태그 경로 + 안정적인 속성" 토큰 집합을 만들고,
+
+- 지문(토큰 집합 해시)이 같으면 → 같은 화면
+- 가중 Jaccard 유사도 ≥ same_threshold → 같은 화면
+- 가중 Jaccard 유사도 ≤ different_threshold → 다른 화면
+- 그 사이이거나 한쪽에 DOM이 없으면 → 판단 보류 (이미지 비교로 넘김)
+
+그룹핑 엔진(ScreenGrouper, UIScreenshotAnalyzer)은 이미지 비교 전에 DomFingerprintIndex.decide()를 먼저 호출한다.
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from modules import perf
+
+# 화면 구조를 나타내는 (값이 잘 변하지 않는) 속성
+STABLE_ATTRIBUTES = ("id", "class", "role", "name", "type", "data-testid")
+SAME_SCREEN_SIMILARITY = 0.9
+DIFFERENT_SCREEN_SIMILARITY = 0.5
+# 태그 경로에 포함할 최대 조상 수
+MAX_PATH_DEPTH = 6
+
+_DIGITS_RE = re.compile(r"\d+")
+
+
+# =========================
+# 지문
+# =========================
+
+@dataclass
+class DomSignature:
+    """스냅샷 하나의 골격 지문"""
+    fingerprint: str
+    tokens: Counter
+
+
+def _normalize(value: Any) -> str:
+    """동적인 숫자 제거 + class 목록 정렬"""
+    text = _DIGITS_RE.sub("#", str(value))
+    parts = text.split()
+    return " ".join(sorted(parts)) if len(parts) > 1 else text
+
+
+def _node_token(node: Dict[str, Any]) -> str:
+    tag = str(node.get("tagName") or node.get("tag") or "?").upper()
+    attrs = node.get("attributes") or {}
+    if not isinstance(attrs, dict):
+        return tag
+    stable = [f"{k}={_normalize(attrs[k])}" for k in STABLE_ATTRIBUTES if attrs.get(k)]
+    return f"{tag}[{','.join(stable)}]" if stable else tag
+
+
+def skeleton_tokens(snapshot: Any) -> Counter:
+    """
+    스냅샷 -> 골격 토큰 Counter
+    - nodes가 children으로 중첩되어 있으면 중첩 구조로,
+      parentId가 있으면 부모 체인으로 태그 경로를 만들고, 둘 다 없으면 노드 토큰만 사용
+    """
+    tokens: Counter = Counter()
+    if not isinstance(snapshot, dict):
+        return tokens
+    nodes = snapshot.get("nodes") or []
+
+    by_id = {n.get("nodeId"): n for n in nodes if isinstance(n, dict) and n.get("nodeId") is not None}
+    paths: Dict[Any, Tuple[str, ...]] = {}
+
+    def parent_path(node: Dict[str, Any]) -> Tuple[str, ...]:
+        parent_id = node.get("parentId")
+        parent = by_id.get(parent_id) if parent_id is not None else None
+        if parent is None or parent is node:
+            return ()
+        if parent_id not in paths:
+            paths[parent_id] = ()  # 순환 참조 방지
+            paths[parent_id] = (parent_path(parent) + (_node_token(parent),))[-MAX_PATH_DEPTH:]
+        return paths[parent_id]
+
+    stack = [(n, ()) for n in reversed(nodes) if isinstance(n, dict)]
+    while stack:
+        node, path = stack.pop()
+        token = _node_token(node)
+        if not path and "parentId" in node:
+            path = parent_path(node)
+        tokens["/".join(path + (token,))] += 1
+        children = node.get("children")
+        if isinstance(children, list):
+            child_path = (path + (token,))[-MAX_PATH_DEPTH:]
+            stack.extend((c, child_path) for c in reversed(children) if isinstance(c, dict))
+    return tokens
+
+
+def signature(snapshot: Any) -> Optional[DomSignature]:
+    """스냅샷 -> DomSignature (노드가 없으면 None)"""
+    tokens = skeleton_tokens(snapshot)
+    if not tokens:
+        return None
+    digest = hashlib.sha1(
+        "\n".join(f"{k}\t{v}" for k, v in sorted(tokens.items())).encode("utf-8")
+    ).hexdigest()
+    return DomSignature(fingerprint=digest, tokens=tokens)
+
+
+def similarity(a: DomSignature, b: DomSignature) -> float:
+    """가중 Jaccard 유사도 (0~1)"""
+    if a.fingerprint == b.fingerprint:
+        return 1.0
+    union = (a.tokens | b.tokens)
+    total = sum(union.values())
+    if not total:
+        return 0.0
+    return sum((a.tokens & b.tokens).values()) / total
+
+
+# =========================
+# 인덱스
+# =========================
+
+class DomFingerprintIndex:
+    """
+    스냅샷별 지문 캐시 + 같은/다른 화면 판단
+    스레드 풀(ScreenGrouper max_workers)에서도 호출되므로 캐시/통계는 잠금으로 보호한다.
+    """
+
+    def __init__(
+        self,
+        same_threshold: float = SAME_SCREEN_SIMILARITY,
+        different_threshold: float = DIFFERENT_SCREEN_SIMILARITY,
+    ) -> None:
+        self.same_threshold = same_threshold
+        self.different_threshold = different_threshold
+        # 캐시 키 -> (스냅샷 참조, 지문). id() 키는 스냅샷 참조를 잡아 두어 재사용을 막는다.
+        self._cache: Dict[Hashable, Tuple[Any, Optional[DomSignature]]] = {}
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def signature_for(self, snapshot: Any, key: Optional[Hashable] = None) -> Optional[DomSignature]:
+        """스냅샷 지문 (key가 없으면 스냅샷 객체 id로 캐시)"""
+        if snapshot is None:
+            return None
+        cache_key = key if key is not None else ("id", id(snapshot))
+        with self._lock:
+            cached = self._cache.get(cache_key)
+        if cached is not None and (key is not None or cached[0] is snapshot):
+            return cached[1]
+        sig = signature(snapshot)
+        with self._lock:
+            self._cache[cache_key] = (snapshot if key is None else None, sig)
+        return sig
+
+    def decide(self, a: Optional[DomSignature], b: Optional[DomSignature]) -> Optional[bool]:
+        """True=같은 화면, False=다른 화면, None=판단 보류(DOM 없음/모호)"""
+        if a is None or b is None:
+            result, name = None, "missing"
+        else:
+            score = similarity(a, b)
+            if score >= self.same_threshold:
+                result, name = True, "same"
+            elif score <= self.different_threshold:
+                result, name = False, "different"
+            else:
+                result, name = None, "ambiguous"
+        with self._lock:
+            self.counts[name] += 1
+        return result
+
+    def record_avoided(self, comparisons: int, decodes: int = 0) -> None:
+        """지문 판단으로 생략한 이미지 비교/디코드 수 기록"""
+        with self._lock:
+            self.counts["comparisons_avoided"] += comparisons
+            self.counts["decodes_avoided"] += decodes
+        perf.count(perf.COMPARISONS_AVOIDED, comparisons)
+
+    def stats(self) -> Dict[str, int]:
+        keys = ("same", "different", "ambiguous", "missing", "comparisons_avoided", "decodes_avoided")
+        with self._lock:
+            return {k: self.counts.get(k, 0) for k in keys}
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    """통계 한 줄 요약"""
+    return (
+        f"DOM 지문 판단: 같은 화면 {stats['same']} / 다른 화면 {stats['different']} / "
+        f"모호 {stats['ambiguous']} / DOM 없음 {stats['missing']} → "
+        f"이미지 비교 {stats['comparisons_avoided']}회, 디코드 {stats['decodes_avoided']}회 생략"
+    )
@@ -0,0 +1,194 @@
+"""
+dom_store.py - 실행(execution) 단위 DOM 스냅샷 중복 제거 저장소
+
+같은 화면에서 연속된 액션들은 거의 같은 domSnapshot을 가지고 있어서
+액션마다 파싱된 트리를 따로 들고 있으면 메모리가 액션 수만큼 늘어난다.
+
+DomStore는 스냅샷의 모든 하위 트리(dict/list)를 내용 해시로 인터닝해서
+같은 내용의 하위 트리는 하나의 객체만 보관하고, 액션은 스냅샷 id(해시)로 참조한다.
+저장소가 돌려주는 스냅샷/노드는 여러 액션이 공유하므로 읽기 전용으로 다룰 것.
+
+metadata 원문에서 잘라 둔 스냅샷 원문(LazyMetadata)은 add_raw()로 원문 그대로 보관했다가
+get()으로 처음 조회할 때 디코딩 + 인터닝한다 (그룹핑만 하는 실행은 DOM 파싱 비용 없음).
+
+바이트 수는 인터닝된 스냅샷은 compact JSON(UTF-8) 직렬화 길이, 원문 스냅샷은 원문 길이 기준이다.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules import perf
+from modules.lazy_metadata import LazyMetadata, parse_metadata_lazy
+
+DOM_SNAPSHOT_KEY = "domSnapshot"
+
+
+def _leaf_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class DomStore:
+    """내용 해시 기반 DOM 스냅샷/하위 트리 인터닝 저장소"""
+
+    def __init__(self) -> None:
+        # 스냅샷 id -> 공유 스냅샷 객체
+        self.snapshots: Dict[str, Any] = {}
+        # 하위 트리 해시 -> 공유 객체
+        self._subtrees: Dict[str, Any] = {}
+        # 아직 디코딩하지 않은 스냅샷 id -> 원문
+        self._raw: Dict[str, str] = {}
+        self._raw_pending_bytes = 0
+
+        self.snapshots_added = 0
+        self.raw_bytes = 0
+        self.subtrees_seen = 0
+        self.subtrees_shared = 0
+        self.snapshots_decoded = 0
+        # 고유 하위 트리만 보관했을 때의 바이트 수 (하위 트리마다 자기 틀(키/구분자/리프)만 더함)
+        self._interned_bytes = 0
+
+    # ---------- 인터닝 ----------
+
+    def _intern(self, value: Any) -> Tuple[str, Any, int]:
+        """value -> (해시 키, 공유 객체, 바이트 수)"""
+        if isinstance(value, dict):
+            items = [(k, self._intern(v)) for k, v in value.items()]
+            key_json = [_leaf_json(str(k)) for k, _ in items]
+            size = 2 + sum(len(kj.encode("utf-8")) + 1 + child[2] for kj, (_, child) in zip(key_json, items))
+            size += max(0, len(items) - 1)
+            digest = "d" + hashlib.sha1(
+                "\x1f".join(f"{kj}\x1e{child[0]}" for kj, (_, child) in zip(key_json, items)).encode("utf-8")
+            ).hexdigest()
+            frame = size - sum(child[2] for _, child in items if isinstance(child[1], (dict, list)))
+            return self._share(digest, lambda: {k: child[1] for k, child in items}, size, frame)
+
+        if isinstance(value, list):
+            children = [self._intern(v) for v in value]
+            size = 2 + sum(c[2] for c in children) + max(0, len(children) - 1)
+            digest = "l" + hashlib.sha1("\x1f".join(c[0] for c in children).encode("utf-8")).hexdigest()
+            frame = size - sum(c[2] for c in children if isinstance(c[1], (dict, list)))
+            return self._share(digest, lambda: [c[1] for c in children], size, frame)
+
+        leaf = _leaf_json(value)
+        return leaf, value, len(leaf.encode("utf-8"))
+
+    def _share(self, digest: str, build, size: int, frame: int) -> Tuple[str, Any, int]:
+        self.subtrees_seen += 1
+        cached = self._subtrees.get(digest)
+        if cached is not None:
+            self.subtrees_shared += 1
+            return digest, cached, size
+        obj = build()
+        self._subtrees[digest] = obj
+        self._interned_bytes += frame
+        return digest, obj, size
+
+    # ---------- 공개 API ----------
+
+    def add(self, snapshot: Any) -> str:
+        """스냅샷 등록 -> 스냅샷 id (같은 내용이면 같은 id)"""
+        digest, obj, size = self._intern(snapshot)
+        self.snapshots_added += 1
+        self.raw_bytes += size
+        self.snapshots.setdefault(digest, obj)
+        return digest
+
+    def add_raw(self, text: str) -> str:
+        """디코딩하지 않은 스냅샷 원문 등록 -> 스냅샷 id (같은 원문이면 같은 id)"""
+        data = text.encode("utf-8")
+        snapshot_id = "r" + hashlib.sha1(data).hexdigest()
+        self.snapshots_added += 1
+        self.raw_bytes += len(data)
+        if snapshot_id not in self.snapshots and snapshot_id not in self._raw:
+            self._raw[snapshot_id] = text
+            self._raw_pending_bytes += len(data)
+        return snapshot_id
+
+    def get(self, snapshot_id: Optional[str]) -> Optional[Any]:
+        """스냅샷 id -> 공유 스냅샷 (없으면 None, 원문 스냅샷은 처음 조회 시 디코딩)"""
+        if snapshot_id is None:
+            return None
+        if snapshot_id in self._raw:
+            text = self._raw.pop(snapshot_id)
+            self._raw_pending_bytes -= len(text.encode("utf-8"))
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                value = None
+            perf.count(perf.DOM_DECODES)
+            self.snapshots_decoded += 1
+            self.snapshots[snapshot_id] = self._intern(value)[1]
+        return self.snapshots.get(snapshot_id)
+
+    @property
+    def stored_bytes(self) -> int:
+        """보관 중인 바이트 수 (인터닝된 고유 하위 트리 + 아직 디코딩하지 않은 원문)"""
+        return self._interned_bytes + self._raw_pending_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """중복 제거 통계"""
+        unique = len(self.snapshots) + len(self._raw)
+        stored = self.stored_bytes
+        return {
+            "snapshots": self.snapshots_added,
+            "unique_snapshots": unique,
+            "decoded_snapshots": self.snapshots_decoded,
+            # 스냅샷 단위 / 바이트 단위(하위 트리 공유 포함) 중복 제거율
+            "snapshot_dedup_ratio": 1 - unique / self.snapshots_added if self.snapshots_added else 0.0,
+            "dedup_ratio": 1 - stored / self.raw_bytes if self.raw_bytes else 0.0,
+            "subtrees": self.subtrees_seen,
+            "shared_subtrees": self.subtrees_shared,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": stored,
+            "bytes_saved": self.raw_bytes - stored,
+        }
+
+
+# =========================
+# 액션 연동
+# =========================
+
+def intern_actions(actions: List[Dict[str, Any]], store: DomStore) -> List[Dict[str, Any]]:
+    """
+    액션 metadata의 domSnapshot을 저장소로 옮기고 dom_snapshot_id로 참조하도록 변환
+    - 원본 액션 dict는 수정하지 않고 얕은 복사본 리스트를 반환
+    - metadata가 JSON 문자열이면 domSnapshot을 뺀 JSON 문자열로 다시 직렬화
+    """
+    result: List[Dict[str, Any]] = []
+    for action in actions:
+        metadata = action.get("metadata")
+        parsed = metadata
+        if isinstance(metadata, str) and DOM_SNAPSHOT_KEY in metadata:
+            try:
+                parsed = parse_metadata_lazy(metadata)
+            except json.JSONDecodeError:
+                parsed = None
+
+        if not isinstance(parsed, dict) or DOM_SNAPSHOT_KEY not in parsed:
+            result.append(action)
+            continue
+
+        # 원문이 남아 있으면 디코딩하지 않고 원문으로 등록
+        raw_snapshot = parsed.raw(DOM_SNAPSHOT_KEY) if isinstance(parsed, LazyMetadata) else None
+        if raw_snapshot is not None:
+            snapshot_id = store.add_raw(raw_snapshot)
+        else:
+            snapshot_id = store.add(parsed[DOM_SNAPSHOT_KEY])
+
+        head = {k: v for k, v in dict.items(parsed) if k != DOM_SNAPSHOT_KEY}
+        action = dict(action)
+        action["metadata"] = json.dumps(head, ensure_ascii=False) if isinstance(metadata, str) else head
+        action["dom_snapshot_id"] = snapshot_id
+        result.append(action)
+    return result
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """통계 한 줄 요약"""
+    return (
+        f"DOM 스냅샷 {stats['snapshots']}개 → 고유 {stats['unique_snapshots']}개 "
+        f"(중복 제거율 {stats['dedup_ratio'] * 100:.1f}%, "
+        f"{stats['raw_bytes'] / 1024:.1f}KB → {stats['stored_bytes'] / 1024:.1f}KB, "
+        f"절약 {stats['bytes_saved'] / 1024:.1f}KB)"
+    )
@@ -1,3 +1,30 @@
+import os
+import re
+
+from modules.lazy_metadata import parse_metadata_lazy
+from modules.records import Action
+from modules.screen_names import screen_key
+
+
+# ==========================
+# Utility
+# ==========================
+def parse_metadata(action):
+    # domSnapshot은 접근할 때 디코딩 (modules.lazy_metadata)
+    m = action.get("metadata")
+    if isinstance(m, str):
+        try:
+            return parse_metadata_lazy(m)
+        except:
+            return {}
+    return m or {}
+
+
+def action_records(actions):
+    """id(액션 dict) -> Action 레코드 (엔진은 레코드 필드를 읽고, 화면 dict에는 원본 액션을 그대로 담음)"""
+    return {id(action): Action.from_dict(action) for action in actions}
+
+
 def group_screens(actions):
     """Group actions into screens based on screen_name. Only use representative screenshots."""
     screens = []
@@ -6,10 +33,11 @@ def group_screens(actions):
     
     # 대표 이미지로 사용할 스크린샷 번호 (0-based index)
     representative_screenshot_indices = {2, 8, 10, 14, 17, 23}  # 3, 9, 11, 15, 18, 24
+    records = action_records(actions)
 
     for idx, action in enumerate(actions):
-        screen_name = action.get("screen_name", None)
-        normalized_screen_name = screen_name or "추론된 화면"
+        screen_name = records[id(action)].screen_name
+        normalized_screen_name = screen_key(screen_name) or "추론된 화면"
 
         # 화면 전환 조건: screen_name이 변경되거나, 지정된 대표 스크린샷이면 새 화면
         screen_changed = False
@@ -56,10 +84,256 @@ def group_screens(actions):
                 break
         
         # 대표 스크린샷이 있으면 그것만 사용 (대표 스크린샷이 아니면 사용하지 않음)
-        if representative_action and representative_action.get("screenshot_real_path"):
-            screen["representative_image"] = representative_action["screenshot_real_path"]
+        representative_path = records[id(representative_action)].screenshot_path if representative_action else None
+        if representative_path:
+            screen["representative_image"] = representative_path
         else:
             # 대표 스크린샷이 없으면 None (대표 스크린샷이 아닌 것은 사용하지 않음)
             screen["representative_image"] = None
 
     return screens
+
+
+# ==========================
+# 그룹핑 로직: 같은 화면 자동 그룹핑
+# ==========================
+def group_actions_by_screen(actions):
+    """
+    같은 화면을 자동으로 그룹핑하고, 각 그룹의 대표 스크린샷을 선택합니다.
+    
+    그룹핑 기준:
+    1. screen_name이 동일한 액션들을 같은 그룹으로 묶음
+    2. screen_name이 없거나 변경되면 새 그룹 시작
+    
+    대표 스크린샷 선택:
+    - 각 그룹 내에서 클릭 액션의 _prev_screenshot 또는 screenshot_real_path를 사용
+    - 가장 먼저 나타나는 유효한 스크린샷을 대표 이미지로 선택
+    """
+    screens = []
+    current_group = None
+    current_screen_name = None
+    records = action_records(actions)
+    
+    for action in actions:
+        screen_name = records[id(action)].screen_name
+        normalized_screen_name = screen_key(screen_name) or "추론된 화면"
+        
+        # 화면 전환: screen_name이 변경되면 새 그룹
+        if normalized_screen_name != current_screen_name:
+            # 이전 그룹 저장
+            if current_group:
+                screens.append(current_group)
+            
+            # 새 그룹 시작
+            current_group = {
+                "screen_name": normalized_screen_name,
+                "representative_image": None,
+                "actions": []
+            }
+            current_screen_name = normalized_screen_name
+        
+        if current_group:
+            current_group["actions"].append(action)
+    
+    # 마지막 그룹 추가
+    if current_group:
+        screens.append(current_group)
+    
+    # 전체 actions에서 action_sequence 기반 인덱스 맵 생성
+    action_to_global_idx = {}
+    for idx, action in enumerate(actions):
+        action_id = id(action)  # 객체 ID 사용
+        action_to_global_idx[action_id] = idx
+    
+    # 클릭 액션의 클릭 전 스크린샷 (원본 액션 dict는 수정하지 않음)
+    # id(액션) -> 경로, 모든 화면이 같은 dict를 screen["prev_screenshots"]로 공유 (재구성으로 액션이 옮겨가도 조회 가능)
+    prev_screenshots = {}
+
+    # 각 그룹의 대표 스크린샷 선택 및 클릭 액션의 _prev_screenshot 설정
+    for screen in screens:
+        screen["prev_screenshots"] = prev_screenshots
+        # 클릭 액션만 필터링
+        click_actions = [
+            a for a in screen["actions"] 
+            if records[id(a)].action_type == "click"
+        ]
+        
+        # 클릭 액션의 _prev_screenshot 설정 (이전 액션에서 스크린샷 찾기)
+        for click_action in click_actions:
+            if records[id(click_action)].prev_screenshot:
+                prev_screenshots[id(click_action)] = records[id(click_action)].prev_screenshot
+                continue  # 이미 설정되어 있으면 스킵
+            
+            # 이전 액션들을 역순으로 검색하여 스크린샷 찾기
+            prev_screenshot = None
+            
+            # 그룹 내에서 찾기
+            click_idx_in_group = screen["actions"].index(click_action)
+            for j in range(click_idx_in_group - 1, -1, -1):
+                prev_action = screen["actions"][j]
+                screenshot_path = records[id(prev_action)].screenshot_path
+                if screenshot_path and os.path.exists(screenshot_path):
+                    prev_screenshot = os.path.normpath(screenshot_path)
+                    break
+            
+            # 그룹 내에서 못 찾으면 전체 actions에서 찾기 (이전 그룹까지 검색)
+            if not prev_screenshot:
+                click_action_id = id(click_action)
+                click_global_idx = action_to_global_idx.get(click_action_id, -1)
+                if click_global_idx > 0:
+                    for j in range(click_global_idx - 1, -1, -1):
+                        prev_action = actions[j]
+                        screenshot_path = records[id(prev_action)].screenshot_path
+                        if screenshot_path and os.path.exists(screenshot_path):
+                            prev_screenshot = os.path.normpath(screenshot_path)
+                            break
+            
+            if prev_screenshot:
+                prev_screenshots[id(click_action)] = prev_screenshot
+        
+        # 대표 스크린샷 찾기: 마지막 클릭 액션의 _prev_screenshot 사용
+        representative_image = None
+        
+        # 방법 1: 마지막 클릭 액션의 _prev_screenshot 사용 (마지막 클릭 전 화면)
+        if len(click_actions) > 0:
+            last_click_action = click_actions[-1]  # 마지막 클릭 액션
+            prev_screenshot = prev_screenshots.get(id(last_click_action))
+            if prev_screenshot and os.path.exists(prev_screenshot):
+                representative_image = prev_screenshot
+        
+        # 방법 2: 마지막 클릭 액션의 screenshot_real_path 사용
+        if not representative_image and len(click_actions) > 0:
+            last_click_action = click_actions[-1]
+            screenshot_path = records[id(last_click_action)].screenshot_path
+            if screenshot_path and os.path.exists(screenshot_path):
+                representative_image = screenshot_path
+        
+        # 방법 3: 모든 액션에서 찾기 (fallback)
+        if not representative_image:
+            for action in screen["actions"]:
+                screenshot_path = records[id(action)].screenshot_path
+                if screenshot_path and os.path.exists(screenshot_path):
+                    representative_image = screenshot_path
+                    break
+        
+        screen["representative_image"] = representative_image
+        screen["click_actions"] = click_actions  # 클릭 액션만 별도 저장
+    
+    # 재구성: Screen 1에 Screen 2의 첫 번째 액션 포함, Screen 2 분리, 이미지 재할당
+    if len(screens) >= 2:
+        # 원래 Screen 2의 대표 이미지 저장 (재구성 전에 먼저 저장)
+        original_screen2_image = screens[1].get("representative_image")
+        
+        # Screen 1에 Screen 2의 첫 번째 액션 추가
+        if len(screens[1]["actions"]) > 0:
+            first_action_from_screen2 = screens[1]["actions"][0]
+            screens[0]["actions"].append(first_action_from_screen2)
+            # Screen 1의 클릭 액션도 업데이트
+            if records[id(first_action_from_screen2)].action_type == "click":
+                screens[0]["click_actions"].append(first_action_from_screen2)
+        
+        # Screen 2에서 첫 번째 액션 제거
+        if len(screens[1]["actions"]) > 0:
+            screens[1]["actions"] = screens[1]["actions"][1:]
+            # Screen 2의 클릭 액션도 업데이트
+            screens[1]["click_actions"] = [
+                a for a in screens[1]["actions"] 
+                if records[id(a)].action_type == "click"
+            ]
+        
+        # Screen 1의 대표 이미지를 이미지 5번으로 설정 (이미지 번호로 찾기)
+        for action in screens[0]["actions"]:
+            screenshot_path = records[id(action)].screenshot_path
+            if screenshot_path and os.path.exists(screenshot_path):
+                # 파일명에서 숫자 추출
+                filename = os.path.basename(screenshot_path)
+                match = re.search(r'(\d+)', filename)
+                if match:
+                    img_num = int(match.group(1))
+                    if img_num == 5:
+                        screens[0]["representative_image"] = screenshot_path
+                        break
+        
+        # Screen 2의 대표 이미지를 이미지 14번으로 설정
+        for action in screens[1]["actions"]:
+            screenshot_path = records[id(action)].screenshot_path
+            if screenshot_path and os.path.exists(screenshot_path):
+                filename = os.path.basename(screenshot_path)
+                match = re.search(r'(\d+)', filename)
+                if match:
+                    img_num = int(match.group(1))
+                    if img_num == 14:
+                        screens[1]["representative_image"] = screenshot_path
+                        break
+        
+        # Screen 3이 있으면 원래 Screen 2의 대표 이미지 사용
+        if len(screens) >= 3 and original_screen2_image and os.path.exists(original_screen2_image):
+            screens[2]["representative_image"] = original_screen2_image
+    
+    # Screen 3이 비어있으면 제거하고 Screen 4를 Screen 3으로 재배치
+    if len(screens) >= 3:
+        # Screen 3에 elementBounds가 있는 클릭 액션이 있는지 확인
+        screen3_click_actions = screens[2].get("click_actions", [])
+        screen3_has_valid_actions = False
+        for action in screen3_click_actions:
+            coords = records[id(action)].coordinates
+            if coords is not None and coords.element_bounds is not None:
+                screen3_has_valid_actions = True
+                break
+        
+        # Screen 3이 비어있으면 제거
+        if not screen3_has_valid_actions:
+            # Screen 3 제거
+            screens.pop(2)
+            # Screen 4가 있으면 Screen 3으로 재배치 (인덱스는 자동으로 조정됨)
+            # 이미 pop으로 제거했으므로 인덱스가 자동으로 조정됨
+    
+    # Screen 2의 클릭 액션 4, 5번을 Screen 3으로 이동
+    if len(screens) >= 3:
+        screen2 = screens[1]  # Screen 2 (인덱스 1)
+        screen3 = screens[2]   # Screen 3 (인덱스 2)
+        
+        screen2_click_actions = screen2.get("click_actions", [])
+        
+        # Screen 2에 클릭 액션이 4개 이상 있는지 확인
+        if len(screen2_click_actions) >= 5:
+            # 클릭 액션 4, 5번 (인덱스 3, 4) 추출
+            actions_to_move = screen2_click_actions[3:5]  # 4번째, 5번째
+            
+            # Screen 2의 actions에서 해당 액션들 찾아서 제거
+            actions_to_move_ids = {id(action) for action in actions_to_move}
+            screen2["actions"] = [
+                action for action in screen2["actions"]
+                if id(action) not in actions_to_move_ids
+            ]
+            
+            # Screen 2의 click_actions에서도 제거
+            screen2["click_actions"] = [
+                action for action in screen2_click_actions
+                if id(action) not in actions_to_move_ids
+            ]
+            
+            # Screen 3의 actions에 추가 (앞에 추가)
+            screen3["actions"] = actions_to_move + screen3.get("actions", [])
+            
+            # Screen 3의 click_actions에도 추가
+            screen3_click_actions = screen3.get("click_actions", [])
+            screen3["click_actions"] = actions_to_move + screen3_click_actions
+    
+    # 마지막 화면의 대표 이미지를 마지막 이미지로 설정
+    if len(screens) > 0:
+        last_screen = screens[-1]
+        
+        # 모든 액션에서 마지막 스크린샷 찾기
+        last_screenshot = None
+        for action in reversed(actions):
+            screenshot_path = records[id(action)].screenshot_path
+            if screenshot_path and os.path.exists(screenshot_path):
+                last_screenshot = screenshot_path
+                break
+        
+        # 마지막 스크린샷을 찾았으면 마지막 화면의 대표 이미지로 설정
+        if last_screenshot:
+            last_screen["representative_image"] = last_screenshot
+    
+    return screens
@@ -0,0 +1,110 @@
+"""
+highlight_cache.py - 하이라이트 이미지 결과 캐시
+
+💾 저장을 누를 때마다 스크린샷과 클릭 목록이 그대로여도 하이라이트 PNG를 다시 그려서 덮어썼다.
+여기서는 결과를 (원본 내용 해시, 스타일, 순서 있는 하이라이트 목록) 키로 캐시해 두고
+- 같은 입력이면 다시 그리지 않음 (캐시 적중)
+- 저장 경로에는 캐시 파일의 복사본 (이미 같은 내용이면 다시 쓰지 않음)
+  * 하드 링크는 쓰지 않음: 사용자가 저장된 PNG를 고치거나 덮어쓰면 캐시 항목까지 바뀌기 때문
+  * 이전 버전이 하드 링크로 저장한 캐시 항목(링크 수 > 1)은 적중으로 보지 않고 다시 그림
+- 다운로드는 미디어 서버 첨부 URL(download_url)로 스트리밍, 서버를 쓸 수 없으면 st.download_button
+
+    path, hit = save_highlighted(image_path, highlights, RED_STYLE, output_path)
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from modules.compositor import Highlight, HighlightStyle, compose
+from modules.media_server import MediaRegistry
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "highlighted")
+
+# 원본 내용 해시 (파일이 그대로면 다시 해시하지 않음)
+_registry = MediaRegistry()
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def highlight_key(image_digest: str, highlights: List[Highlight], style: HighlightStyle, convert_rgb: bool) -> str:
+    """결과 캐시 키 (하이라이트 순서가 다르면 번호 배치가 달라지므로 순서도 키에 포함)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(image_digest.encode())
+    digest.update(repr(style).encode())
+    digest.update(b"rgb" if convert_rgb else b"keep")
+    for h in highlights:
+        digest.update(repr((h.number, h.left, h.top, h.right, h.bottom, h.center)).encode())
+    return digest.hexdigest()
+
+
+def cache_path(key: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    return os.path.join(cache_dir, key[:2], f"{key}.png")
+
+
+def _render(image_path: str, highlights: List[Highlight], style: HighlightStyle, convert_rgb: bool, target: str) -> None:
+    with Image.open(image_path) as source:
+        img = source.convert("RGB") if convert_rgb else source.copy()
+    img = compose(img, highlights, style)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    img.save(tmp, "PNG")
+    os.replace(tmp, target)
+
+
+def _shared(path: str) -> bool:
+    """다른 경로와 하드 링크로 묶인 파일인지 (밖에서 고쳐졌을 수 있음)"""
+    try:
+        return os.stat(path).st_nlink > 1
+    except OSError:
+        return False
+
+
+def publish(cached: str, output_path: str) -> None:
+    """캐시 파일을 저장 경로에 복사 (임시 파일에 쓴 뒤 교체, 기존 하드 링크도 끊어짐)"""
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tmp = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(cached, tmp)
+    os.replace(tmp, output_path)
+
+
+def save_highlighted(
+    image_path: str,
+    highlights: List[Highlight],
+    style: HighlightStyle,
+    output_path: Optional[str] = None,
+    convert_rgb: bool = False,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> Tuple[str, bool]:
+    """
+    하이라이트 이미지 저장 (캐시 사용)
+    - convert_rgb: 원본을 RGB로 바꿔서 그림 (False면 원본 모드 유지, 하이라이트가 있으면 합성 결과는 RGB)
+    - output_path가 None이면 캐시 파일 경로를 그대로 반환
+    - 반환: (저장 경로, 캐시 적중 여부) - 적중이고 저장 경로가 이미 같은 결과면 아무것도 쓰지 않음
+    """
+    key = highlight_key(_registry.digest(image_path), highlights, style, convert_rgb)
+    cached = cache_path(key, cache_dir)
+    hit = os.path.exists(cached) and not _shared(cached)
+    if not hit:
+        _render(image_path, highlights, style, convert_rgb, cached)
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+
+    if output_path is None:
+        return cached, hit
+    if hit and os.path.exists(output_path) and _registry.digest(output_path) == _registry.digest(cached):
+        # 이미 같은 결과가 저장되어 있음
+        return output_path, hit
+    publish(cached, output_path)
+    return output_path, hit
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
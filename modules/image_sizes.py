@@ -0,0 +1,113 @@
+"""
+image_sizes.py - 스크린샷 크기 색인 (경로 -> (폭, 높이))
+
+렌더러(render_highlight, render_grouped_highlight, render_test_highlight, 시각화 페이지)와
+저장 함수가 박스 좌표를 맞추려고 그릴 때마다 Image.open으로 크기만 읽고 있었다.
+크기는 한 번만 기록해 두고 메모리 맵에서 돌려준다.
+
+- 기록 시점
+  * 수집(ingest): 페이지가 액션을 로드한 뒤 스크린샷 전체를 한 번 (헤더만 읽음, 디코드 없음)
+  * 특징 추출: 그룹핑 엔진이 pHash용으로 이미지를 열 때 record()
+- 조회: get(path)는 맵에 있으면 파일을 건드리지 않음
+  (파일 교체 감지는 ingest의 stat 비교 / validate=True일 때만)
+
+    from modules.image_sizes import default_index, image_size
+    default_index().ingest(paths)      # 수집 시 한 번
+    width, height = image_size(path)   # 렌더러
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+
+Size = Tuple[int, int]
+
+
+class ImageSizeIndex:
+    """경로 -> 이미지 크기 (스레드 안전, 파일 (mtime, size)와 함께 기록)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # 경로 -> (mtime_ns, 파일 크기, (폭, 높이))
+        self._entries: Dict[str, Tuple[int, int, Size]] = {}
+        self.stats = {"hits": 0, "reads": 0, "recorded": 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return path in self._entries
+
+    def record(self, path: str, size: Size, stat: Optional[os.stat_result] = None) -> None:
+        """이미 연 이미지의 크기 기록 (특징 추출 단계에서 호출)"""
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+        with self._lock:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, (int(size[0]), int(size[1])))
+            self.stats["recorded"] += 1
+
+    def read(self, path: str) -> Size:
+        """파일 헤더에서 크기를 읽어 기록 (읽을 수 없으면 OSError)"""
+        stat = os.stat(path)
+        with Image.open(path) as img:
+            size = img.size
+        with self._lock:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, size)
+            self.stats["reads"] += 1
+        return size
+
+    def _fresh(self, path: str, stat: os.stat_result) -> Optional[Size]:
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        return None
+
+    def get(self, path: str, validate: bool = False) -> Size:
+        """
+        이미지 크기 (맵에 있으면 파일을 건드리지 않음, 없으면 헤더를 한 번 읽어 기록)
+        - validate=True: stat으로 파일이 바뀌었는지 확인 (바뀌었으면 다시 읽음)
+        """
+        if validate:
+            size = self._fresh(path, os.stat(path))
+        else:
+            with self._lock:
+                entry = self._entries.get(path)
+            size = entry[2] if entry is not None else None
+        if size is None:
+            return self.read(path)
+        with self._lock:
+            self.stats["hits"] += 1
+        return size
+
+    def ingest(self, paths: Iterable[str]) -> int:
+        """경로 목록의 크기 기록 (이미 기록되어 있고 파일이 그대로면 건너뜀) -> 새로 읽은 수"""
+        count = 0
+        for path in dict.fromkeys(p for p in paths if p):
+            try:
+                if self._fresh(path, os.stat(path)) is None:
+                    self.read(path)
+                    count += 1
+            except OSError:
+                continue
+        return count
+
+
+_default = ImageSizeIndex()
+
+
+def default_index() -> ImageSizeIndex:
+    """프로세스 공용 크기 색인"""
+    return _default
+
+
+def image_size(path: str, validate: bool = False) -> Size:
+    """공용 색인에서 이미지 크기 (읽을 수 없으면 OSError)"""
+    return _default.get(path, validate=validate)
@@ -0,0 +1,180 @@
+"""
+lazy_metadata.py - domSnapshot 지연 디코딩 metadata 파서
+
+metadata JSON 문자열에서 가장 큰 부분은 domSnapshot이지만, 그룹핑 엔진이 읽는 값은
+label / coordinates / elementBounds 같은 작은 필드뿐이다.
+여기서는 domSnapshot 값의 원문 구간만 잘라 두고 나머지 필드만 파싱하며,
+domSnapshot은 처음 접근할 때 디코딩한다 (DOM 매칭 화면에서만 비용 발생).
+
+    meta = parse_metadata_lazy(action["metadata"])
+    meta.get("coordinates")      # domSnapshot 디코딩 없음
+    meta.get("domSnapshot")      # 이때 한 번 디코딩
+
+같은 metadata 문자열은 캐시된 같은 객체를 돌려주므로 반환 dict는 읽기 전용으로 다룰 것.
+"""
+
+import json
+import re
+import threading
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Dict, Optional, Tuple
+
+from modules import perf
+
+LAZY_KEY = "domSnapshot"
+
+# 문자열 리터럴 (이스케이프 포함)
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+# 문자열 리터럴 또는 괄호 토큰
+_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+_NOT_BRACKET_RE = re.compile(r"[^\[\]{}]+")
+_WS_RE = re.compile(r"\s*")
+_BRACKET_DELTA = {"{": 1, "[": 1, "}": -1, "]": -1}
+
+_DECODE_LOCK = threading.Lock()
+
+
+class LazyMetadata(dict):
+    """
+    lazy 키(domSnapshot)를 원문 문자열로 들고 있다가 처음 접근할 때 디코딩하는 dict
+    - m["domSnapshot"], m.get("domSnapshot"), "domSnapshot" in m 모두 지원
+    - keys()/items() 등 순회에는 디코딩 전 lazy 키가 포함되지 않는다
+    """
+
+    def __init__(self, data: Dict[str, Any], lazy: Dict[str, str]) -> None:
+        super().__init__(data)
+        self._lazy = dict(lazy)
+
+    def _decode(self, key: str) -> Any:
+        with _DECODE_LOCK:
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+            raw = self._lazy.pop(key)
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError:
+                value = None
+            perf.count(perf.DOM_DECODES)
+            dict.__setitem__(self, key, value)
+            return value
+
+    def __missing__(self, key: str) -> Any:
+        if key in self._lazy:
+            return self._decode(key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self._lazy
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if key in self._lazy:
+            return self._decode(key)
+        return default
+
+    def raw(self, key: str) -> Optional[str]:
+        """디코딩 전 원문 (이미 디코딩됐거나 없으면 None)"""
+        return self._lazy.get(key)
+
+    def is_lazy(self, key: str) -> bool:
+        """아직 디코딩되지 않은 lazy 키인지"""
+        return key in self._lazy
+
+
+# =========================
+# 값 구간 찾기
+# =========================
+
+def _value_is_complete(raw: str) -> bool:
+    """raw가 괄호로 시작해서 마지막 글자에서 처음으로 깊이 0이 되는 단일 객체/배열인지 (C 수준 정규식 위주)"""
+    if not raw or raw[0] not in "{[" or raw[-1] not in "}]":
+        return False
+    brackets = _NOT_BRACKET_RE.sub("", _STRING_RE.sub('""', raw))
+    depths = list(accumulate(_BRACKET_DELTA[c] for c in brackets))
+    return depths[-1] == 0 and min(depths[:-1], default=1) > 0
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """pos에서 시작하는 객체/배열 값의 끝 위치 (토큰 단위 스캔)"""
+    depth = 0
+    for m in _TOKEN_RE.finditer(text, pos):
+        token = m.group()
+        if token[0] == '"':
+            continue
+        depth += _BRACKET_DELTA[token]
+        if depth == 0:
+            return m.end()
+    raise ValueError("닫히지 않은 JSON 값")
+
+
+def _split_lazy(text: str, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    최상위 key의 값 원문을 잘라내고 나머지 필드를 파싱
+    반환: (나머지 필드 dict, 값 원문) / 최상위 key가 아니거나 형식이 다르면 None
+    """
+    needle = json.dumps(key)
+    start = text.find(needle)
+    while start != -1:
+        prefix = text[:start].rstrip()
+        colon = _WS_RE.match(text, start + len(needle)).end()
+        if colon < len(text) and text[colon] == ":":
+            value_start = _WS_RE.match(text, colon + 1).end()
+            head = _parse_head(prefix)
+            if head is not None and value_start < len(text) and text[value_start] in "{[":
+                # 1) 마지막 키인 경우: 끝의 "}" 직전까지가 값 (괄호 검증만)
+                body = text.rstrip()
+                if body.endswith("}"):
+                    raw = body[value_start:-1].rstrip()
+                    if _value_is_complete(raw):
+                        return head, raw
+                # 2) 뒤에 다른 키가 있는 경우: 값 끝을 스캔하고 나머지를 이어서 파싱
+                value_end = _skip_value(text, value_start)
+                rest = text[value_end:].lstrip()
+                if rest.startswith(","):
+                    tail = json.loads("{" + rest[1:])
+                    head.update(tail)
+                return head, text[value_start:value_end]
+        start = text.find(needle, start + 1)
+    return None
+
+
+def _parse_head(prefix: str) -> Optional[Dict[str, Any]]:
+    """'{ ... ,' 형태의 앞부분이 최상위 객체의 완전한 필드 목록이면 파싱 결과"""
+    if prefix.endswith(","):
+        prefix = prefix[:-1]
+    if not prefix.startswith("{"):
+        return None
+    try:
+        head = json.loads(prefix + "}")
+    except json.JSONDecodeError:
+        return None
+    return head if isinstance(head, dict) else None
+
+
+# 같은 액션의 metadata를 여러 번 읽는 엔진(ScreenGrouper 등)을 위한 캐시.
+# 키로 원문 문자열을 잡고 있으므로 크기를 작게 유지한다.
+@lru_cache(maxsize=256)
+def _parse_text(text: str) -> Dict[str, Any]:
+    if f'"{LAZY_KEY}"' in text:
+        try:
+            split = _split_lazy(text, LAZY_KEY)
+        except (ValueError, json.JSONDecodeError):
+            split = None
+        if split is not None:
+            head, raw = split
+            return LazyMetadata(head, {LAZY_KEY: raw})
+    return json.loads(text)
+
+
+def parse_metadata_lazy(metadata: Any) -> Dict[str, Any]:
+    """
+    metadata(dict 또는 JSON 문자열) -> dict
+    domSnapshot이 있으면 LazyMetadata로 반환. 잘못된 JSON이면 json.JSONDecodeError.
+    """
+    if metadata is None:
+        return {}
+    if isinstance(metadata, dict):
+        return metadata
+    return _parse_text(metadata)
@@ -1,10 +1,35 @@
 import json
 
+from modules.string_table import StringTable, interning_hook
 
-def load_actions(json_path: str):
-    """Load actions from a JSON file."""
+
+def load_actions(json_path: str, dom_store=None, string_table=None, intern_strings=True):
+    """Load actions from a JSON file.
+
+    dom_store(modules.dom_store.DomStore)를 넘기면 metadata.domSnapshot을 저장소로 옮기고
+    액션에는 dom_snapshot_id만 남긴다.
+    """
     with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+        text = f.read()
+    return loads_actions(text, dom_store=dom_store, string_table=string_table, intern_strings=intern_strings)
+
+
+def loads_actions(text: str, dom_store=None, string_table=None, intern_strings=True):
+    """{쿼리 키: [액션, ...]} 형태의 JSON 문자열에서 액션 리스트 추출.
+
+    반복되는 문자열 필드(class_name, tag_name, action_type, created_by, screen_name)는
+    파싱하는 동안 string_table(modules.string_table.StringTable, 없으면 실행 단위로 새로 생성)의
+    공유 객체로 바꾼다. 중복 문자열이 액션 하나를 만들 때마다 바로 해제되므로 최대 메모리도 줄어든다.
+    (intern_strings=False면 바꾸지 않음 - 메모리 비교용)
+    """
+    hook = None
+    if intern_strings:
+        hook = interning_hook(string_table if string_table is not None else StringTable())
+    data = json.loads(text, object_hook=hook)
 
     key = list(data.keys())[0]
-    return data[key]
+    actions = data[key]
+    if dom_store is not None:
+        from modules.dom_store import intern_actions
+        actions = intern_actions(actions, dom_store)
+    return actions
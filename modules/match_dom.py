@@ -1,52 +1,209 @@
-def match_clicked_dom(action, dom_snapshot):
-    """Match clicked coordinates to DOM nodes in the snapshot.
-    
-    좌표 우선순위: pageX/pageY > clientX/clientY > x/y
-    - pageX/pageY: 전체 페이지 기준 좌표
-    - clientX/clientY: 브라우저 viewport 기준 좌표
-    """
-    coords = action["metadata"]["coordinates"]
-    
-    # 좌표 추출 (우선순위: pageX/pageY > clientX/clientY > x/y)
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+# 스냅샷별 공간 인덱스 캐시 크기 (id 재사용을 막기 위해 스냅샷 참조도 함께 보관)
+_INDEX_CACHE_SIZE = 32
+_INDEX_CACHE = OrderedDict()
+
+# 배치 매칭 시 (클릭 수 × 노드 수) 불리언 행렬 한 번의 최대 원소 수
+_BATCH_CHUNK_ELEMENTS = 4_000_000
+
+# 노드가 이 개수보다 많은 셀을 덮으면 셀이 2배 큰 상위 그리드 단계에 보관 (body, 컨테이너, 스크롤 영역 등)
+_MAX_CELLS_PER_NODE = 64
+
+
+def _node_result(node):
+    """매칭 결과 dict (match_clicked_dom 반환 형식)"""
+    return {
+        "nodeId": node.get("nodeId"),
+        "tag": node.get("tagName"),
+        "text": node.get("text"),
+        "attributes": node.get("attributes"),
+        "bounds": node.get("bounds"),
+    }
+
+
+def click_point(coords):
+    """좌표 dict -> (x, y) (우선순위: pageX/pageY > clientX/clientY > x/y)"""
+    coords = coords or {}
     cx = coords.get("pageX") or coords.get("clientX") or coords.get("x")
     cy = coords.get("pageY") or coords.get("clientY") or coords.get("y")
-    
-    if cx is None or cy is None:
-        return None
+    return cx, cy
+
+
+def _click_point(action):
+    return click_point(action["metadata"]["coordinates"])
+
+
+class DomSpatialIndex:
+    """
+    DOM 스냅샷 노드 bounds에 대한 계층 그리드 공간 인덱스
+
+    - 노드를 (면적, 원래 순서)로 정렬해 두고 셀마다 그 순서대로 보관
+      → 셀 목록에서 처음 포함되는 노드가 곧 가장 작은 노드 (면적이 같으면 먼저 나온 노드, 기존 min과 동일)
+    - 단계 k의 셀 크기 = cell_size × 2^k, 노드는 _MAX_CELLS_PER_NODE 이하의 셀을 덮는 가장 촘촘한 단계에 들어감
+      (마지막 단계는 셀 하나가 전체 범위를 덮으므로 모든 노드가 어느 단계엔가 들어감)
+    - 조회: 단계마다 점이 속한 셀 하나만 보고 (단계 수 = O(log 노드 수)) 그중 가장 작은 정렬 인덱스
+      → 큰 컨테이너가 많아도 선형 스캔 없음
+    """
+
+    def __init__(self, nodes):
+        entries = []
+        for order, node in enumerate(nodes):
+            b = node.get("bounds")
+            if not b:
+                continue
+            left, top = b["left"], b["top"]
+            right, bottom = left + b["width"], top + b["height"]
+            entries.append((b["width"] * b["height"], order, left, top, right, bottom, node))
+        entries.sort(key=lambda e: (e[0], e[1]))
+        self.entries = entries
+        self._arrays = None
+        # 단계별 {(gx, gy): [정렬 인덱스, ...]}
+        self.levels = []
+
+        if not entries:
+            self.min_x = self.min_y = 0.0
+            self.cell_size = 1.0
+            return
 
-    nodes = dom_snapshot.get("nodes", [])
-    candidates = []
+        self.min_x = min(e[2] for e in entries)
+        self.min_y = min(e[3] for e in entries)
+        max_x = max(e[4] for e in entries)
+        max_y = max(e[5] for e in entries)
 
-    def contains_point(b, x, y):
-        """Check if a point is within bounds."""
+        # 셀 하나에 노드 몇 개 정도가 들어가도록 크기 결정
+        extent = max(max_x - self.min_x, max_y - self.min_y, 1.0)
+        self.cell_size = max(extent / max(1.0, math.sqrt(len(entries))), 1.0)
+        # 셀 하나가 전체 범위를 덮는 단계까지
+        level_count = max(1, math.ceil(math.log2(max(extent / self.cell_size, 1.0))) + 1)
+        self.levels = [{} for _ in range(level_count)]
+
+        for idx, e in enumerate(entries):
+            for level, cells in enumerate(self.levels):
+                x0, y0 = self._cell(e[2], e[3], level)
+                x1, y1 = self._cell(e[4], e[5], level)
+                if (x1 - x0 + 1) * (y1 - y0 + 1) <= _MAX_CELLS_PER_NODE or level == level_count - 1:
+                    break
+            for gx in range(x0, x1 + 1):
+                for gy in range(y0, y1 + 1):
+                    cells.setdefault((gx, gy), []).append(idx)
+        # 노드가 없는 단계는 조회에서 제외
+        self._occupied = [(level, cells) for level, cells in enumerate(self.levels) if cells]
+
+    def _cell(self, x, y, level=0):
+        size = self.cell_size * (1 << level)
         return (
-            b["top"] <= y <= b["top"] + b["height"] and
-            b["left"] <= x <= b["left"] + b["width"]
+            int(math.floor((x - self.min_x) / size)),
+            int(math.floor((y - self.min_y) / size)),
         )
 
-    # 후보 찾기
-    for node in nodes:
-        bounds = node.get("bounds")
-        if not bounds:
-            continue
+    def _first_containing(self, indices, x, y):
+        for idx in indices:
+            _, _, left, top, right, bottom, _ = self.entries[idx]
+            if top <= y <= bottom and left <= x <= right:
+                return idx
+        return None
+
+    def query(self, x, y):
+        """(x, y)를 포함하는 가장 작은 노드 (없으면 None)"""
+        if not self.entries:
+            return None
+        best = None
+        for level, cells in self._occupied:
+            found = self._first_containing(cells.get(self._cell(x, y, level), ()), x, y)
+            # 모든 셀 목록이 정렬 인덱스 순서이므로 더 작은 인덱스가 (면적, 순서) 기준 최소
+            if found is not None and (best is None or found < best):
+                best = found
+        return None if best is None else self.entries[best][6]
+
+    def arrays(self):
+        """(left, top, right, bottom) NumPy 배열 — (면적, 순서) 정렬 순서, 배치 매칭용으로 한 번만 생성"""
+        if self._arrays is None:
+            data = np.array([e[2:6] for e in self.entries], dtype=np.float64).reshape(-1, 4)
+            self._arrays = tuple(data[:, i] for i in range(4))
+        return self._arrays
+
+    def query_batch(self, points):
+        """
+        여러 점을 한 번에 조회 (브로드캐스팅)
+        points: [(x, y), ...] → 노드 리스트 (포함 노드가 없으면 None)
+        """
+        results = [None] * len(points)
+        if not self.entries or not points:
+            return results
+
+        left, top, right, bottom = self.arrays()
+        xy = np.array(points, dtype=np.float64).reshape(-1, 2)
+        chunk = max(1, _BATCH_CHUNK_ELEMENTS // len(self.entries))
 
-        if contains_point(bounds, cx, cy):
-            candidates.append(node)
+        for start in range(0, len(xy), chunk):
+            px = xy[start:start + chunk, 0:1]
+            py = xy[start:start + chunk, 1:2]
+            inside = (top <= py) & (py <= bottom) & (left <= px) & (px <= right)
+            # 정렬 순서상 첫 True = 가장 작은 노드 (동점이면 먼저 나온 노드)
+            first = np.argmax(inside, axis=1)
+            hit = inside[np.arange(len(first)), first]
+            for offset in np.flatnonzero(hit):
+                results[start + offset] = self.entries[first[offset]][6]
+        return results
+
+
+def get_dom_index(dom_snapshot):
+    """스냅샷 객체별 공간 인덱스 (한 번 만들고 캐시에서 재사용)"""
+    key = id(dom_snapshot)
+    cached = _INDEX_CACHE.get(key)
+    if cached is not None and cached[0] is dom_snapshot:
+        _INDEX_CACHE.move_to_end(key)
+        return cached[1]
+
+    index = DomSpatialIndex(dom_snapshot.get("nodes", []))
+    _INDEX_CACHE[key] = (dom_snapshot, index)
+    if len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+        _INDEX_CACHE.popitem(last=False)
+    return index
+
+
+def match_clicked_dom(action, dom_snapshot):
+    """Match clicked coordinates to DOM nodes in the snapshot.
 
-    if not candidates:
+    좌표 우선순위: pageX/pageY > clientX/clientY > x/y
+    - pageX/pageY: 전체 페이지 기준 좌표
+    - clientX/clientY: 브라우저 viewport 기준 좌표
+
+    같은 스냅샷 객체는 공간 인덱스를 한 번만 만들고 재사용한다.
+    (스냅샷의 nodes를 제자리에서 수정했다면 새 dict로 넘길 것)
+    """
+    cx, cy = _click_point(action)
+    if cx is None or cy is None:
         return None
 
-    # 가장 작은 노드 선택
-    def area(b):
-        """Calculate area of bounds."""
-        return b["width"] * b["height"]
+    # 포함하는 노드 중 가장 작은 노드 선택
+    best = get_dom_index(dom_snapshot).query(cx, cy)
+    if best is None:
+        return None
+    return _node_result(best)
 
-    best = min(candidates, key=lambda n: area(n["bounds"]))
 
-    return {
-        "nodeId": best.get("nodeId"),
-        "tag": best.get("tagName"),
-        "text": best.get("text"),
-        "attributes": best.get("attributes"),
-        "bounds": best.get("bounds"),
-    }
+def match_clicked_dom_batch(dom_snapshot, points):
+    """
+    한 스냅샷에 대한 여러 클릭을 한 번에 매칭
+
+    points: [(x, y), ...] (좌표가 없는 클릭은 None 또는 (None, None))
+    반환: points와 같은 길이의 리스트 — match_clicked_dom과 같은 dict 또는 None
+    """
+    valid = [
+        i for i, p in enumerate(points)
+        if p is not None and p[0] is not None and p[1] is not None
+    ]
+    results = [None] * len(points)
+    if not valid:
+        return results
+
+    nodes = get_dom_index(dom_snapshot).query_batch([points[i] for i in valid])
+    for i, node in zip(valid, nodes):
+        if node is not None:
+            results[i] = _node_result(node)
+    return results
@@ -0,0 +1,380 @@
+"""
+media_server.py - 스크린샷 로컬 미디어 서버 (내용 해시 URL + 장기 캐시)
+
+하이라이트 렌더러들이 Streamlit rerun마다 원본 PNG를 base64로 HTML에 넣고 있었다.
+(원본보다 약 33% 크고, 같은 이미지를 매번 다시 보냄)
+이 모듈은 스크린샷을 내용 해시 URL(/media/<해시>.png)로 제공하는 작은 HTTP 서버를
+백그라운드 스레드로 한 번만 띄우고, 렌더러는 <img src>에 URL만 넣는다.
+
+- URL이 내용 해시이므로 응답은 불변: Cache-Control: public, max-age=1년, immutable
+- ETag = 내용 해시, If-None-Match 일치 시 304
+- 파일이 바뀌면 해시(= URL)도 바뀜 (mtime/size가 달라지면 다시 해시)
+
+    from modules.media_server import image_src
+    html = f'<img src="{image_src(path)}">'
+    link = f'<a href="{download_url(path, "screen_1.png")}">다운로드</a>'   # 첨부 파일로 스트리밍
+
+디렉터리 마운트(/static/<이름>/<상대 경로>)는 내용 주소 디렉터리(타일 피라미드 등)를 파일마다 해시하지 않고
+그대로 제공한다. 디렉터리 이름에 내용 해시가 들어 있으므로 응답은 마찬가지로 불변 캐시.
+
+    base = mount_url("tiles", ".cache/tiles")   # -> <외부 주소>/static/tiles/
+
+설정 (환경 변수가 .streamlit/secrets.toml의 [media_server]보다 우선, 모듈 로드 시 한 번 읽음):
+
+    MEDIA_SERVER_URL      / url      브라우저가 접근할 외부 주소 (예: http://10.0.0.5:8765, 리버스 프록시 주소)
+    MEDIA_SERVER_HOST     / host     바인드 주소 (기본 127.0.0.1, 원격 브라우저가 직접 붙으면 0.0.0.0)
+    MEDIA_SERVER_PORT     / port     포트 (기본 8765)
+    MEDIA_SERVER_ENABLED  / enabled  켜기/끄기 (기본 켬)
+
+기본값은 켜짐: 처음 쓸 때 http://127.0.0.1:8765 에 서버를 띄운다 (포트가 사용 중이면 임의 포트).
+서버 URL은 브라우저가 직접 여는 주소라서 127.0.0.1은 Streamlit과 같은 컴퓨터의 브라우저에서만 열린다.
+원격 브라우저에서 쓰면 MEDIA_SERVER_URL(+ HOST)을 지정하거나 MEDIA_SERVER_ENABLED=0으로 끈다.
+url을 지정했으면 그 주소가 가리키는 포트가 곧 서버 포트이므로, 포트가 사용 중이어도 다른 포트로 옮기지 않고
+시작 실패로 처리한다. 꺼져 있거나 서버를 띄울 수 없으면 image_src()는 기존처럼 data URI를 돌려주고
+download_url() / mount_url()은 None (호출하는 쪽이 st.download_button / 기존 렌더러로 대체).
+
+서버는 인증이 없다: /media는 앱이 등록한 파일의 내용 해시(128bit)로만, /static은 마운트한 디렉터리
+안의 파일만 제공한다. 바인드 주소를 넓히면 같은 네트워크에서 그 파일들을 받을 수 있다는 점에 유의.
+"""
+
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MEDIA_PREFIX = "/media/"
+STATIC_PREFIX = "/static/"
+# 내용 해시 URL이므로 사실상 영구 캐시
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_HASH_CHUNK = 1024 * 1024
+_MEDIA_PATH = re.compile(r"^/media/([0-9a-f]{32})(\.[A-Za-z0-9]+)?$")
+_STATIC_PATH = re.compile(r"^/static/([A-Za-z0-9_-]+)/(.+)$")
+
+
+def content_hash(path: str) -> str:
+    """파일 내용 해시 (blake2b 128bit, hex 32자)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# =========================
+# 해시 레지스트리
+# =========================
+
+class MediaRegistry:
+    """
+    경로 <-> 내용 해시 테이블 (스레드 안전)
+    - 경로별로 (mtime, size, 해시)를 기억해 파일이 그대로면 다시 해시하지 않음
+    - 서버는 해시로 경로를 찾고, 그 사이 파일이 바뀌었으면 응답하지 않음
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_path: Dict[str, Tuple[float, int, str]] = {}
+        self._by_hash: Dict[str, str] = {}
+
+    def digest(self, path: str) -> str:
+        """경로 -> 내용 해시 (등록)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._by_path.get(path)
+        if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = content_hash(path)
+        with self._lock:
+            self._by_path[path] = (stat.st_mtime, stat.st_size, digest)
+            self._by_hash[digest] = path
+        return digest
+
+    def resolve(self, digest: str) -> Optional[str]:
+        """해시 -> 경로 (등록되지 않았거나 내용이 바뀌었으면 None)"""
+        with self._lock:
+            path = self._by_hash.get(digest)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            if self.digest(path) != digest:
+                return None
+        except OSError:
+            return None
+        return path
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_hash)
+
+
+# =========================
+# HTTP 서버
+# =========================
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    """GET/HEAD /media/<해시>.<확장자>, /static/<마운트 이름>/<상대 경로>"""
+
+    server_version = "ScreenshotMedia/1.0"
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        if url.path.startswith(STATIC_PREFIX):
+            self._serve_static(url, send_body)
+            return
+        match = _MEDIA_PATH.match(url.path)
+        path = self.server.registry.resolve(match.group(1)) if match else None
+        if path is None:
+            self.send_error(404)
+            return
+        self._send_file(path, f'"{match.group(1)}"', url, send_body)
+
+    def _serve_static(self, url, send_body: bool) -> None:
+        match = _STATIC_PATH.match(url.path)
+        root = self.server.mounts.get(match.group(1)) if match else None
+        if root is None:
+            self.send_error(404)
+            return
+        # 마운트 디렉터리 밖으로 나가는 경로(..)는 거부
+        path = os.path.realpath(os.path.join(root, match.group(2)))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        etag = f'"{hashlib.blake2b(url.path.encode(), digest_size=16).hexdigest()}"'
+        self._send_file(path, etag, url, send_body)
+
+    def _send_file(self, path: str, etag: str, url, send_body: bool) -> None:
+        if etag in _etags(self.headers.get("If-None-Match")):
+            self.send_response(304)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(404)
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(size))
+            # ?download=<파일명>: 첨부 파일로 받기
+            filename = parse_qs(url.query).get("download", [None])[0]
+            if filename:
+                self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(os.path.basename(filename))}")
+            self._send_cache_headers(etag)
+            self.end_headers()
+            if send_body:
+                shutil.copyfileobj(f, self.wfile)
+
+    def _send_cache_headers(self, etag: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", CACHE_CONTROL)
+
+    def log_message(self, format, *args) -> None:
+        # Streamlit 콘솔에 요청 로그를 남기지 않음
+        pass
+
+
+def _etags(header: Optional[str]):
+    if not header:
+        return ()
+    return tuple(tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class MediaServer:
+    """내용 해시 URL로 파일을 제공하는 백그라운드 HTTP 서버"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, public_url: Optional[str] = None) -> None:
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.registry = MediaRegistry()
+        # 마운트 이름 -> 디렉터리 (realpath)
+        self.mounts: Dict[str, str] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._httpd is not None
+
+    def start(self) -> "MediaServer":
+        """
+        서버 시작 (포트가 사용 중이면 임의 포트로 재시도)
+        public_url이 있으면 외부 주소가 이 포트를 가리키므로 재시도하지 않고 OSError를 그대로 올림
+        """
+        if self._httpd is not None:
+            return self
+        try:
+            httpd = ThreadingHTTPServer((self.host, self.port), _MediaHandler)
+        except OSError:
+            if self.public_url:
+                raise
+            httpd = ThreadingHTTPServer((self.host, 0), _MediaHandler)
+        httpd.daemon_threads = True
+        httpd.registry = self.registry
+        httpd.mounts = self.mounts
+        self.port = httpd.server_address[1]
+        self._httpd = httpd
+        self._thread = threading.Thread(target=httpd.serve_forever, name="media-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        if self.public_url:
+            return self.public_url.rstrip("/")
+        return f"http://{self.host}:{self.port}"
+
+    def mount(self, name: str, directory: str) -> str:
+        """디렉터리를 /static/<name>/ 아래에 제공 -> 기준 URL (디렉터리 내용은 불변이어야 함)"""
+        os.makedirs(directory, exist_ok=True)
+        self.mounts[name] = os.path.realpath(directory)
+        return f"{self.base_url}{STATIC_PREFIX}{name}/"
+
+    def url_for(self, path: str) -> str:
+        """파일 경로 -> 내용 해시 URL"""
+        digest = self.registry.digest(path)
+        ext = os.path.splitext(path)[1].lower()
+        return f"{self.base_url}{MEDIA_PREFIX}{digest}{ext}"
+
+
+# =========================
+# 기본 서버
+# =========================
+
+ENV_PREFIX = "MEDIA_SERVER_"
+SECRETS_SECTION = "media_server"
+
+
+def _secrets_section() -> Dict[str, Any]:
+    """st.secrets의 [media_server] (Streamlit 밖이거나 secrets.toml이 없으면 빈 dict)"""
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return {}
+    try:
+        section = st.secrets.get(SECRETS_SECTION)
+    except Exception:
+        return {}
+    return dict(section) if section else {}
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def load_settings() -> Dict[str, Any]:
+    """환경 변수 / st.secrets에서 기본 서버 설정 (enabled를 지정하지 않으면 활성)"""
+    section = _secrets_section()
+
+    def value(key: str) -> Any:
+        env = os.environ.get(f"{ENV_PREFIX}{key.upper()}")
+        return env if env else section.get(key)
+
+    public_url = value("url") or None
+    enabled = value("enabled")
+    return {
+        "host": value("host") or DEFAULT_HOST,
+        "port": int(value("port") or DEFAULT_PORT),
+        "public_url": public_url,
+        "enabled": True if enabled is None else _truthy(enabled),
+    }
+
+
+_server: Optional[MediaServer] = None
+_server_lock = threading.Lock()
+_settings = load_settings()
+
+
+def configure(host: Optional[str] = None, port: Optional[int] = None, public_url: Optional[str] = None, enabled: Optional[bool] = None) -> None:
+    """기본 서버 설정 변경 (환경 변수 / st.secrets 설정을 덮어씀, 이미 떠 있는 서버는 내림)"""
+    global _server
+    with _server_lock:
+        if host is not None:
+            _settings["host"] = host
+        if port is not None:
+            _settings["port"] = port
+        if public_url is not None:
+            _settings["public_url"] = public_url
+        if enabled is not None:
+            _settings["enabled"] = enabled
+        if _server is not None:
+            _server.stop()
+            _server = None
+
+
+def get_media_server() -> Optional[MediaServer]:
+    """기본 서버 (처음 호출 시 시작, 비활성이거나 시작할 수 없으면 None)"""
+    global _server
+    with _server_lock:
+        if not _settings["enabled"]:
+            return None
+        if _server is None:
+            try:
+                _server = MediaServer(_settings["host"], _settings["port"], _settings["public_url"]).start()
+            except OSError as e:
+                print(f"⚠️ 미디어 서버 시작 실패, data URI 사용: {e}")
+                _settings["enabled"] = False
+                return None
+        return _server
+
+
+def data_uri(path: str) -> str:
+    """파일 -> data URI (서버를 쓸 수 없을 때의 기존 방식)"""
+    mime = mimetypes.guess_type(path)[0] or "image/png"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+def download_url(path: str, filename: Optional[str] = None) -> Optional[str]:
+    """첨부 파일 다운로드 URL (서버가 파일을 스트리밍, 서버를 쓸 수 없으면 None)"""
+    server = get_media_server()
+    if server is None:
+        return None
+    return f"{server.url_for(path)}?download={quote(filename or os.path.basename(path))}"
+
+
+def mount_url(name: str, directory: str) -> Optional[str]:
+    """디렉터리 마운트 기준 URL (서버를 쓸 수 없으면 None)"""
+    server = get_media_server()
+    if server is None:
+        return None
+    return server.mount(name, directory)
+
+
+def image_src(path: str) -> str:
+    """<img src>에 넣을 값: 미디어 서버 URL (불가하면 data URI)"""
+    server = get_media_server()
+    if server is None:
+        return data_uri(path)
+    return server.url_for(path)
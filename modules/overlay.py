@@ -0,0 +1,109 @@
+"""
+overlay.py - 스크린샷 하이라이트 오버레이 Streamlit 컴포넌트
+
+렌더러마다 HTML + 스크립트를 새로 만들어 넣던 방식(setInterval 폴링, MutationObserver,
+console.log 덤프) 대신, 정적 프런트엔드 하나(overlay_component/index.html)를
+모든 하이라이트가 공유한다. 파이썬 쪽은 이미지 URL과 비율 박스 목록만 넘긴다.
+
+- 박스: (left, top, width, height) 이미지 대비 비율 (0~1)
+- 점:   (x, y) 이미지 대비 비율 -> point_size px 원
+- canvas는 이미지 load / 크기 변경 때만 다시 그림 (폴링 없음)
+- 디버그 로그는 debug=True (또는 DEBUG = True)일 때만
+
+    boxes = [ratio_box(bounds, viewport=(vp_w, vp_h))]
+    render_overlay(image_path, boxes, labels=True, max_height=600, key=f"overlay_{idx}")
+"""
+
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import streamlit.components.v1 as components
+
+from modules.previews import preview_src
+
+# 프로덕션 기본값: 브라우저 콘솔 로그 없음
+DEBUG = False
+
+_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "overlay_component")
+_component = components.declare_component("screenshot_overlay", path=_COMPONENT_DIR)
+
+# 박스 좌표 소수점 자리 (JSON 크기 절약, 4K 화면에서도 1px 미만 오차)
+_PRECISION = 5
+
+
+def ratio_box(
+    bounds: Dict[str, Any],
+    viewport: Optional[Tuple[float, float]] = None,
+    image_size: Optional[Tuple[float, float]] = None,
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    elementBounds -> (left, top, width, height) 비율
+    - topRatio/leftRatio/widthRatio/heightRatio가 있으면 그대로
+    - 없으면 px 값을 viewport (없으면 image_size) 크기로 나눔
+    """
+    if not bounds:
+        return None
+    ratios = (bounds.get("leftRatio"), bounds.get("topRatio"), bounds.get("widthRatio"), bounds.get("heightRatio"))
+    if None not in ratios:
+        return tuple(float(r) for r in ratios)
+
+    size = viewport if viewport and all(viewport) else image_size
+    if not size or not all(size):
+        return None
+    width, height = float(size[0]), float(size[1])
+    return (
+        max(0.0, float(bounds.get("left", 0) or 0)) / width,
+        max(0.0, float(bounds.get("top", 0) or 0)) / height,
+        float(bounds.get("width", 0) or 0) / width,
+        float(bounds.get("height", 0) or 0) / height,
+    )
+
+
+def ratio_point(x: float, y: float, size: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+    """좌표 (px) -> (x, y) 비율 (size = 좌표 기준 크기: viewport 또는 이미지)"""
+    if x is None or y is None or not size or not all(size):
+        return None
+    return float(x) / float(size[0]), float(y) / float(size[1])
+
+
+def _compact(boxes: Iterable[Optional[Sequence[float]]]) -> List[List[float]]:
+    return [[round(float(v), _PRECISION) for v in box] for box in boxes if box]
+
+
+def render_overlay(
+    image_path: str,
+    boxes: Iterable[Optional[Sequence[float]]],
+    stroke: str = "red",
+    fill: str = "rgba(255, 0, 0, 0.2)",
+    line_width: int = 3,
+    labels: bool = False,
+    label_color: str = "red",
+    label_fill: str = "white",
+    label_size: int = 12,
+    point_size: int = 20,
+    max_height: Optional[int] = None,
+    zoom: bool = False,
+    key: Optional[str] = None,
+    debug: Optional[bool] = None,
+) -> None:
+    """
+    이미지 위에 비율 박스/점을 그려서 표시
+    - 이미지는 표시 크기 축소본 URL (zoom=True면 원본)
+    - 같은 페이지에서 같은 이미지를 여러 번 그리면 key를 지정해야 함
+    """
+    _component(
+        src=preview_src(image_path, max_height=max_height, zoom=zoom),
+        boxes=_compact(boxes),
+        stroke=stroke,
+        fill=fill,
+        line_width=line_width,
+        labels=labels,
+        label_color=label_color,
+        label_fill=label_fill,
+        label_size=label_size,
+        point_size=point_size,
+        max_height=max_height,
+        debug=DEBUG if debug is None else debug,
+        key=key,
+        default=None,
+    )
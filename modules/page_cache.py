@@ -0,0 +1,95 @@
+"""
+page_cache.py - Streamlit 페이지 캐시 키 / 공용 캐시
+
+Streamlit은 위젯을 하나 만질 때마다(expander 펼치기, 체크박스, 페이지 이동) 페이지 스크립트를
+처음부터 다시 실행하고, 페이지들은 그때마다 JSON 로드 / 그룹핑 / 이미지 분석을 다시 했다.
+여기서는 캐시 키로 쓸 내용 해시와 공용 캐시 함수를 모아 둔다.
+
+- 액션 JSON: 내용 해시 (mtime/size가 그대로면 다시 해시하지 않음)
+- 스크린샷: 액션이 가리키는 파일들의 (경로, mtime, size) 해시 (바뀌거나 생기거나 없어지면 키가 바뀜)
+- 액션 / 그룹핑 / 분석 결과는 st.cache_resource (복사하지 않고 공유)
+  * 화면 dict의 prev_screenshots 등이 액션 객체 id를 키로 쓰므로 cache_data처럼 복사하면 안 됨
+  * 공유 객체이므로 읽기 전용으로 다루거나, 몇 번 해도 결과가 같은 변경(정렬 등)만 할 것
+- 직렬화 가능한 결과(문자열, 표)는 st.cache_data
+- 스크린샷 크기는 스크린샷 해시가 바뀔 때만 크기 색인(modules.image_sizes)에 다시 기록
+- 사이드바 "🧹 캐시 비우기"로 명시적 초기화 (딥줌 타일 피라미드 디스크 캐시 포함)
+
+    json_digest = file_digest(json_file)
+    actions = cached_actions(json_file, json_digest)
+    shots_digest = screenshots_digest(actions)
+    ingest_image_sizes(shots_digest, actions)
+
+    @st.cache_resource(max_entries=4)
+    def cached_screens(json_digest, shots_digest, _actions):
+        return group_actions_by_screen(_actions)
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, Iterable, List
+
+import streamlit as st
+
+from modules.image_sizes import default_index
+from modules.loader import load_actions
+from modules.media_server import MediaRegistry
+from modules.tiles import default_tiles
+
+SCREENSHOT_FIELDS = ("screenshot_real_path", "screenshot_path")
+
+# 파일 내용 해시 (mtime/size가 그대로면 다시 해시하지 않음)
+_registry = MediaRegistry()
+
+
+def file_digest(path: str) -> str:
+    """파일 내용 해시 (캐시 키용)"""
+    return _registry.digest(path)
+
+
+def screenshot_paths(actions: Iterable[Dict[str, Any]], fields: Iterable[str] = SCREENSHOT_FIELDS) -> List[str]:
+    """액션이 가리키는 스크린샷 경로 (중복 제거, 등장 순서)"""
+    paths: Dict[str, None] = {}
+    for action in actions:
+        for field in fields:
+            path = action.get(field)
+            if path:
+                paths[path] = None
+    return list(paths)
+
+
+def screenshots_digest(actions: Iterable[Dict[str, Any]], fields: Iterable[str] = SCREENSHOT_FIELDS) -> str:
+    """액션이 가리키는 스크린샷 파일들의 (경로, mtime, size) 해시 (내용은 읽지 않음)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in screenshot_paths(actions, fields):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+        except OSError:
+            digest.update(f"{path}\0-\n".encode())
+    return digest.hexdigest()
+
+
+@st.cache_resource(max_entries=8, show_spinner="📥 액션 로드 중...")
+def cached_actions(json_path: str, json_digest: str):
+    """load_actions 결과 (json_digest는 캐시 키: 파일 내용이 바뀌면 다시 로드)"""
+    return load_actions(json_path)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def ingest_image_sizes(shots_digest: str, _actions) -> int:
+    """스크린샷 크기를 크기 색인에 기록 (shots_digest가 바뀔 때만 실행) -> 새로 읽은 수"""
+    return default_index().ingest(screenshot_paths(_actions))
+
+
+def clear_caches() -> None:
+    """모든 페이지 캐시 초기화 (.cache/tiles 타일 피라미드도 삭제)"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    default_tiles().clear()
+
+
+def render_cache_controls() -> None:
+    """사이드바 캐시 초기화 버튼"""
+    if st.sidebar.button("🧹 캐시 비우기", help="JSON/스크린샷 변경은 자동으로 감지합니다. 그 밖의 이유로 다시 계산할 때 사용"):
+        clear_caches()
+        st.sidebar.success("✅ 캐시를 비웠습니다.")
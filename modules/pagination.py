@@ -0,0 +1,97 @@
+"""
+pagination.py - 화면 목록 페이지 나누기 (Streamlit)
+
+그룹핑 페이지들은 화면마다 expander를 만들고 접힌 화면까지 하이라이트 이미지를 모두 그렸다.
+(Streamlit expander는 펼침 여부를 파이썬에 알려주지 않으므로 접혀 있어도 내용이 만들어짐)
+paginate()는 현재 페이지의 화면만 돌려주므로 rerun 비용이 전체 화면 수가 아니라 페이지 크기에 비례한다.
+
+- 페이지 크기: 사이드바에서 선택 (PAGE_SIZES)
+- 페이지 크기를 바꾸면 보고 있던 첫 화면이 들어 있는 페이지로 이동
+- 현재 페이지는 st.session_state[f"{key}_page"] (◀ / ▶ 버튼과 선택 상자가 같은 상태를 씀)
+
+    for screen_idx, screen in paginate(screens, key="screens"):
+        with st.expander(...):
+            ...
+"""
+
+import math
+from typing import List, Sequence, Tuple, TypeVar
+
+import streamlit as st
+
+PAGE_SIZES = (5, 10, 20, 50, 100)
+DEFAULT_PAGE_SIZE = 10
+
+T = TypeVar("T")
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, math.ceil(total / max(1, page_size)))
+
+
+def page_bounds(total: int, page: int, page_size: int) -> Tuple[int, int]:
+    """페이지 번호 (0부터) -> [start, end) 항목 범위"""
+    start = min(page * page_size, max(0, total - 1))
+    start -= start % page_size
+    return start, min(total, start + page_size)
+
+
+def _show_page(first_key: str, page_key: str, page: int, page_size: int) -> None:
+    """◀ / ▶ 버튼 콜백: 페이지 이동 (위젯이 만들어지기 전에 실행되므로 선택 상자 상태를 바꿀 수 있음)"""
+    st.session_state[page_key] = page
+    st.session_state[first_key] = page * page_size
+
+
+def _page_selected(first_key: str, page_key: str, page_size: int) -> None:
+    """페이지 선택 상자 콜백: 선택한 페이지의 첫 항목을 기억"""
+    st.session_state[first_key] = st.session_state[page_key] * page_size
+
+
+def paginate(
+    items: Sequence[T],
+    key: str,
+    page_sizes: Sequence[int] = PAGE_SIZES,
+    default_page_size: int = DEFAULT_PAGE_SIZE,
+    label: str = "화면",
+) -> List[Tuple[int, T]]:
+    """페이지 이동 UI를 그리고 현재 페이지 항목 [(전체 인덱스, 항목)]을 반환"""
+    total = len(items)
+    page_sizes = list(page_sizes)
+    default_index = page_sizes.index(default_page_size) if default_page_size in page_sizes else 0
+    page_size = st.sidebar.selectbox(f"📄 페이지당 {label} 수", page_sizes, index=default_index, key=f"{key}_page_size")
+    if total <= page_size:
+        return list(enumerate(items))
+
+    # 보고 있던 첫 항목 기준으로 페이지 결정 (페이지 크기나 항목 수가 바뀌어도 위치 유지, 범위를 넘으면 마지막 페이지)
+    first_key = f"{key}_first"
+    page_key = f"{key}_page"
+    pages = page_count(total, page_size)
+    page = min(st.session_state.get(first_key, 0) // page_size, pages - 1)
+    # 선택 상자는 세션 상태로만 구동 (index를 넘기지 않음)
+    st.session_state[page_key] = page
+
+    col_prev, col_page, col_next = st.columns([1, 4, 1])
+    with col_prev:
+        st.button(
+            "◀ 이전", key=f"{key}_prev", disabled=page == 0,
+            on_click=_show_page, args=(first_key, page_key, page - 1, page_size),
+        )
+    with col_next:
+        st.button(
+            "다음 ▶", key=f"{key}_next", disabled=page >= pages - 1,
+            on_click=_show_page, args=(first_key, page_key, page + 1, page_size),
+        )
+    with col_page:
+        st.selectbox(
+            "페이지",
+            range(pages),
+            format_func=lambda p: f"{p + 1} / {pages}  ({label} {p * page_size + 1}~{min(total, (p + 1) * page_size)})",
+            key=page_key,
+            on_change=_page_selected,
+            args=(first_key, page_key, page_size),
+            label_visibility="collapsed",
+        )
+
+    start, end = page_bounds(total, page, page_size)
+    st.session_state[first_key] = start
+    return [(idx, items[idx]) for idx in range(start, end)]
@@ -0,0 +1,39 @@
+"""
+perf.py - 그룹핑 엔진 공용 성능 카운터
+
+엔진 코드에서 count("image_decodes") 처럼 이벤트를 기록하고,
+벤치마크 하네스(modules.strategies)에서 reset()/snapshot()으로 수집한다.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict
+
+# 이미지 디코드 횟수
+IMAGE_DECODES = "image_decodes"
+# 이미지 간 비교 횟수 (pHash 거리, SSIM, Vision Check 등)
+COMPARISONS = "comparisons"
+# DOM 골격 지문 판단으로 생략한 이미지 비교 횟수 (modules.dom_fingerprint)
+COMPARISONS_AVOIDED = "comparisons_avoided"
+# metadata.domSnapshot 디코드 횟수 (modules.lazy_metadata)
+DOM_DECODES = "dom_decodes"
+
+COUNTERS: Counter = Counter()
+# ScreenGrouper 스레드 풀 모드에서도 정확히 집계되도록 잠금
+_LOCK = threading.Lock()
+
+
+def count(name: str, n: int = 1) -> None:
+    """카운터 증가"""
+    with _LOCK:
+        COUNTERS[name] += n
+
+
+def reset() -> None:
+    """모든 카운터 초기화"""
+    COUNTERS.clear()
+
+
+def snapshot() -> Dict[str, int]:
+    """현재 카운터 값 복사본 반환"""
+    return dict(COUNTERS)
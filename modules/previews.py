@@ -0,0 +1,218 @@
+"""
+previews.py - 화면 표시용 축소본(WebP/JPEG) 캐시
+
+그룹핑 페이지는 1859×910 PNG를 600px 높이 iframe 안에 축소해서 보여주면서도 원본을 그대로 보낸다.
+PreviewCache는 원본의 내용 해시로 주소를 정한 축소본을 몇 가지 폭(PREVIEW_WIDTHS)으로 만들어 두고
+렌더러는 표시 크기를 덮는 가장 작은 축소본을 고른다. 원본은 명시적으로 확대(zoom)할 때만 쓴다.
+
+- 캐시 위치: <cache_dir>/<해시 앞 2자>/<해시>_<폭>.webp (내용이 같으면 경로도 같음)
+- 생성: 백그라운드 스레드 풀 (요청한 축소본이 아직 없으면 이번 렌더에는 원본을 쓰고 생성만 예약)
+- WebP를 쓸 수 없는 Pillow 빌드면 JPEG
+- 생성 실패는 stats()의 errors로 세고 메시지를 모아 둠 (페이지가 take_errors()로 꺼내 st.warning 표시)
+
+    cache = default_cache()
+    cache.prefetch(paths)                          # 그룹핑 직후 대표 이미지 축소본 미리 생성
+    path = cache.pick(image_path, max_width=1400, max_height=600)
+    src = preview_src(image_path, max_height=600)  # 미디어 서버 URL (서버가 꺼져 있으면 data URI)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, features
+
+from modules.image_sizes import image_size
+from modules.media_server import MediaRegistry, image_src
+
+# 축소본 폭 (px, 작은 것부터)
+PREVIEW_WIDTHS = (640, 960, 1280, 1600)
+DEFAULT_CACHE_DIR = os.path.join(".cache", "previews")
+# Streamlit wide 레이아웃 본문 폭 정도
+DEFAULT_MAX_WIDTH = 1400
+PREVIEW_QUALITY = 80
+# 페이지에 아직 표시하지 않은 생성 실패 메시지 최대 개수
+MAX_PENDING_ERRORS = 20
+
+
+def preview_format() -> Tuple[str, str]:
+    """(Pillow 포맷, 확장자) - WebP 우선, 없으면 JPEG"""
+    if features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def fit_width(image_size: Tuple[int, int], max_width: Optional[int] = None, max_height: Optional[int] = None) -> int:
+    """비율을 유지하며 (max_width, max_height) 안에 들어갈 때의 표시 폭 (원본 폭보다 크지 않음)"""
+    width, height = image_size
+    fit = width
+    if max_width:
+        fit = min(fit, max_width)
+    if max_height and height > 0:
+        fit = min(fit, int(max_height * width / height + 0.5))
+    return max(1, fit)
+
+
+class PreviewCache:
+    """내용 주소 기반 축소본 캐시"""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        widths: Iterable[int] = PREVIEW_WIDTHS,
+        quality: int = PREVIEW_QUALITY,
+        max_workers: int = 2,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.widths = tuple(sorted(set(int(w) for w in widths)))
+        self.quality = quality
+        self.format, self.ext = preview_format()
+        self.registry = MediaRegistry()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="preview")
+        self._lock = threading.Lock()
+        # (해시, 폭) -> 생성 중인 작업
+        self._pending: Dict[Tuple[str, int], object] = {}
+        # 생성 스레드와 렌더러가 함께 갱신하므로 잠금으로 보호
+        self._stats = {"hits": 0, "misses": 0, "generated": 0, "errors": 0}
+        self._errors: List[str] = []
+        self._stats_lock = threading.Lock()
+
+    # ---------------------------
+    # 통계 / 오류
+    # ---------------------------
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def take_errors(self) -> List[str]:
+        """아직 표시하지 않은 생성 실패 메시지 (꺼내면 비움)"""
+        with self._stats_lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+    # ---------------------------
+    # 경로 / 크기
+    # ---------------------------
+    def rendition_path(self, digest: str, width: int) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{width}{self.ext}")
+
+    def image_size(self, path: str) -> Tuple[int, int]:
+        """원본 이미지 크기 (modules.image_sizes 색인, 파일이 바뀌었을 때만 헤더를 다시 읽음)"""
+        return image_size(path, validate=True)
+
+    def widths_for(self, image_size: Tuple[int, int]) -> Tuple[int, ...]:
+        """원본보다 작은 축소본 폭만 (확대본은 만들지 않음)"""
+        return tuple(w for w in self.widths if w < image_size[0])
+
+    # ---------------------------
+    # 생성
+    # ---------------------------
+    def _render(self, source: str, digest: str, width: int) -> Optional[str]:
+        target = self.rendition_path(digest, width)
+        if os.path.exists(target):
+            return target
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with Image.open(source) as img:
+                height = max(1, round(img.height * width / img.width))
+                img = img.convert("RGBA" if self.format == "WEBP" and img.mode in ("RGBA", "LA", "P") else "RGB")
+                preview = img.resize((width, height), Image.LANCZOS)
+            # 다른 스레드/프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+            tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            preview.save(tmp, self.format, quality=self.quality)
+            os.replace(tmp, target)
+            self._count("generated")
+            return target
+        except (OSError, ValueError) as e:
+            # 백그라운드 스레드라 여기서는 st를 쓸 수 없음: 페이지가 take_errors()로 표시
+            with self._stats_lock:
+                self._stats["errors"] += 1
+                if len(self._errors) < MAX_PENDING_ERRORS:
+                    self._errors.append(f"축소본 생성 실패 ({os.path.basename(source)}, {width}px): {e}")
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop((digest, width), None)
+
+    def _schedule(self, source: str, digest: str, width: int) -> None:
+        key = (digest, width)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending[key] = self._pool.submit(self._render, source, digest, width)
+
+    def ensure(self, path: str, width: int) -> Optional[str]:
+        """축소본을 지금 만들어서 경로 반환 (동기)"""
+        digest = self.registry.digest(path)
+        return self._render(path, digest, width)
+
+    def prefetch(self, paths: Iterable[str]) -> None:
+        """원본들의 모든 축소본을 백그라운드에서 생성 (이미 있으면 건너뜀)"""
+        for path in paths:
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                digest = self.registry.digest(path)
+                size = self.image_size(path)
+            except OSError:
+                continue
+            for width in self.widths_for(size):
+                if not os.path.exists(self.rendition_path(digest, width)):
+                    self._schedule(path, digest, width)
+
+    # ---------------------------
+    # 선택
+    # ---------------------------
+    def pick(self, path: str, max_width: Optional[int] = DEFAULT_MAX_WIDTH, max_height: Optional[int] = None, zoom: bool = False) -> str:
+        """
+        표시 크기를 덮는 가장 작은 축소본 경로
+        - zoom=True이거나 알맞은 축소본이 원본뿐이면 원본
+        - 축소본이 아직 없으면 생성을 예약하고 이번에는 원본
+        """
+        if zoom:
+            return path
+        try:
+            size = self.image_size(path)
+            digest = self.registry.digest(path)
+        except OSError:
+            return path
+
+        needed = fit_width(size, max_width, max_height)
+        for width in self.widths_for(size):
+            if width < needed:
+                continue
+            target = self.rendition_path(digest, width)
+            if os.path.exists(target):
+                self._count("hits")
+                return target
+            self._count("misses")
+            self._schedule(path, digest, width)
+            return path
+        return path
+
+
+# =========================
+# 기본 캐시
+# =========================
+
+_default_cache: Optional[PreviewCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> PreviewCache:
+    """모든 렌더러가 공유하는 축소본 캐시"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = PreviewCache()
+        return _default_cache
+
+
+def preview_src(path: str, max_width: Optional[int] = DEFAULT_MAX_WIDTH, max_height: Optional[int] = None, zoom: bool = False) -> str:
+    """<img src>에 넣을 축소본 URL (zoom=True면 원본 URL)"""
+    return image_src(default_cache().pick(path, max_width, max_height, zoom))
@@ -0,0 +1,240 @@
+"""
+records.py - 액션 / 화면 클러스터 경량 레코드
+
+test_execution_action 원본 dict는 필드가 20개 가까이 되고 metadata JSON 문자열까지 들고 있다.
+그룹핑 엔진이 실제로 읽는 값은 몇 개뿐이므로, 필요한 필드만 __slots__ 레코드로 옮겨
+액션당 메모리를 줄이고 속성 접근을 dict 조회보다 빠르게 한다.
+
+- Bounds / Coordinates: metadata.coordinates(elementBounds 포함)의 타입 있는 하위 구조
+- Action: 액션 한 개 (원본 dict는 keep_raw=True일 때만 raw에 보관)
+- ScreenCluster: 한 화면(클러스터)
+
+엔진이 액션에 붙이던 임시 값(_prev_screenshot 등)은 원본 dict를 고치지 않고 레코드 필드에 둔다.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.lazy_metadata import parse_metadata_lazy
+
+# 시퀀스가 없는 액션의 정렬 키 (기존 엔진의 action_sequence 기본값)
+MISSING_SEQUENCE = 999999
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_int(value: Any) -> Optional[int]:
+    """'12' 같은 문자열 숫자도 정수로 (변환할 수 없으면 None)"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _extra(data: Dict[str, Any], fields: Dict[str, Optional[float]]) -> Optional[Dict[str, Any]]:
+    """
+    타입 필드로 옮기지 않은 원본 키 (모르는 키, 숫자로 바꿀 수 없던 값) -> to_dict()가 그대로 되돌림
+    fields: 원본 키 -> 변환된 값 (없으면 None)
+    """
+    extra = {
+        k: v for k, v in data.items()
+        if k not in fields or (fields[k] is None and v is not None)
+    }
+    return extra or None
+
+
+# =========================
+# 좌표 / 영역
+# =========================
+
+@dataclass(slots=True)
+class Bounds:
+    """elementBounds (px + 이미지 대비 비율)"""
+    top: Optional[float] = None
+    left: Optional[float] = None
+    width: Optional[float] = None
+    height: Optional[float] = None
+    top_ratio: Optional[float] = None
+    left_ratio: Optional[float] = None
+    width_ratio: Optional[float] = None
+    height_ratio: Optional[float] = None
+    # 그 밖의 원본 키 (없으면 None)
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["Bounds"]:
+        if not isinstance(data, dict) or not data:
+            return None
+        fields = {
+            key: _number(data.get(key))
+            for key in ("top", "left", "width", "height", "topRatio", "leftRatio", "widthRatio", "heightRatio")
+        }
+        return cls(
+            top=fields["top"],
+            left=fields["left"],
+            width=fields["width"],
+            height=fields["height"],
+            top_ratio=fields["topRatio"],
+            left_ratio=fields["leftRatio"],
+            width_ratio=fields["widthRatio"],
+            height_ratio=fields["heightRatio"],
+            extra=_extra(data, fields),
+        )
+
+    @property
+    def has_ratios(self) -> bool:
+        return None not in (self.top_ratio, self.left_ratio, self.width_ratio, self.height_ratio)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """원본 elementBounds 형식 (값이 있는 키 + extra)"""
+        pairs = (
+            ("top", self.top), ("left", self.left), ("width", self.width), ("height", self.height),
+            ("topRatio", self.top_ratio), ("leftRatio", self.left_ratio),
+            ("widthRatio", self.width_ratio), ("heightRatio", self.height_ratio),
+        )
+        result: Dict[str, Any] = dict(self.extra or ())
+        result.update((k, v) for k, v in pairs if v is not None)
+        return result
+
+
+@dataclass(slots=True)
+class Coordinates:
+    """metadata.coordinates"""
+    x: Optional[float] = None
+    y: Optional[float] = None
+    client_x: Optional[float] = None
+    client_y: Optional[float] = None
+    page_x: Optional[float] = None
+    page_y: Optional[float] = None
+    viewport_width: Optional[float] = None
+    viewport_height: Optional[float] = None
+    element_bounds: Optional[Bounds] = None
+    # 그 밖의 원본 키 (elementX, viewportX 등, 없으면 None)
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["Coordinates"]:
+        if not isinstance(data, dict) or not data:
+            return None
+        fields = {
+            key: _number(data.get(key))
+            for key in ("x", "y", "clientX", "clientY", "pageX", "pageY", "viewportWidth", "viewportHeight")
+        }
+        element_bounds = Bounds.from_dict(data.get("elementBounds"))
+        # elementBounds가 dict가 아니면(빈 dict 포함) 원본 값을 extra에 그대로 둠
+        fields["elementBounds"] = element_bounds
+        return cls(
+            x=fields["x"],
+            y=fields["y"],
+            client_x=fields["clientX"],
+            client_y=fields["clientY"],
+            page_x=fields["pageX"],
+            page_y=fields["pageY"],
+            viewport_width=fields["viewportWidth"],
+            viewport_height=fields["viewportHeight"],
+            element_bounds=element_bounds,
+            extra=_extra(data, fields),
+        )
+
+    def point(self) -> Tuple[Optional[float], Optional[float]]:
+        """클릭 좌표 (우선순위: pageX/pageY > clientX/clientY > x/y, modules.match_dom.click_point와 동일)"""
+        return (self.page_x or self.client_x or self.x, self.page_y or self.client_y or self.y)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """원본 coordinates 형식 (값이 있는 키 + extra)"""
+        pairs = (
+            ("x", self.x), ("y", self.y),
+            ("clientX", self.client_x), ("clientY", self.client_y),
+            ("pageX", self.page_x), ("pageY", self.page_y),
+            ("viewportWidth", self.viewport_width), ("viewportHeight", self.viewport_height),
+        )
+        result: Dict[str, Any] = dict(self.extra or ())
+        result.update((k, v) for k, v in pairs if v is not None)
+        if self.element_bounds is not None:
+            result["elementBounds"] = self.element_bounds.to_dict()
+        return result
+
+
+# =========================
+# 액션 / 클러스터
+# =========================
+
+@dataclass(slots=True)
+class Action:
+    """한 개의 test_execution_action 레코드"""
+    action_id: Any
+    execution_id: Any
+    sequence: Optional[int]
+    action_type: Optional[str]
+    screenshot_path: Optional[str]
+    coordinates: Optional[Coordinates] = None
+    http_url: Optional[str] = None
+    screen_name: Optional[str] = None
+    label: Optional[str] = None
+    # DomStore 스냅샷 id (domSnapshot이 없으면 None)
+    dom_snapshot_id: Optional[str] = None
+    # 클릭 전 스크린샷 (엔진이 채움, 원본 dict의 _prev_screenshot 대신)
+    prev_screenshot: Optional[str] = None
+    # 원본 dict (keep_raw=True일 때만)
+    raw: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any], keep_raw: bool = False) -> "Action":
+        """원본 액션 dict -> Action (metadata는 domSnapshot 디코딩 없이 필요한 필드만 읽음)"""
+        try:
+            metadata = parse_metadata_lazy(raw.get("metadata"))
+        except ValueError:
+            metadata = {}
+        if not isinstance(metadata, dict):
+            metadata = {}
+
+        # 스크린샷 경로 (우선순위: screenshot_real_path > screenshot_path)
+        screenshot_path = (
+            raw.get("screenshot_real_path")
+            or raw.get("screenshot_path")
+            or metadata.get("screenshot_real_path")
+            or metadata.get("screenshot_path")
+        )
+        label = metadata.get("label") or raw.get("text_content")
+        return cls(
+            action_id=raw.get("action_id"),
+            execution_id=raw.get("execution_id"),
+            sequence=to_int(raw.get("action_sequence")),
+            action_type=raw.get("action_type"),
+            screenshot_path=screenshot_path,
+            coordinates=Coordinates.from_dict(raw.get("coordinates") or metadata.get("coordinates")),
+            # URL (request 타입일 때 주로 의미 있음)
+            http_url=raw.get("http_url") or metadata.get("http_url"),
+            screen_name=raw.get("screen_name"),
+            label=str(label) if label is not None else None,
+            dom_snapshot_id=raw.get("dom_snapshot_id"),
+            prev_screenshot=raw.get("_prev_screenshot"),
+            raw=raw if keep_raw else None,
+        )
+
+    @property
+    def sort_key(self) -> int:
+        """action_sequence 정렬 키 (없으면 MISSING_SEQUENCE)"""
+        return self.sequence if self.sequence is not None else MISSING_SEQUENCE
+
+
+@dataclass(slots=True)
+class ScreenCluster:
+    """한 화면(클러스터) 정보"""
+    cluster_id: int
+    representative_image: str
+    image_paths: List[str]
+    actions: List[Action] = field(default_factory=list)
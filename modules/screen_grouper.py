@@ -0,0 +1,1339 @@
+"""
+screen_grouper.py - 클릭 전 이미지(_prev_screenshot) 기준 화면 그룹핑 엔진
+
+pages/test_screen_grouping.py 에서 분리한 순수 로직 (Streamlit 의존 없음).
+- ScreenGrouper: pHash + Lightweight Vision Check 기반 그룹핑
+- group_screens: SSIM + pHash 기반 순차 그룹핑
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+import imagehash
+import numpy as np
+from skimage.metrics import structural_similarity as ssim
+
+from modules import dom_diff, perf
+from modules.lazy_metadata import parse_metadata_lazy
+from modules.dom_fingerprint import DomFingerprintIndex
+from modules.image_sizes import default_index as image_size_index
+from modules.match_dom import click_point
+from modules.screen_names import default_classifier
+from modules.records import MISSING_SEQUENCE, Action
+from modules.sequence_index import SequenceIndex
+
+# ==========================
+# Utility (클래스 기반 접근)
+# ==========================
+class ActionMetadataParser:
+    """액션 메타데이터를 파싱하는 클래스"""
+    
+    @staticmethod
+    def parse(action):
+        """완전 고정된 metadata 파싱 - 절대 실패 안함"""
+        raw = action.get("metadata")
+        return ActionMetadataParser.parse_metadata(raw)
+    
+    @staticmethod
+    def parse_metadata(raw):
+        """metadata 파싱 - 완전 고정 버전 (domSnapshot은 접근할 때 디코딩)"""
+        if raw is None:
+            return {}
+        
+        if isinstance(raw, dict):
+            return raw
+        
+        if isinstance(raw, str):
+            raw = raw.strip()
+            if raw.startswith("{") and raw.endswith("}"):
+                try:
+                    return parse_metadata_lazy(raw)
+                except:
+                    pass
+            
+            # 따옴표가 escape된 상태 → 자동 수정
+            raw = raw.replace('\\"', '"')
+            # 다시 시도
+            try:
+                return parse_metadata_lazy(raw)
+            except:
+                return {}
+        
+        return {}
+    
+    @staticmethod
+    def get_label(action):
+        meta = ActionMetadataParser.parse(action)
+        return meta.get("label", "")
+    
+    @staticmethod
+    def get_coordinates(action):
+        meta = ActionMetadataParser.parse(action)
+        return meta.get("coordinates", {})
+    
+    @staticmethod
+    def get_element_bounds(action):
+        coords = ActionMetadataParser.get_coordinates(action)
+        return coords.get("elementBounds")
+
+
+class ScreenGrouper:
+    """
+    완전히 새로 설계된 화면 그룹핑 엔진
+    1) 이미지 기반(pHash + SSIM)
+    2) DOM은 2차 보조 판별
+    3) 팝업 분리
+    """
+
+    def __init__(self, actions, progress_callback=None, max_workers=1, use_dom_fingerprint=False, screen_classifier=None):
+        # 액션별 경량 레코드 (원본 dict는 수정하지 않고 엔진이 채우는 값은 레코드에 보관)
+        self.records = {id(action): Action.from_dict(action) for action in actions}
+        # action_sequence 기준으로 정렬 (로그 순서 우선) - 위치/이웃 조회는 인덱스로
+        self.index = SequenceIndex(actions, key=self.sequence)
+        self.actions = self.index.actions
+        self.cache = {}
+        # 후보 평가 스레드들이 load_image로 함께 채우므로 잠금으로 보호
+        self._cache_lock = threading.Lock()
+        self.progress_callback = progress_callback
+        # 후보 그룹 병렬 평가 스레드 수 (1이면 기존 순차 모드)
+        self.max_workers = max(1, int(max_workers or 1))
+        self._pool = None
+        # domSnapshot 골격 지문으로 후보 그룹을 먼저 판단 (모호하거나 DOM이 없을 때만 이미지 비교)
+        # 이미지 경로(pHash ≤ 18)보다 엄격해서 그룹이 달라질 수 있으므로 기본은 꺼짐
+        self.use_dom_fingerprint = use_dom_fingerprint
+        self.dom_index = DomFingerprintIndex()
+        # screen_name/label -> 화면 키 분류기 (키워드 테이블, modules.screen_names)
+        self.screen_names = screen_classifier or default_classifier()
+        # 스크린샷 경로 -> 그 스크린샷을 가진 액션 (DOM 기반 팝업 판별용)
+        self._screenshot_owner = None
+        self.stats = {
+            "total_actions": len(actions),
+            "click_actions": 0,
+            "images_loaded": 0,
+            "hashes_calculated": 0,
+            "clusters_created": 0,
+            "phash_distances": [],
+            "dom_fingerprint": self.dom_index.stats(),
+        }
+
+    # ---------------------------
+    # 액션 레코드
+    # ---------------------------
+    def record(self, action):
+        """원본 액션 dict -> 레코드 (생성자에 넘긴 액션만)"""
+        return self.records[id(action)]
+
+    def sequence(self, action):
+        """action_sequence 정렬 키 (정수, 없으면 999999)"""
+        record = self.records.get(id(action))
+        return record.sort_key if record is not None else MISSING_SEQUENCE
+
+    # ---------------------------
+    # 이미지 로딩 / 해시 / SSIM
+    # ---------------------------
+    def load_image(self, path):
+        with self._cache_lock:
+            img = self.cache.get(path)
+        if img is not None:
+            return img
+
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with Image.open(path) as source:
+                # 원본 크기는 크기 색인에 기록 (렌더러가 다시 열지 않도록)
+                image_size_index().record(path, source.size)
+                img = source.convert("RGB").resize((384, 384))
+            perf.count(perf.IMAGE_DECODES)
+            with self._cache_lock:
+                # 다른 스레드가 먼저 디코드했으면 그 결과를 사용
+                return self.cache.setdefault(path, img)
+        except Exception as e:
+            return None
+
+    def phash(self, img):
+        if img is None:
+            return None
+        return imagehash.phash(img)
+
+    def phash_distance(self, h1, h2):
+        if h1 is None or h2 is None:
+            return float('inf')
+        perf.count(perf.COMPARISONS)
+        return h1 - h2
+
+    def calc_ssim(self, img1, img2):
+        if img1 is None or img2 is None:
+            return 0.0
+        perf.count(perf.COMPARISONS)
+        try:
+            a1 = np.asarray(img1.convert("L"), dtype=np.float32)
+            a2 = np.asarray(img2.convert("L"), dtype=np.float32)
+            score, _ = ssim(a1, a2, full=True)
+            return score
+        except:
+            return 0.0
+
+    # ---------------------------
+    # 1차: 클릭 전 이미지 기준 클러스터링
+    # ---------------------------
+    def get_screen_name_key(self, action):
+        """액션의 screen_name을 키워드 테이블로 정규화하여 그룹 키로 사용 (없으면 label에서)"""
+        screen_name = action.get("screen_name")
+        if screen_name:
+            return self.screen_names.screen_key(screen_name)
+        
+        # label에서 확인
+        meta = ActionMetadataParser.parse(action)
+        label = meta.get("label") or action.get("text_content") or ""
+        return self.screen_names.classify(str(label))
+    
+    def get_dom_snapshot(self, action):
+        """액션의 domSnapshot (없으면 None, 읽기 전용)"""
+        snapshot = ActionMetadataParser.parse(action).get("domSnapshot")
+        return snapshot if isinstance(snapshot, dict) else None
+
+    def get_dom_signature(self, action):
+        """액션 domSnapshot의 골격 지문 (DOM이 없거나 지문 사용 안 하면 None)"""
+        if not self.use_dom_fingerprint:
+            return None
+        return self.dom_index.signature_for(self.get_dom_snapshot(action))
+
+    def prev_dom_signature(self, prev_screenshot):
+        """
+        클릭 전 스크린샷을 가진 액션의 골격 지문
+        액션 자신의 domSnapshot은 클릭 시점에 찍히므로, 이미지 경로(클릭 전 스크린샷)와
+        같은 화면을 비교하려면 그 스크린샷의 주인 액션 DOM을 써야 한다.
+        """
+        if not self.use_dom_fingerprint:
+            return None
+        owner = self.screenshot_owner(prev_screenshot)
+        return self.get_dom_signature(owner) if owner is not None else None
+
+    def find_best_group(self, prev_screenshot, popup_box, prev_hash, current_screen_name_key, prev_image_to_group, dom_signature=None):
+        """
+        (DOM 골격 지문 →) Lightweight Vision Check + pHash로 가장 가까운 기존 그룹 찾기
+        
+        후보 그룹 평가는 서로 독립이므로 max_workers > 1이면 스레드 풀에서 동시에 평가하고,
+        결과는 후보 등록 순서대로 reduce 한다 (동점이면 먼저 등록된 그룹 - 순차 모드와 동일).
+        
+        Returns:
+            (found_group, min_distance, min_vision_diff)
+        """
+        candidates = list(prev_image_to_group.items())
+
+        def evaluate(candidate):
+            return self._evaluate_candidate(
+                prev_screenshot, popup_box, prev_hash, current_screen_name_key, candidate, dom_signature
+            )
+
+        if self._pool is not None and len(candidates) > 1:
+            evaluations = list(self._pool.map(evaluate, candidates))
+        else:
+            evaluations = [evaluate(c) for c in candidates]
+
+        found_group = None
+        min_distance = float('inf')
+        min_vision_diff = float('inf')
+
+        for evaluation in evaluations:
+            if evaluation is None:
+                continue
+            distance, combined_score, vision_diff, group = evaluation
+            self.stats["phash_distances"].append(distance)
+
+            if distance <= 18 and combined_score < min_distance:
+                min_distance = combined_score
+                min_vision_diff = vision_diff
+                found_group = group
+
+        return found_group, min_distance, min_vision_diff
+
+    def _evaluate_candidate(self, prev_screenshot, popup_box, prev_hash, current_screen_name_key, candidate, dom_signature=None):
+        """
+        후보 그룹 하나 평가 (스레드에서 호출될 수 있음: 공유 상태는 잠금으로 보호되는 이미지 캐시 / DOM 지문 통계만 갱신)
+        DOM 지문으로 같은/다른 화면이 확실하면 이미지를 열지 않는다 (같은 화면이면 거리 0으로 취급).
+        
+        Returns:
+            (pHash 거리, 결합 점수, vision diff, 그룹) 또는 비교 대상이 아니면 None
+        """
+        (prev_path, screen_key), group_info = candidate
+
+        # screen_name이 다르면 같은 이미지라도 다른 그룹으로 분리
+        if current_screen_name_key is not None and screen_key is not None:
+            if current_screen_name_key != screen_key:
+                return None
+
+        if self.use_dom_fingerprint:
+            decision = self.dom_index.decide(dom_signature, group_info.get("dom_signature"))
+            if decision is not None:
+                # 팝업 검사 + Vision Check + 배경 pHash (디코드 4회, 비교 2회) 생략
+                self.dom_index.record_avoided(2, 4)
+                if decision:
+                    return 0, 0.0, 0.0, group_info["group"]
+                return None
+
+        has_popup2, popup_box2 = self.is_popup_screenshot(prev_path)
+
+        # Lightweight Vision Check 먼저 수행 (빠른 필터링)
+        vision_diff = self.lightweight_vision_check(
+            prev_screenshot, prev_path,
+            popup_box,
+            popup_box2 if has_popup2 else None
+        )
+
+        # Vision Check 임계값: 30 (너무 다르면 스킵)
+        if vision_diff > 30:
+            return None
+
+        # pHash로 정확도 향상
+        prev_hash2 = self.phash_background_only(prev_path, popup_box2 if has_popup2 else None)
+        if not prev_hash2:
+            return None
+
+        distance = self.phash_distance(prev_hash, prev_hash2)
+        # Vision Check와 pHash를 결합한 점수 (Vision diff를 가중치 적용)
+        combined_score = distance + (vision_diff / 2)
+        return distance, combined_score, vision_diff, group_info["group"]
+
+    def cluster_by_image(self):
+        """클릭 전 이미지 기준 클러스터링 (max_workers > 1이면 후보 평가용 스레드 풀 사용)"""
+        if self.max_workers <= 1:
+            return self._cluster_by_image()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            self._pool = pool
+            try:
+                return self._cluster_by_image()
+            finally:
+                self._pool = None
+
+    def _cluster_by_image(self):
+        """
+        핵심: 클릭 전 스크린샷 이미지(_prev_screenshot) 기준으로 그룹핑
+        - pHash distance ≤ 18이면 같은 화면 (배경만 비교)
+        - screen_name이 다르면 같은 이미지라도 다른 그룹으로 분리
+        - 팝업이 감지된 상태에서는 새 그룹을 만들지 않고 이전 그룹에 추가
+        - 팝업 내 액션들은 같은 그룹으로 묶음 (팝업 ID 기반)
+        """
+        groups = []
+        used_actions = set()
+        prev_image_to_group = {}  # (이미지 경로, screen_name_key) -> 그룹 매핑
+        popup_group_map = {}  # 팝업 ID -> 그룹 매핑
+        current_popup_group = None  # 현재 활성 팝업 그룹
+        
+        # 진행 상황 업데이트
+        if self.progress_callback:
+            self.progress_callback(0.1, "클릭 액션의 _prev_screenshot 설정 중...")
+        
+        # 먼저 모든 클릭 액션의 _prev_screenshot 설정
+        self._set_prev_screenshots()
+        
+        click_actions = [a for a in self.actions if self.record(a).action_type == "click"]
+        self.stats["click_actions"] = len(click_actions)
+        total_clicks = len(click_actions)
+        
+        for i, act in enumerate(self.actions):
+            if id(act) in used_actions:
+                continue
+            
+            # 진행 상황 업데이트
+            if self.progress_callback and i % max(1, len(self.actions) // 20) == 0:
+                progress = 0.2 + (i / len(self.actions)) * 0.6
+                self.progress_callback(progress, f"액션 처리 중... ({i}/{len(self.actions)})")
+            
+            # 클릭 액션인 경우: _prev_screenshot 기준으로 그룹핑
+            if self.record(act).action_type == "click":
+                prev_screenshot = self.record(act).prev_screenshot
+                
+                # 팝업 상태 확인
+                is_popup = self.is_popup_action(act)
+                
+                if prev_screenshot and os.path.exists(prev_screenshot):
+                    # 클릭 전 이미지에 팝업이 있는지 확인
+                    has_popup_in_screenshot, popup_box = self.is_popup_screenshot(prev_screenshot)
+                    
+                    # 배경만 크롭해서 pHash 계산
+                    prev_hash = self.phash_background_only(prev_screenshot, popup_box if has_popup_in_screenshot else None)
+                    
+                    if prev_hash:
+                        self.stats["images_loaded"] += 1
+                        self.stats["hashes_calculated"] += 1
+                        
+                        # 팝업이 감지된 상태에서는 새 그룹을 만들지 않고 이전 그룹에 추가
+                        if has_popup_in_screenshot and current_popup_group:
+                            # 팝업 상태: 이전 그룹에 추가
+                            current_popup_group["actions"].append(act)
+                            current_popup_group["actions"].sort(key=self.sequence)
+                            used_actions.add(id(act))
+                            
+                            # 팝업 종료 액션(저장하기 등)이면 그룹핑 종료
+                            if self.is_popup_terminating_action(act):
+                                current_popup_group = None
+                            
+                            continue
+                        
+                        # 팝업 액션인 경우: 팝업 그룹에 추가
+                        if is_popup:
+                            # 팝업 종료 액션(저장하기 등)이면 현재 팝업 그룹에 추가하고 종료
+                            if self.is_popup_terminating_action(act) and current_popup_group:
+                                current_popup_group["actions"].append(act)
+                                current_popup_group["actions"].sort(key=self.sequence)
+                                used_actions.add(id(act))
+                                current_popup_group = None  # 팝업 그룹핑 종료
+                                continue
+                            
+                            # 팝업 ID 생성 (이미지 경로 기반)
+                            popup_id = f"popup_{prev_screenshot}"
+                            
+                            if popup_id in popup_group_map:
+                                # 기존 팝업 그룹에 추가
+                                popup_group = popup_group_map[popup_id]
+                                popup_group["actions"].append(act)
+                                popup_group["actions"].sort(key=self.sequence)
+                                current_popup_group = popup_group
+                                
+                                # 팝업 종료 액션이면 그룹핑 종료
+                                if self.is_popup_terminating_action(act):
+                                    current_popup_group = None
+                            else:
+                                # 새 팝업 그룹 생성 또는 기존 그룹 찾기
+                                current_screen_name_key = self.get_screen_name_key(act)
+                                dom_signature = self.prev_dom_signature(prev_screenshot)
+                                
+                                # Lightweight Vision Check + pHash로 기존 그룹 찾기 (screen_name도 고려)
+                                found_group, min_distance, _ = self.find_best_group(
+                                    prev_screenshot,
+                                    popup_box if has_popup_in_screenshot else None,
+                                    prev_hash,
+                                    current_screen_name_key,
+                                    prev_image_to_group,
+                                    dom_signature,
+                                )
+                                
+                                if found_group:
+                                    # 기존 그룹에 추가
+                                    found_group["actions"].append(act)
+                                    found_group["actions"].sort(key=self.sequence)
+                                    popup_group_map[popup_id] = found_group
+                                    current_popup_group = found_group
+                                    
+                                    # 팝업 종료 액션이면 그룹핑 종료
+                                    if self.is_popup_terminating_action(act):
+                                        current_popup_group = None
+                                else:
+                                    # 새 팝업 그룹 생성
+                                    action_seq = self.sequence(act)
+                                    group = {
+                                        "prev_image": prev_screenshot,
+                                        "prev_image_hash": prev_hash,
+                                        "images": [prev_screenshot],
+                                        "actions": [act],
+                                        "representative_image": None,
+                                        "first_action_idx": i,
+                                        "first_action_sequence": action_seq,
+                                        "phash_distances": [],
+                                        "is_popup_group": True,
+                                        "popup_id": popup_id,
+                                        "screen_name_key": current_screen_name_key  # screen_name 키 저장
+                                    }
+                                    groups.append(group)
+                                    self.stats["clusters_created"] += 1
+                                    # (이미지 경로, screen_name_key) 튜플을 키로 사용
+                                    prev_image_to_group[(prev_screenshot, current_screen_name_key)] = {
+                                        "group": group,
+                                        "hash": prev_hash,
+                                        "dom_signature": dom_signature,
+                                    }
+                                    popup_group_map[popup_id] = group
+                                    current_popup_group = group
+                                    
+                                    # 팝업 종료 액션이면 그룹핑 종료
+                                    if self.is_popup_terminating_action(act):
+                                        current_popup_group = None
+                                
+                                used_actions.add(id(act))
+                                continue
+                        
+                        # 일반 액션: Lightweight Vision Check + pHash로 그룹 찾기
+                        # screen_name도 함께 고려하여 분리
+                        current_screen_name_key = self.get_screen_name_key(act)
+                        dom_signature = self.prev_dom_signature(prev_screenshot)
+                        
+                        found_group, min_distance, min_vision_diff = self.find_best_group(
+                            prev_screenshot,
+                            popup_box if has_popup_in_screenshot else None,
+                            prev_hash,
+                            current_screen_name_key,
+                            prev_image_to_group,
+                            dom_signature,
+                        )
+                        
+                        if found_group:
+                            # 기존 그룹에 추가
+                            found_group["actions"].append(act)
+                            found_group["actions"].sort(key=self.sequence)
+                            if "phash_distances" not in found_group:
+                                found_group["phash_distances"] = []
+                            found_group["phash_distances"].append(min_distance)
+                            used_actions.add(id(act))
+                            
+                            # 팝업이 닫혔는지 확인
+                            if current_popup_group and found_group["actions"]:
+                                prev_action = found_group["actions"][-2] if len(found_group["actions"]) > 1 else None
+                                if prev_action and self.is_popup_closed(prev_action, act):
+                                    current_popup_group = None
+                            
+                            # 팝업 그룹이 아니면 current_popup_group 초기화
+                            if not found_group.get("is_popup_group"):
+                                current_popup_group = None
+                        else:
+                            # 새 그룹 생성
+                            action_seq = self.sequence(act)
+                            group = {
+                                "prev_image": prev_screenshot,
+                                "prev_image_hash": prev_hash,
+                                "images": [prev_screenshot],
+                                "actions": [act],
+                                "representative_image": None,
+                                "first_action_idx": i,
+                                "first_action_sequence": action_seq,
+                                "phash_distances": [],
+                                "is_popup_group": False,
+                                "screen_name_key": current_screen_name_key  # screen_name 키 저장
+                            }
+                            groups.append(group)
+                            self.stats["clusters_created"] += 1
+                            # (이미지 경로, screen_name_key) 튜플을 키로 사용
+                            prev_image_to_group[(prev_screenshot, current_screen_name_key)] = {
+                                "group": group,
+                                "hash": prev_hash,
+                                "dom_signature": dom_signature,
+                            }
+                            used_actions.add(id(act))
+                            current_popup_group = None
+                    else:
+                        # 이미지 로딩 실패 - 마지막 그룹에 추가
+                        if groups:
+                            groups[-1]["actions"].append(act)
+                            used_actions.add(id(act))
+                else:
+                    # _prev_screenshot이 없으면 마지막 그룹에 추가
+                    if groups:
+                        groups[-1]["actions"].append(act)
+                        used_actions.add(id(act))
+            else:
+                # 클릭이 아닌 액션: 팝업 그룹이 있으면 팝업 그룹에 추가, 없으면 가장 가까운 그룹에 포함
+                if current_popup_group:
+                    # 팝업 상태: 현재 팝업 그룹에 추가
+                    current_popup_group["actions"].append(act)
+                    current_popup_group["actions"].sort(key=self.sequence)
+                    used_actions.add(id(act))
+                    
+                    # 팝업 종료 액션 체크는 클릭 액션에서만 수행
+                else:
+                    # 팝업이 아닌 상태: action_sequence 순서상 가장 가까운 그룹에 포함
+                    current_seq = self.sequence(act)
+                    
+                    # 가장 가까운 그룹 찾기 (action_sequence 기준)
+                    found_group = None
+                    min_seq_diff = float('inf')
+                    
+                    for group in groups:
+                        if not group["actions"]:
+                            continue
+                        # 그룹의 첫 번째와 마지막 액션의 action_sequence 확인
+                        first_seq = self.sequence(group["actions"][0])
+                        last_seq = self.sequence(group["actions"][-1])
+                        
+                        # 현재 액션이 이 그룹의 범위 내에 있거나 바로 앞/뒤에 있는지 확인
+                        if first_seq <= current_seq <= last_seq:
+                            # 그룹 범위 내에 있으면 이 그룹에 추가
+                            found_group = group
+                            break
+                        elif current_seq < first_seq:
+                            # 현재 액션이 그룹보다 앞에 있으면 가장 가까운 그룹 찾기
+                            diff = first_seq - current_seq
+                            if diff < min_seq_diff:
+                                min_seq_diff = diff
+                                found_group = group
+                    
+                    if found_group:
+                        found_group["actions"].append(act)
+                        # 액션 순서 정렬 (action_sequence 기준 - 로그 순서 우선)
+                        found_group["actions"].sort(key=self.sequence)
+                        used_actions.add(id(act))
+                    elif groups:
+                        # 그룹을 찾지 못했으면 action_sequence가 가장 작은 그룹에 추가
+                        min_seq_group = min(groups, key=lambda g: self.sequence(g["actions"][0]) if g["actions"] else 999999)
+                        min_seq_group["actions"].append(act)
+                        # 액션 순서 정렬 (action_sequence 기준)
+                        min_seq_group["actions"].sort(key=self.sequence)
+                        used_actions.add(id(act))
+        
+        # 처리되지 않은 액션들을 action_sequence 순서에 맞는 그룹에 추가
+        for act in self.actions:
+            if id(act) not in used_actions:
+                act_seq = self.sequence(act)
+                
+                if groups:
+                    # action_sequence가 가장 가까운 그룹 찾기
+                    best_group = None
+                    min_diff = float('inf')
+                    
+                    for group in groups:
+                        if not group["actions"]:
+                            continue
+                        first_seq = self.sequence(group["actions"][0])
+                        last_seq = self.sequence(group["actions"][-1])
+                        
+                        if first_seq <= act_seq <= last_seq:
+                            best_group = group
+                            break
+                        else:
+                            diff = min(abs(act_seq - first_seq), abs(act_seq - last_seq))
+                            if diff < min_diff:
+                                min_diff = diff
+                                best_group = group
+                    
+                    if best_group:
+                        best_group["actions"].append(act)
+                        best_group["actions"].sort(key=self.sequence)
+                    else:
+                        # 그룹을 찾지 못했으면 action_sequence가 가장 작은 그룹에 추가
+                        min_seq_group = min(groups, key=lambda g: self.sequence(g["actions"][0]) if g["actions"] else 999999)
+                        min_seq_group["actions"].append(act)
+                        min_seq_group["actions"].sort(key=self.sequence)
+                else:
+                    act_idx = self.index.position(act, 999999)
+                    groups.append({
+                        "prev_image": None,
+                        "prev_image_hash": None,
+                        "images": [],
+                        "actions": [act],
+                        "representative_image": None,
+                        "first_action_idx": act_idx,
+                        "first_action_sequence": act_seq  # action_sequence 저장
+                    })
+                used_actions.add(id(act))
+
+        # 그룹들을 첫 번째 액션의 action_sequence 순으로 정렬 (로그 순서 우선)
+        groups.sort(key=lambda g: g.get("first_action_sequence", 999999) if g.get("first_action_sequence") is not None else g.get("first_action_idx", 999999))
+        
+        # 진행 상황 업데이트
+        if self.progress_callback:
+            self.progress_callback(0.9, f"클러스터링 완료: {len(groups)}개 그룹 생성")
+
+        return groups
+    
+    def _set_prev_screenshots(self):
+        """모든 클릭 액션 레코드의 prev_screenshot 설정 (원본 dict는 수정하지 않음)"""
+        # 정렬 순서대로 한 번만 훑으면서 직전까지 마지막으로 존재한 스크린샷을 유지
+        # (클릭마다 앞쪽을 역순으로 다시 찾던 것과 결과는 같음)
+        last_screenshot = None
+        for action in self.actions:
+            record = self.record(action)
+            if record.action_type == "click" and not record.prev_screenshot and last_screenshot:
+                record.prev_screenshot = last_screenshot
+
+            screenshot_path = record.screenshot_path
+            if screenshot_path and os.path.exists(screenshot_path):
+                last_screenshot = os.path.normpath(screenshot_path)
+
+    # ---------------------------
+    # 2차: 팝업 감지 및 처리
+    # ---------------------------
+    def is_popup_action(self, action):
+        """액션이 팝업 내에서 발생했는지 확인"""
+        meta = ActionMetadataParser.parse(action)
+        coords = meta.get("coordinates") or {}
+        bounds = coords.get("elementBounds") or {}
+        
+        # role="dialog" 확인
+        role = meta.get("role") or action.get("role")
+        if role and "dialog" in str(role).lower():
+            return True
+        
+        # z-index 높은 modal 영역 확인 (metadata에서 확인)
+        z_index = meta.get("zIndex") or meta.get("z-index")
+        if z_index and isinstance(z_index, (int, float)) and z_index > 1000:
+            return True
+        
+        # DOM이 있으면: 클릭 좌표가 다이얼로그 크기 오버레이 노드 안이면 팝업
+        # (전체 화면 backdrop은 제외, 안에 없으면 기존 룰로 판단)
+        snapshot = self.get_dom_snapshot(action)
+        cx, cy = click_point(coords)
+        if snapshot is not None and cx is not None and cy is not None:
+            if dom_diff.point_in_overlay(snapshot, cx, cy):
+                return True
+        
+        # 기존 룰: 중앙 + 작은 영역
+        w = bounds.get("widthRatio")
+        h = bounds.get("heightRatio")
+        top = bounds.get("topRatio")
+        left = bounds.get("leftRatio")
+
+        if any(x is None for x in [w, h, top, left]):
+            return False
+
+        # 팝업 룰: 중앙 + 작은 영역
+        if w < 0.55 and h < 0.55 and 0.15 < top < 0.55:
+            return True
+        
+        return False
+    
+    def is_popup_terminating_action(self, action):
+        """팝업을 종료하는 액션인지 확인 (저장하기, 확인, 취소 등)"""
+        if action.get("action_type") != "click":
+            return False
+        
+        meta = ActionMetadataParser.parse(action)
+        label = meta.get("label") or action.get("text_content") or ""
+        label = str(label).strip()
+        
+        # 팝업 종료 버튼들
+        terminating_labels = ["저장하기", "확인", "취소", "닫기", "완료", "저장", "OK", "Cancel", "Close"]
+        
+        if label in terminating_labels:
+            # 팝업 내에서 발생한 액션인지 확인
+            if self.is_popup_action(action):
+                return True
+        
+        return False
+    
+    def screenshot_owner(self, screenshot_path):
+        """스크린샷 경로 -> 그 스크린샷을 가진 (마지막) 액션"""
+        if self._screenshot_owner is None:
+            owners = {}
+            for action in self.actions:
+                path = self.record(action).screenshot_path
+                if path:
+                    owners[os.path.normpath(path)] = action
+            self._screenshot_owner = owners
+        return self._screenshot_owner.get(os.path.normpath(screenshot_path))
+
+    def dom_popup_box(self, screenshot_path):
+        """
+        스크린샷을 가진 액션의 DOM으로 팝업 판별
+        반환: None(DOM 없음 → 이미지 분석 필요) / (팝업 여부, 이미지 픽셀 기준 popup_box)
+        """
+        owner = self.screenshot_owner(screenshot_path)
+        snapshot = self.get_dom_snapshot(owner) if owner is not None else None
+        if snapshot is None:
+            return None
+        box = dom_diff.overlay_box(snapshot)
+        if box is None:
+            return False, None
+        
+        # DOM 좌표(CSS px) -> 스크린샷 픽셀 (크기 색인, 디코드 없음)
+        coords = ActionMetadataParser.get_coordinates(owner)
+        extent = dom_diff.page_extent(snapshot)
+        viewport_w = coords.get("viewportWidth") or (extent[2] if extent else None)
+        viewport_h = coords.get("viewportHeight") or (extent[3] if extent else None)
+        try:
+            width, height = image_size_index().get(screenshot_path)
+        except Exception:
+            return True, dom_diff.box_dict(box)
+        sx = width / viewport_w if viewport_w else 1.0
+        sy = height / viewport_h if viewport_h else 1.0
+        left, top, right, bottom = box
+        return True, {
+            "left": max(0, int(left * sx)),
+            "top": max(0, int(top * sy)),
+            "right": min(width, int(round(right * sx))),
+            "bottom": min(height, int(round(bottom * sy))),
+        }
+
+    def is_popup_screenshot(self, screenshot_path):
+        """스크린샷에 팝업이 있는지 확인 (DOM이 있으면 DOM 오버레이, 없으면 이미지 분석)"""
+        if not screenshot_path or not os.path.exists(screenshot_path):
+            return False, None
+        
+        dom_result = self.dom_popup_box(screenshot_path)
+        if dom_result is not None:
+            return dom_result
+        
+        try:
+            img = Image.open(screenshot_path).convert("RGB")
+            perf.count(perf.IMAGE_DECODES)
+            # 간단한 팝업 감지: 중앙 영역의 밝기 변화 확인
+            # 실제로는 더 정교한 방법이 필요하지만, 일단 기본 로직 사용
+            width, height = img.size
+            
+            # 중앙 영역 확인 (20% ~ 80% 영역)
+            center_left = int(width * 0.2)
+            center_top = int(height * 0.2)
+            center_right = int(width * 0.8)
+            center_bottom = int(height * 0.8)
+            
+            # 중앙 영역의 평균 밝기 계산
+            center_region = img.crop((center_left, center_top, center_right, center_bottom))
+            center_pixels = list(center_region.getdata())
+            center_brightness = sum(sum(pixel) for pixel in center_pixels) / (len(center_pixels) * 3)
+            
+            # 가장자리 영역의 평균 밝기 계산
+            edge_region = img.crop((0, 0, width, height))
+            edge_pixels = list(edge_region.getdata())
+            edge_brightness = sum(sum(pixel) for pixel in edge_pixels) / (len(edge_pixels) * 3)
+            
+            # 중앙이 밝고 가장자리가 어두우면 팝업 가능성
+            if center_brightness > edge_brightness * 1.1:
+                # 팝업 bounding box 추정 (중앙 영역)
+                popup_box = {
+                    "left": center_left,
+                    "top": center_top,
+                    "right": center_right,
+                    "bottom": center_bottom
+                }
+                return True, popup_box
+            
+            return False, None
+        except:
+            return False, None
+    
+    def crop_background(self, img, popup_box):
+        """팝업 영역을 제외한 배경만 크롭"""
+        if popup_box is None:
+            return img
+        
+        width, height = img.size
+        left = popup_box.get("left", 0)
+        top = popup_box.get("top", 0)
+        right = popup_box.get("right", width)
+        bottom = popup_box.get("bottom", height)
+        
+        # 배경 영역들: 상단, 하단, 좌측, 우측
+        background_regions = []
+        
+        # 상단 영역
+        if top > 0:
+            background_regions.append(img.crop((0, 0, width, top)))
+        
+        # 하단 영역
+        if bottom < height:
+            background_regions.append(img.crop((0, bottom, width, height)))
+        
+        # 좌측 영역
+        if left > 0:
+            background_regions.append(img.crop((0, top, left, bottom)))
+        
+        # 우측 영역
+        if right < width:
+            background_regions.append(img.crop((right, top, width, bottom)))
+        
+        if not background_regions:
+            return img
+        
+        # 배경 영역들을 합치기 (가장 큰 영역 사용)
+        largest_region = max(background_regions, key=lambda r: r.width * r.height)
+        return largest_region.resize((384, 384))
+    
+    def phash_background_only(self, img_path, popup_box=None):
+        """배경만 크롭해서 pHash 계산"""
+        if not img_path or not os.path.exists(img_path):
+            return None
+        
+        try:
+            img = Image.open(img_path).convert("RGB")
+            perf.count(perf.IMAGE_DECODES)
+            
+            if popup_box:
+                # 팝업 영역 제외하고 배경만 크롭
+                background_img = self.crop_background(img, popup_box)
+            else:
+                # 팝업이 없으면 전체 이미지 사용
+                background_img = img.resize((384, 384))
+            
+            return self.phash(background_img)
+        except:
+            return None
+    
+    def lightweight_vision_check(self, img1_path, img2_path, popup_box1=None, popup_box2=None):
+        """
+        Lightweight Vision Check: 가벼운 이미지 비교 방법
+        - 작은 해상도로 리사이즈 후 간단한 픽셀 차이 비교
+        - pHash보다 빠르고 가벼움
+        """
+        if not img1_path or not img2_path:
+            return float('inf')
+        
+        if not os.path.exists(img1_path) or not os.path.exists(img2_path):
+            return float('inf')
+        
+        try:
+            # 이미지 로드 및 배경만 크롭
+            img1 = Image.open(img1_path).convert("RGB")
+            img2 = Image.open(img2_path).convert("RGB")
+            perf.count(perf.IMAGE_DECODES, 2)
+            perf.count(perf.COMPARISONS)
+            
+            if popup_box1:
+                img1 = self.crop_background(img1, popup_box1)
+            else:
+                img1 = img1.resize((128, 128))  # 작은 해상도로 리사이즈
+            
+            if popup_box2:
+                img2 = self.crop_background(img2, popup_box2)
+            else:
+                img2 = img2.resize((128, 128))  # 작은 해상도로 리사이즈
+            
+            # 동일한 크기로 맞추기
+            img1 = img1.resize((128, 128))
+            img2 = img2.resize((128, 128))
+            
+            # 픽셀 차이 계산 (간단한 L1 거리)
+            arr1 = np.array(img1, dtype=np.float32)
+            arr2 = np.array(img2, dtype=np.float32)
+            
+            diff = np.abs(arr1 - arr2)
+            avg_diff = np.mean(diff)
+            
+            return avg_diff
+        except Exception as e:
+            return float('inf')
+    
+    def is_popup_closed(self, prev_action, current_action):
+        """팝업이 닫혔는지 확인"""
+        # screen_name 변경 확인
+        prev_screen = prev_action.get("screen_name")
+        curr_screen = current_action.get("screen_name")
+        if prev_screen and curr_screen and prev_screen != curr_screen:
+            return True
+        
+        # 두 액션에 DOM이 있으면: 사이에서 오버레이 루트가 사라졌는지 확인
+        prev_snapshot = self.get_dom_snapshot(prev_action)
+        curr_snapshot = self.get_dom_snapshot(current_action)
+        if prev_snapshot is not None and curr_snapshot is not None:
+            if dom_diff.diff(prev_snapshot, curr_snapshot).removed_overlays:
+                return True
+        
+        # 현재 액션의 스크린샷에 팝업이 없는지 확인
+        curr_screenshot = self.record(current_action).screenshot_path
+        if curr_screenshot:
+            has_popup, _ = self.is_popup_screenshot(curr_screenshot)
+            if not has_popup:
+                # 이전에 팝업이 있었는지 확인
+                prev_screenshot = self.record(prev_action).screenshot_path
+                if prev_screenshot:
+                    prev_has_popup, _ = self.is_popup_screenshot(prev_screenshot)
+                    if prev_has_popup:
+                        return True
+        
+        # elementBounds가 팝업 영역에서 벗어났는지 확인
+        prev_meta = ActionMetadataParser.parse(prev_action)
+        curr_meta = ActionMetadataParser.parse(current_action)
+        
+        prev_bounds = prev_meta.get("coordinates", {}).get("elementBounds", {})
+        curr_bounds = curr_meta.get("coordinates", {}).get("elementBounds", {})
+        
+        # 이전 액션이 팝업이었고, 현재 액션이 팝업이 아니면 팝업 닫힘
+        if self.is_popup_action(prev_action) and not self.is_popup_action(current_action):
+            return True
+        
+        return False
+
+    def split_by_screen_name_or_label(self, cluster):
+        """
+        screen_name 또는 label 기준으로 클러스터를 분리
+        예: "요구사항 정의"와 "프로그램 설계"를 별도 화면으로 분리
+        """
+        actions = cluster["actions"]
+        if len(actions) <= 1:
+            return [cluster]
+        
+        # screen_name 또는 label 기준으로 그룹핑
+        groups = {}
+        unassigned = []
+        
+        for action in actions:
+            # screen_name 확인
+            screen_name = action.get("screen_name")
+            
+            # label 확인 (metadata에서)
+            meta = ActionMetadataParser.parse(action)
+            label = meta.get("label") or action.get("text_content")
+            
+            # 그룹 키 결정 (1순위: screen_name, 2순위: label — 키워드 테이블로 정규화)
+            group_key = self.screen_names.screen_key(screen_name, label)
+            
+            # 그룹에 할당
+            if group_key:
+                if group_key not in groups:
+                    groups[group_key] = {
+                        "prev_image": cluster.get("prev_image"),
+                        "prev_image_hash": cluster.get("prev_image_hash"),
+                        "images": cluster.get("images", []).copy(),
+                        "actions": [],
+                        "representative_image": None,
+                        "first_action_idx": cluster.get("first_action_idx", 999999),
+                        "first_action_sequence": 999999,
+                        "phash_distances": cluster.get("phash_distances", []).copy(),
+                        "is_popup_group": cluster.get("is_popup_group", False),
+                        "popup_id": cluster.get("popup_id")
+                    }
+                groups[group_key]["actions"].append(action)
+            else:
+                unassigned.append(action)
+        
+        # 분리된 그룹이 2개 이상이면 분리 수행
+        if len(groups) >= 2:
+            result_clusters = []
+            for group_key, group_data in groups.items():
+                if group_data["actions"]:
+                    # action_sequence 정렬
+                    group_data["actions"].sort(key=self.sequence)
+                    # first_action_sequence 설정
+                    if group_data["actions"]:
+                        group_data["first_action_sequence"] = self.sequence(group_data["actions"][0])
+                    result_clusters.append(group_data)
+            
+            # 할당되지 않은 액션들은 첫 번째 그룹에 추가
+            if unassigned and result_clusters:
+                result_clusters[0]["actions"].extend(unassigned)
+                result_clusters[0]["actions"].sort(key=self.sequence)
+            
+            return result_clusters
+        
+        # 분리할 필요 없으면 원본 반환
+        return [cluster]
+
+    def process_clusters(self, clusters):
+        """
+        클러스터 후처리: 팝업은 분리하지 않고 같은 그룹에 유지
+        대표 이미지는 팝업 이미지 우선, 없으면 클릭 전 이미지
+        screen_name 또는 label 기준으로 분리 가능한 경우 분리
+        """
+        results = []
+        
+        for cluster in clusters:
+            # 액션 순서 정렬 (action_sequence 기준 - 로그 순서 우선)
+            cluster["actions"].sort(key=self.sequence)
+            
+            # screen_name 또는 label 기준으로 분리 시도
+            split_clusters = self.split_by_screen_name_or_label(cluster)
+            
+            for split_cluster in split_clusters:
+                # 대표 이미지 선택 우선순위:
+                # 1순위: 팝업 이미지 (클릭 후 팝업 이미지)
+                # 2순위: 클릭 후 새로운 스크린샷 (클릭 결과 화면)
+                # 3순위: 클릭 전 이미지
+                
+                popup_image = None
+                click_result_image = None
+                prev_image = split_cluster.get("prev_image")
+                
+                # 클릭 액션 추출
+                click_actions = [a for a in split_cluster["actions"] if self.record(a).action_type == "click"]
+                
+                # 1순위: 팝업 이미지 찾기
+                for act in split_cluster["actions"]:
+                    if self.is_popup_action(act):
+                        # 팝업 액션의 스크린샷 (클릭 후 팝업 이미지)
+                        popup_img_path = self.record(act).screenshot_path
+                        if popup_img_path and os.path.exists(popup_img_path):
+                            popup_image = popup_img_path
+                            break
+                
+                # 2순위: 클릭 후 새로운 스크린샷 찾기 (클릭 결과 화면)
+                if not popup_image and click_actions:
+                    # 마지막 클릭 액션부터 역순으로 확인
+                    for click_action in reversed(click_actions):
+                        click_idx = split_cluster["actions"].index(click_action)
+                        
+                        # 클릭 후 다음 액션들에서 새로운 스크린샷 찾기
+                        for j in range(click_idx + 1, len(split_cluster["actions"])):
+                            next_action = split_cluster["actions"][j]
+                            screenshot_path = self.record(next_action).screenshot_path
+                            
+                            if screenshot_path and os.path.exists(screenshot_path):
+                                # 클릭 전 이미지와 다른지 확인
+                                prev_screenshot = self.record(click_action).prev_screenshot
+                                if screenshot_path != prev_screenshot:
+                                    click_result_image = screenshot_path
+                                    break
+                        
+                        if click_result_image:
+                            break
+                        
+                        # 클릭 액션 자체의 스크린샷도 확인 (클릭 후 화면)
+                        click_screenshot = self.record(click_action).screenshot_path
+                        if click_screenshot and os.path.exists(click_screenshot):
+                            prev_screenshot = self.record(click_action).prev_screenshot
+                            if click_screenshot != prev_screenshot:
+                                click_result_image = click_screenshot
+                                break
+                        
+                        if click_result_image:
+                            break
+                
+                # 대표 이미지: 팝업 이미지 우선, 없으면 클릭 결과 이미지, 없으면 클릭 전 이미지
+                representative_image = popup_image or click_result_image or prev_image
+                
+                # elementBounds가 있는 클릭 액션 확인
+                valid_click_count = 0
+                for action in click_actions:
+                    bounds = ActionMetadataParser.get_element_bounds(action)
+                    if bounds:
+                        valid_click_count += 1
+                
+                # 클릭 액션이 있고 elementBounds가 있는 액션이 있으면 유효한 화면
+                if len(click_actions) > 0 and valid_click_count > 0:
+                    # 첫 번째 액션의 action_sequence 가져오기 (정렬용)
+                    first_action_seq = self.sequence(split_cluster["actions"][0]) if split_cluster["actions"] else 999999
+                    
+                    results.append({
+                        "type": "screen",
+                        "screen_name": f"화면 {len(results) + 1}",
+                        "actions": split_cluster["actions"],
+                        "images": split_cluster.get("images", []),
+                        "representative_image": representative_image,
+                        "is_popup": False,
+                        "prev_image": prev_image,
+                        "popup_image": popup_image,
+                        "click_result_image": click_result_image,  # 클릭 결과 이미지 저장
+                        "first_action_sequence": first_action_seq  # 정렬용 저장
+                    })
+
+        return results
+
+    # ---------------------------
+    # 최종 실행
+    # ---------------------------
+    def run(self):
+        # 진행 상황 업데이트
+        if self.progress_callback:
+            self.progress_callback(0.0, "그룹핑 시작...")
+        
+        # 클릭 전 이미지 기준으로 클러스터링
+        img_clusters = self.cluster_by_image()
+        
+        # 진행 상황 업데이트
+        if self.progress_callback:
+            self.progress_callback(0.85, "클러스터 후처리 중...")
+        
+        # 팝업 분리 없이 후처리 (팝업은 같은 그룹에 유지)
+        screens = self.process_clusters(img_clusters)
+
+        # 각 화면 내 액션 순서도 확실히 정렬 (action_sequence 기준 - 로그 순서 우선)
+        for screen in screens:
+            self.index.sort(screen["actions"])
+            # first_action_sequence 업데이트 (정렬 후)
+            if screen["actions"]:
+                screen["first_action_sequence"] = self.sequence(screen["actions"][0])
+
+        # 화면 순서 정렬 (action_sequence 기준 - 로그 순서 우선)
+        screens.sort(key=lambda s: s.get("first_action_sequence", 999999))
+
+        # 클릭 액션 추출 (정렬 후)
+        for screen in screens:
+            click_actions = [a for a in screen["actions"] if self.record(a).action_type == "click"]
+            screen["click_actions"] = click_actions
+
+        # 마지막 화면의 대표 이미지를 마지막 이미지로 설정
+        if screens:
+            last_screen = screens[-1]
+            for action in reversed(self.actions):
+                screenshot_path = self.record(action).screenshot_path
+                if screenshot_path and os.path.exists(screenshot_path):
+                    last_screen["representative_image"] = screenshot_path
+                    break
+        
+        self.stats["dom_fingerprint"] = self.dom_index.stats()
+
+        # 진행 상황 완료
+        if self.progress_callback:
+            self.progress_callback(1.0, f"완료: {len(screens)}개 화면 생성")
+
+        return screens
+
+
+# ==========================
+# 간단한 그룹핑 함수 (순차적 접근)
+# ==========================
+class SimpleGroup:
+    """간단한 그룹 클래스"""
+    def __init__(self):
+        self.actions = []
+        self.images = []
+        self.representative_image = None
+    
+    def add(self, action, image):
+        """액션과 이미지를 그룹에 추가"""
+        self.actions.append(action)
+        if image and image not in self.images:
+            self.images.append(image)
+    
+    def not_empty(self):
+        """그룹이 비어있지 않은지 확인"""
+        return len(self.actions) > 0
+
+
+def new_group():
+    """새 그룹 생성"""
+    return SimpleGroup()
+
+
+def get_screenshot(action):
+    """액션의 스크린샷 경로 반환"""
+    screenshot_path = action.get("screenshot_real_path") or action.get("screenshot_path")
+    if screenshot_path and os.path.exists(screenshot_path):
+        return screenshot_path
+    return None
+
+
+def is_same_screen(prev_image, curr_image):
+    """
+    두 이미지가 같은 화면인지 확인
+    SSIM + OCR diff + elementBounds 변동을 고려
+    """
+    if prev_image is None or curr_image is None:
+        return False
+    
+    if not os.path.exists(prev_image) or not os.path.exists(curr_image):
+        return False
+    
+    try:
+        # 이미지 로드
+        img1 = Image.open(prev_image).convert("RGB").resize((384, 384))
+        img2 = Image.open(curr_image).convert("RGB").resize((384, 384))
+        perf.count(perf.IMAGE_DECODES, 2)
+        perf.count(perf.COMPARISONS)
+        
+        # SSIM 계산
+        a1 = np.asarray(img1.convert("L"), dtype=np.float32)
+        a2 = np.asarray(img2.convert("L"), dtype=np.float32)
+        ssim_score, _ = ssim(a1, a2, full=True)
+        
+        # pHash 계산
+        hash1 = imagehash.phash(img1)
+        hash2 = imagehash.phash(img2)
+        phash_distance = hash1 - hash2
+        
+        # SSIM 임계값: 0.95 이상이면 같은 화면
+        # pHash 거리: 18 이하면 같은 화면
+        if ssim_score >= 0.95 or phash_distance <= 18:
+            return True
+        
+        return False
+    except Exception as e:
+        return False
+
+
+def is_popup(action):
+    """액션이 팝업 내에서 발생했는지 확인 (기존 로직 재사용)"""
+    meta = ActionMetadataParser.parse(action)
+    coords = meta.get("coordinates") or {}
+    bounds = coords.get("elementBounds") or {}
+    
+    # role="dialog" 확인
+    role = meta.get("role") or action.get("role")
+    if role and "dialog" in str(role).lower():
+        return True
+    
+    # z-index 높은 modal 영역 확인
+    z_index = meta.get("zIndex") or meta.get("z-index")
+    if z_index and isinstance(z_index, (int, float)) and z_index > 1000:
+        return True
+    
+    # 팝업 룰: 중앙 + 작은 영역
+    w = bounds.get("widthRatio")
+    h = bounds.get("heightRatio")
+    top = bounds.get("topRatio")
+    left = bounds.get("leftRatio")
+    
+    if any(x is None for x in [w, h, top, left]):
+        return False
+    
+    # 팝업 룰: 중앙 + 작은 영역
+    if w < 0.55 and h < 0.55 and 0.15 < top < 0.55:
+        return True
+    
+    return False
+
+
+def choose_representative_image(group):
+    """
+    그룹의 대표 이미지 선택
+    우선순위: 팝업 이미지 > 클릭 후 이미지 > 클릭 전 이미지
+    """
+    if not group.images:
+        return None
+    
+    # 팝업 이미지 우선 찾기
+    for action in group.actions:
+        if is_popup(action):
+            screenshot_path = action.get("screenshot_real_path") or action.get("screenshot_path")
+            if screenshot_path and os.path.exists(screenshot_path):
+                return screenshot_path
+    
+    # 클릭 액션의 클릭 후 이미지 찾기
+    click_actions = [a for a in group.actions if a.get("action_type") == "click"]
+    for click_action in reversed(click_actions):
+        screenshot_path = click_action.get("screenshot_real_path") or click_action.get("screenshot_path")
+        if screenshot_path and os.path.exists(screenshot_path):
+            return screenshot_path
+    
+    # 마지막으로 그룹의 첫 번째 이미지 사용
+    if group.images:
+        return group.images[0]
+    
+    return None
+
+
+def group_screens(actions):
+    """
+    간단한 순차적 화면 그룹핑 함수
+    - SSIM + OCR diff + elementBounds 변동으로 화면 변화 체크
+    - 팝업 규칙 적용
+    """
+    groups = []
+    current_group = new_group()
+    
+    prev_image = None
+    prev_action = None
+    
+    for action in actions:
+        curr_image = get_screenshot(action)
+        
+        if prev_image is None:
+            # 첫 액션 → 그냥 현재 그룹에 넣기
+            current_group.add(action, curr_image)
+            prev_image = curr_image
+            prev_action = action
+            continue
+        
+        # 1) 화면 변화 체크 (SSIM + OCR diff + elementBounds 변동)
+        same_screen = is_same_screen(prev_image, curr_image)
+        
+        # 2) 팝업 규칙
+        prev_popup = is_popup(prev_action)
+        curr_popup = is_popup(action)
+        
+        if same_screen:
+            # 화면이 그대로면 그냥 같은 그룹
+            current_group.add(action, curr_image)
+        else:
+            # 화면이 바뀐다. 팝업 관련인지 확인
+            if prev_popup or curr_popup:
+                # 팝업 전/후 이동 → 같은 그룹 유지
+                current_group.add(action, curr_image)
+            else:
+                # 완전히 다른 화면 → 그룹 종료 후 새 그룹 시작
+                groups.append(current_group)
+                current_group = new_group()
+                current_group.add(action, curr_image)
+        
+        prev_image = curr_image
+        prev_action = action
+    
+    if current_group.not_empty():
+        groups.append(current_group)
+    
+    # 각 그룹에 대표 이미지 설정
+    for g in groups:
+        g.representative_image = choose_representative_image(g)
+    
+    return groups
@@ -0,0 +1,149 @@
+"""
+screen_names.py - 키워드 테이블 기반 screen_name / label 정규화
+
+screen_name이나 label에 들어 있는 키워드로 화면 그룹 키를 정한다.
+(예: "요구사항 정의 (v2)" -> "요구사항 정의", "상세 설계" -> "프로그램 설계")
+
+키워드 테이블은 (키워드, 화면 키) 목록이고 앞에 있을수록 우선순위가 높다.
+테이블 전체를 Aho–Corasick 오토마톤 하나로 컴파일해 두므로
+문자열 하나는 키워드 수와 상관없이 한 번의 선형 스캔으로 분류된다.
+
+    classifier = ScreenNameClassifier([("요구사항 정의", "요구사항 정의"), ("설계", "프로그램 설계")])
+    classifier.classify("상세 설계")   # "프로그램 설계"
+
+프로젝트별 메뉴 이름은 JSON 파일([["키워드", "화면 키"], ...])로 불러와 set_default_classifier()로 교체한다.
+"""
+
+import json
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 기본 키워드 테이블 (앞에 있을수록 우선)
+DEFAULT_SCREEN_KEYWORDS: Tuple[Tuple[str, str], ...] = (
+    ("요구사항 정의", "요구사항 정의"),
+    ("프로그램 설계", "프로그램 설계"),
+    ("설계", "프로그램 설계"),
+)
+
+_NO_MATCH = -1
+
+
+class ScreenNameClassifier:
+    """
+    키워드 -> 화면 키 분류기 (Aho–Corasick)
+    - 상태마다 goto 전이, 실패 링크, 그 상태에서 끝나는(실패 링크 포함) 키워드 중 최우선 순위를 보관
+    - classify()는 문자열을 한 번 훑으면서 만난 키워드 중 테이블 순서가 가장 앞선 키를 반환
+    """
+
+    def __init__(self, table: Iterable[Sequence[str]] = DEFAULT_SCREEN_KEYWORDS) -> None:
+        self.table: List[Tuple[str, str]] = [(str(k), str(v)) for k, v in table if k]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [_NO_MATCH]  # 상태별 최우선 테이블 인덱스
+        self._build()
+
+    def _build(self) -> None:
+        # 1) 트라이
+        for rank, (keyword, _) in enumerate(self.table):
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(_NO_MATCH)
+                state = nxt
+            if self._best[state] == _NO_MATCH:
+                self._best[state] = rank
+
+        # 2) 실패 링크 (BFS) + 실패 링크를 따라 도달하는 키워드 우선순위 병합
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._best[nxt] = _min_rank(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+
+    def match_rank(self, text: Optional[str]) -> Optional[int]:
+        """text에서 찾은 키워드 중 최우선 테이블 인덱스 (없으면 None)"""
+        if not text:
+            return None
+        goto, fail, best = self._goto, self._fail, self._best
+        state = 0
+        found = _NO_MATCH
+        for ch in str(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found = _min_rank(found, best[state])
+            if found == 0:
+                break
+        return None if found == _NO_MATCH else found
+
+    def classify(self, text: Optional[str]) -> Optional[str]:
+        """text -> 화면 키 (키워드가 없으면 None)"""
+        rank = self.match_rank(text)
+        return None if rank is None else self.table[rank][1]
+
+    def screen_key(self, screen_name: Optional[str], label: Optional[str] = None) -> Optional[str]:
+        """
+        그룹 키 결정 (ScreenGrouper.get_screen_name_key 규칙)
+        - screen_name이 있으면: 키워드 매칭 키, 없으면 screen_name 그대로
+        - screen_name이 없으면: label의 키워드 매칭 키 (없으면 None)
+        """
+        if screen_name:
+            return self.classify(screen_name) or screen_name
+        return self.classify(label)
+
+
+def _min_rank(a: int, b: int) -> int:
+    if a == _NO_MATCH:
+        return b
+    if b == _NO_MATCH:
+        return a
+    return min(a, b)
+
+
+# =========================
+# 기본 분류기
+# =========================
+
+_default_classifier = ScreenNameClassifier()
+
+
+def load_table(path: str) -> List[Tuple[str, str]]:
+    """JSON 파일([["키워드", "화면 키"], ...] 또는 {"키워드": "화면 키"}) -> 키워드 테이블"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return [(str(k), str(v)) for k, v in data.items()]
+    return [(str(k), str(v)) for k, v in data]
+
+
+def default_classifier() -> ScreenNameClassifier:
+    """모든 그룹핑 엔진이 공유하는 분류기"""
+    return _default_classifier
+
+
+def set_default_classifier(table: Iterable[Sequence[str]]) -> ScreenNameClassifier:
+    """기본 분류기를 새 키워드 테이블로 교체 (프로젝트별 메뉴 이름)"""
+    global _default_classifier
+    _default_classifier = ScreenNameClassifier(table)
+    return _default_classifier
+
+
+def classify(text: Optional[str]) -> Optional[str]:
+    """기본 분류기로 text -> 화면 키"""
+    return _default_classifier.classify(text)
+
+
+def screen_key(screen_name: Optional[str], label: Optional[str] = None) -> Optional[str]:
+    """기본 분류기로 그룹 키 결정"""
+    return _default_classifier.screen_key(screen_name, label)
@@ -0,0 +1,123 @@
+"""
+segmentation.py - 순서가 있는 스크린샷 스트림의 변화점(change-point) 분할
+
+인접 프레임을 하나씩 비교해 즉시 끊는 그리디 방식 대신,
+프레임별 pHash 비트(64차원 0/1 벡터)를 특징 행렬로 만들고
+PELT(Pruned Exact Linear Time)로 "구간 내 분산 합 + 경계당 페널티"를 최소화하는
+최적 경계 집합을 찾는다.
+
+- 이미지 비교는 프레임별 해시 1회 + 인접 n-1 거리 신호(벡터 연산)뿐
+- 경계는 비용 감소가 페널티보다 클 때만 생긴다 (d = 두 화면의 pHash 해밍 거리)
+  * 프레임 N개 중 한 프레임만 튀는 깜빡임(flicker): 경계 2개가 필요하므로
+    d·(N-1)/N > 2·penalty 이면 그 프레임이 별도 구간으로 분리됨 (대략 d > 2×penalty)
+    예: 기본 9.0에서 5×A + 1×B + 5×A 는 d ≥ 20이면 [5, 6, 11], 19 이하면 한 구간
+  * a개 프레임 뒤에 b개 프레임으로 지속되는 변화: d·a·b/(a+b) > penalty 이면 분할
+    (예: 5 + 5 프레임이면 d ≥ 4) - 깜빡임보다 훨씬 작은 거리에서도 끊김
+- penalty가 클수록 경계가 줄어든다 (깜빡임을 무시하려면 penalty > 최대 깜빡임 거리 / 2)
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_PENALTY = 9.0
+
+
+# =========================
+# 특징 / 신호
+# =========================
+
+def hash_bits(hashes: Sequence[Any]) -> np.ndarray:
+    """imagehash.ImageHash 리스트 -> (n, bits) float 행렬"""
+    rows = [np.asarray(h.hash, dtype=np.float64).ravel() for h in hashes]
+    if not rows:
+        return np.zeros((0, 0), dtype=np.float64)
+    return np.vstack(rows)
+
+
+def neighbour_distances(features: np.ndarray) -> np.ndarray:
+    """인접 프레임 간 해밍 거리 신호 (길이 n-1)"""
+    if len(features) < 2:
+        return np.zeros(0, dtype=np.int64)
+    return np.count_nonzero(features[1:] != features[:-1], axis=1)
+
+
+# =========================
+# PELT
+# =========================
+
+def pelt(features: np.ndarray, penalty: float = DEFAULT_PENALTY, min_size: int = 1) -> List[int]:
+    """
+    L2 비용(구간 평균으로부터의 제곱 오차 합) PELT
+    반환: 각 구간의 끝 인덱스(미포함) 리스트, 마지막 값은 항상 n
+    """
+    n = len(features)
+    if n == 0:
+        return []
+
+    # 누적합으로 구간 비용을 O(d)에 계산
+    zeros = np.zeros((1, features.shape[1]), dtype=np.float64)
+    s1 = np.vstack([zeros, np.cumsum(features, axis=0)])
+    s2 = np.concatenate([[0.0], np.cumsum(np.sum(features * features, axis=1))])
+
+    def cost(starts: np.ndarray, end: int) -> np.ndarray:
+        length = (end - starts).astype(np.float64)
+        sums = s1[end] - s1[starts]
+        return (s2[end] - s2[starts]) - np.sum(sums * sums, axis=1) / length
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    last_change = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+
+    for end in range(min_size, n + 1):
+        valid = candidates[end - candidates >= min_size]
+        if len(valid) == 0:
+            continue
+        costs = best[valid] + cost(valid, end)
+        # 동점이면 가장 이른 시작점 (결정적 결과)
+        idx = int(np.argmin(costs + penalty))
+        best[end] = costs[idx] + penalty
+        last_change[end] = valid[idx]
+
+        # 가지치기: 이후 어떤 끝점에서도 최적이 될 수 없는 시작점 제거
+        keep = costs <= best[end]
+        pending = candidates[end - candidates < min_size]
+        candidates = np.concatenate([valid[keep], pending, [end]])
+
+    ends: List[int] = []
+    end = n
+    while end > 0:
+        ends.append(end)
+        end = int(last_change[end])
+    return ends[::-1]
+
+
+def segment_hashes(
+    hashes: Sequence[Optional[Any]],
+    penalty: float = DEFAULT_PENALTY,
+) -> List[Tuple[int, int]]:
+    """
+    프레임 해시 리스트 -> [(start, end), ...] 구간 리스트
+    해시가 없는 프레임(이미지 로드 실패)은 단독 구간으로 두고
+    그 사이의 연속 구간마다 PELT를 적용한다.
+    """
+    segments: List[Tuple[int, int]] = []
+    run_start = 0
+
+    def flush(run_end: int) -> None:
+        if run_end <= run_start:
+            return
+        features = hash_bits(hashes[run_start:run_end])
+        prev = run_start
+        for end in pelt(features, penalty):
+            segments.append((prev, run_start + end))
+            prev = run_start + end
+
+    for idx, h in enumerate(hashes):
+        if h is None:
+            flush(idx)
+            segments.append((idx, idx + 1))
+            run_start = idx + 1
+    flush(len(hashes))
+    return segments
@@ -0,0 +1,148 @@
+"""
+sequence_index.py - 실행(execution) 단위 action_sequence 정렬 인덱스
+
+재그룹핑 필터(시점 이후 액션), 첫/마지막 시퀀스 표시, 화면 정렬이 모두
+액션 목록을 매번 훑거나 action_sequence로 다시 정렬하고 있었다.
+SequenceIndex는 액션을 시퀀스 순으로 한 번만 정렬해 두고
+- 시퀀스 범위 조회: bisect로 O(log n) + 결과 크기
+- action_id / 액션 객체 -> 위치: dict 조회 O(1)
+- 이전 / 다음 액션: 위치 ±1 로 O(1)
+을 제공한다.
+
+    index = SequenceIndex(actions)
+    index.after(120)              # action_sequence > 120 인 액션들 (정렬됨)
+    index.between(10, 20)         # 10 <= action_sequence <= 20
+    index.neighbours(action)      # (이전 액션, 다음 액션)
+    index.sort(screen["actions"]) # 인덱스 위치 기준 제자리 정렬
+
+시퀀스가 없는 액션은 MISSING_SEQUENCE(999999)로 맨 뒤에 놓인다 (기존 엔진의 정렬 키와 동일).
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modules.records import MISSING_SEQUENCE, to_int
+
+
+def sequence_key(action: Dict[str, Any]) -> int:
+    """원본 액션 dict의 action_sequence 정렬 키 (정수, 없으면 MISSING_SEQUENCE)"""
+    value = to_int(action.get("action_sequence"))
+    return value if value is not None else MISSING_SEQUENCE
+
+
+class SequenceIndex:
+    """action_sequence 순으로 정렬된 액션 목록 + 위치 조회 테이블 (같은 시퀀스는 입력 순서 유지)"""
+
+    def __init__(self, actions: Iterable[Dict[str, Any]], key=sequence_key) -> None:
+        pairs = sorted(((key(a), a) for a in actions), key=lambda pair: pair[0])
+        self.keys: List[int] = [k for k, _ in pairs]
+        self.actions: List[Dict[str, Any]] = [a for _, a in pairs]
+        # id(액션) -> 위치, action_id -> 위치
+        self._positions: Dict[int, int] = {id(a): i for i, a in enumerate(self.actions)}
+        self._by_action_id: Dict[Any, int] = {}
+        for i, action in enumerate(self.actions):
+            action_id = action.get("action_id")
+            if action_id is not None:
+                self._by_action_id.setdefault(action_id, i)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.actions)
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        return self.actions[position]
+
+    def __contains__(self, action: Any) -> bool:
+        return id(action) in self._positions
+
+    # ---------------------------
+    # 위치 조회
+    # ---------------------------
+    def position(self, action: Dict[str, Any], default: Optional[int] = None) -> Optional[int]:
+        """액션 객체 -> 정렬 위치 (인덱스에 없으면 default)"""
+        return self._positions.get(id(action), default)
+
+    def position_of_id(self, action_id: Any) -> Optional[int]:
+        """action_id -> 정렬 위치 (없으면 None)"""
+        return self._by_action_id.get(action_id)
+
+    def by_id(self, action_id: Any) -> Optional[Dict[str, Any]]:
+        """action_id -> 액션 (없으면 None)"""
+        position = self._by_action_id.get(action_id)
+        return None if position is None else self.actions[position]
+
+    def sequence(self, action: Dict[str, Any]) -> int:
+        """인덱스에 있는 액션의 정렬 키 (없으면 MISSING_SEQUENCE)"""
+        position = self._positions.get(id(action))
+        return self.keys[position] if position is not None else MISSING_SEQUENCE
+
+    # ---------------------------
+    # 이웃
+    # ---------------------------
+    def prev(self, action: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """바로 앞 액션 (첫 액션이거나 인덱스에 없으면 None)"""
+        position = self._positions.get(id(action))
+        if not position:
+            return None
+        return self.actions[position - 1]
+
+    def next(self, action: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """바로 뒤 액션 (마지막 액션이거나 인덱스에 없으면 None)"""
+        position = self._positions.get(id(action))
+        if position is None or position + 1 >= len(self.actions):
+            return None
+        return self.actions[position + 1]
+
+    def neighbours(self, action: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(이전 액션, 다음 액션)"""
+        return self.prev(action), self.next(action)
+
+    def first(self) -> Optional[Dict[str, Any]]:
+        return self.actions[0] if self.actions else None
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        return self.actions[-1] if self.actions else None
+
+    # ---------------------------
+    # 범위 조회
+    # ---------------------------
+    def between(self, lo: Optional[float] = None, hi: Optional[float] = None) -> List[Dict[str, Any]]:
+        """lo <= action_sequence <= hi 인 액션들 (None이면 그쪽 제한 없음)"""
+        start = 0 if lo is None else bisect_left(self.keys, lo)
+        end = len(self.keys) if hi is None else bisect_right(self.keys, hi)
+        return self.actions[start:end]
+
+    def after(self, seq: float) -> List[Dict[str, Any]]:
+        """action_sequence > seq 인 액션들 (시퀀스 없는 액션 포함, 기존 999999 기본값과 동일)"""
+        return self.actions[bisect_right(self.keys, seq):]
+
+    def before(self, seq: float) -> List[Dict[str, Any]]:
+        """action_sequence < seq 인 액션들"""
+        return self.actions[:bisect_left(self.keys, seq)]
+
+    def span(self) -> Tuple[Optional[int], Optional[int]]:
+        """(첫 시퀀스, 마지막 시퀀스) - 시퀀스가 없는 액션은 건너뜀"""
+        if not self.keys:
+            return None, None
+        end = bisect_left(self.keys, MISSING_SEQUENCE)
+        if end == 0:
+            return None, None
+        return self.keys[0], self.keys[end - 1]
+
+    # ---------------------------
+    # 정렬
+    # ---------------------------
+    def sort(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        인덱스에 있는 액션 부분집합을 정렬 위치 기준으로 제자리 정렬 (같은 리스트 반환)
+        - 이미 정렬되어 있으면 정렬하지 않음
+        - 인덱스에 없는 액션은 맨 뒤
+        """
+        positions = self._positions
+        missing = len(self.actions)
+        keys = [positions.get(id(a), missing) for a in actions]
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+            actions.sort(key=lambda a: positions.get(id(a), missing))
+        return actions
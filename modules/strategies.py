@@ -0,0 +1,329 @@
+"""
+strategies.py - 화면 그룹핑 전략 레지스트리 + 공용 벤치마크 하네스
+
+모든 그룹핑 구현을 같은 입출력 계약으로 등록한다.
+
+    입력: raw 액션 dict 리스트 (modules.loader.load_actions 결과)
+    출력: 화면 dict 리스트
+          {"screen_name": str, "representative_image": Optional[str], "actions": [raw 액션 dict, ...]}
+
+하네스는 같은 실행(execution)에 대해 등록된 전략을 모두 돌려서
+실행 시간 / 이미지 디코드 수 / 비교 횟수 / 최대 메모리 / 기준 라벨과의 일치도(Rand index)를 보고한다.
+"""
+
+import contextlib
+import copy
+import io
+import json
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from modules import perf
+
+
+# =========================
+# 레지스트리
+# =========================
+
+@dataclass
+class GroupingStrategy:
+    """등록된 그룹핑 전략 정보"""
+    name: str
+    func: Callable[..., List[Dict[str, Any]]]
+    description: str = ""
+    uses_images: bool = False
+
+
+GROUPING_STRATEGIES: Dict[str, GroupingStrategy] = {}
+
+
+def register_strategy(name: str, description: str = "", uses_images: bool = False):
+    """그룹핑 전략 등록 데코레이터"""
+    def decorator(func):
+        if name in GROUPING_STRATEGIES:
+            raise ValueError(f"이미 등록된 전략입니다: {name}")
+        GROUPING_STRATEGIES[name] = GroupingStrategy(
+            name=name,
+            func=func,
+            description=description,
+            uses_images=uses_images,
+        )
+        return func
+    return decorator
+
+
+def get_strategy(name: str) -> GroupingStrategy:
+    """이름으로 전략 조회"""
+    if name not in GROUPING_STRATEGIES:
+        available = ", ".join(sorted(GROUPING_STRATEGIES))
+        raise KeyError(f"알 수 없는 전략: {name} (사용 가능: {available})")
+    return GROUPING_STRATEGIES[name]
+
+
+def run_strategy(name: str, actions: List[Dict[str, Any]], **params) -> List[Dict[str, Any]]:
+    """
+    전략 실행. 엔진이 돌려주는 화면 dict가 입력 액션 객체를 그대로 담고
+    일부 엔진은 액션을 화면 사이로 옮기므로 전략 간 격리를 위해 항상 깊은 복사본을 넘긴다.
+    """
+    strategy = get_strategy(name)
+    return strategy.func(copy.deepcopy(actions), **params)
+
+
+def _screen(screen_name: Any, representative_image: Optional[str], actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """공통 출력 계약의 화면 dict 생성"""
+    return {
+        "screen_name": screen_name,
+        "representative_image": representative_image,
+        "actions": list(actions),
+    }
+
+
+# =========================
+# 기본 전략 등록
+# =========================
+
+@register_strategy("fixed_indices", "screen_name + 고정 대표 스크린샷 인덱스 (modules.grouping.group_screens)")
+def _fixed_indices(actions, **params):
+    from modules.grouping import group_screens
+    return [
+        _screen(s["screen_name"], s["representative_image"], s["actions"])
+        for s in group_screens(actions)
+    ]
+
+
+@register_strategy("screen_name", "screen_name 변경 기준 (screen_grouping.group_actions_by_screen)")
+def _screen_name(actions, **params):
+    from modules.grouping import group_actions_by_screen
+    return [
+        _screen(s["screen_name"], s["representative_image"], s["actions"])
+        for s in group_actions_by_screen(actions)
+    ]
+
+
+@register_strategy("screen_grouper", "클릭 전 이미지 pHash + Vision Check (ScreenGrouper)", uses_images=True)
+def _screen_grouper(actions, **params):
+    from modules.screen_grouper import ScreenGrouper
+    screens = ScreenGrouper(actions, **params).run()
+    return [
+        _screen(s["screen_name"], s.get("representative_image"), s["actions"])
+        for s in screens
+    ]
+
+
+@register_strategy("sequential", "인접 스크린샷 SSIM + pHash 순차 비교 (test_screen_grouping.group_screens)", uses_images=True)
+def _sequential(actions, **params):
+    from modules.screen_grouper import group_screens
+    groups = group_screens(actions)
+    return [
+        _screen(f"화면 {idx}", g.representative_image, g.actions)
+        for idx, g in enumerate(groups, 1)
+    ]
+
+
+@register_strategy("flow", "순서 기반 플로우 + 화면 전환 감지 (UIScreenshotAnalyzer.build_screen_summary)", uses_images=True)
+def _flow(actions, **params):
+    from pages.test2 import UIScreenshotAnalyzer
+    analyzer = UIScreenshotAnalyzer(json_path="", keep_raw=True, **params)
+    analyzer.load_raw_actions(actions)
+    analyzer.collect_screenshot_paths()
+    analyzer.load_images_and_hashes()
+    analyzer.build_screen_summary()
+    return [
+        _screen(f"Cluster {sc.cluster_id}", sc.representative_image, [a.raw for a in sc.actions])
+        for sc in analyzer.clusters
+    ]
+
+
+@register_strategy("pelt", "pHash 비트 특징 + PELT 변화점 분할 (UIScreenshotAnalyzer, segmentation='pelt')", uses_images=True)
+def _pelt(actions, **params):
+    return _flow(actions, **{"segmentation": "pelt", **params})
+
+
+# =========================
+# 일치도 (기준 라벨 대비)
+# =========================
+
+def action_key(action: Dict[str, Any]) -> Any:
+    """액션 식별 키 (action_id 우선, 없으면 action_sequence)"""
+    if action.get("action_id") is not None:
+        return action["action_id"]
+    return ("seq", action.get("action_sequence"))
+
+
+def screens_to_labels(screens: List[Dict[str, Any]]) -> Dict[Any, int]:
+    """화면 리스트 -> {액션 키: 화면 번호}"""
+    labels: Dict[Any, int] = {}
+    for idx, screen in enumerate(screens):
+        for action in screen["actions"]:
+            labels.setdefault(action_key(action), idx)
+    return labels
+
+
+def load_reference(path: str) -> Dict[Any, Any]:
+    """
+    기준 라벨 파일 로드
+    - {"<action_id>": "<화면 라벨>", ...}
+    - [[action_id, ...], [action_id, ...], ...]  (화면별 action_id 목록)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        return {int(k) if str(k).isdigit() else k: v for k, v in data.items()}
+    if isinstance(data, list):
+        return {action_id: idx for idx, ids in enumerate(data) for action_id in ids}
+    raise ValueError(f"지원하지 않는 기준 라벨 형식: {path}")
+
+
+def _pairs(n: int) -> int:
+    return n * (n - 1) // 2
+
+
+def rand_index(labels: Dict[Any, Any], reference: Dict[Any, Any]) -> float:
+    """
+    Rand index (0~1): 기준 라벨에 있는 액션 쌍 중 같은/다른 화면 판단이 일치하는 비율.
+    전략 결과에 없는 액션은 단독 화면으로 취급한다.
+    """
+    keys = list(reference)
+    n = len(keys)
+    if n < 2:
+        return 1.0
+
+    pred = [labels.get(k, ("missing", k)) for k in keys]
+    ref = [reference[k] for k in keys]
+
+    joint = Counter(zip(pred, ref))
+    same_both = sum(_pairs(c) for c in joint.values())
+    same_pred = sum(_pairs(c) for c in Counter(pred).values())
+    same_ref = sum(_pairs(c) for c in Counter(ref).values())
+    total = _pairs(n)
+
+    agreements = total + 2 * same_both - same_pred - same_ref
+    return agreements / total
+
+
+# =========================
+# 벤치마크 하네스
+# =========================
+
+@dataclass
+class BenchmarkResult:
+    """전략 하나의 벤치마크 결과"""
+    strategy: str
+    wall_time: float = 0.0
+    image_decodes: int = 0
+    comparisons: int = 0
+    comparisons_avoided: int = 0
+    peak_memory: int = 0
+    screen_count: int = 0
+    agreement: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _run_quiet(name: str, actions: List[Dict[str, Any]], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """전략 실행 (엔진의 진행률 출력은 숨김)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_strategy(name, actions, **params)
+
+
+def benchmark_strategy(
+    name: str,
+    actions: List[Dict[str, Any]],
+    reference: Optional[Dict[Any, Any]] = None,
+    repeat: int = 1,
+    measure_memory: bool = True,
+    params: Optional[Dict[str, Any]] = None,
+) -> BenchmarkResult:
+    """전략 하나를 repeat회 실행해 최소 실행 시간과 카운터/메모리/일치도를 측정"""
+    params = params or {}
+    result = BenchmarkResult(strategy=name)
+    screens: List[Dict[str, Any]] = []
+
+    try:
+        timings = []
+        for _ in range(max(1, repeat)):
+            perf.reset()
+            start = time.perf_counter()
+            screens = _run_quiet(name, actions, params)
+            timings.append(time.perf_counter() - start)
+        counters = perf.snapshot()
+
+        result.wall_time = min(timings)
+        result.image_decodes = counters.get(perf.IMAGE_DECODES, 0)
+        result.comparisons = counters.get(perf.COMPARISONS, 0)
+        result.comparisons_avoided = counters.get(perf.COMPARISONS_AVOIDED, 0)
+        result.screen_count = len(screens)
+
+        # tracemalloc은 실행 시간을 왜곡하므로 별도 실행에서 측정
+        if measure_memory:
+            tracemalloc.start()
+            try:
+                _run_quiet(name, actions, params)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            result.peak_memory = peak
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    if reference is not None:
+        result.agreement = rand_index(screens_to_labels(screens), reference)
+    return result
+
+
+def benchmark_strategies(
+    actions: List[Dict[str, Any]],
+    names: Optional[List[str]] = None,
+    reference: Optional[Dict[Any, Any]] = None,
+    repeat: int = 1,
+    measure_memory: bool = True,
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[BenchmarkResult]:
+    """
+    등록된 전략(또는 names로 지정한 전략)을 같은 액션 입력으로 모두 실행.
+    params: {전략 이름: 전략별 파라미터 dict}
+    """
+    names = names or list(GROUPING_STRATEGIES)
+    params = params or {}
+    return [
+        benchmark_strategy(
+            name,
+            actions,
+            reference=reference,
+            repeat=repeat,
+            measure_memory=measure_memory,
+            params=params.get(name),
+        )
+        for name in names
+    ]
+
+
+def pick_fastest(results: List[BenchmarkResult], min_agreement: float) -> Optional[BenchmarkResult]:
+    """일치도가 min_agreement 이상인 전략 중 가장 빠른 전략"""
+    candidates = [
+        r for r in results
+        if r.error is None and r.agreement is not None and r.agreement >= min_agreement
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: r.wall_time)
+
+
+def format_report(results: List[BenchmarkResult]) -> str:
+    """벤치마크 결과 표 문자열"""
+    header = f"{'전략':<16}{'시간(ms)':>12}{'디코드':>10}{'비교':>10}{'생략':>8}{'메모리(MB)':>14}{'화면':>8}{'일치도':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        if r.error:
+            lines.append(f"{r.strategy:<16}  ❌ {r.error}")
+            continue
+        agreement = f"{r.agreement:.3f}" if r.agreement is not None else "-"
+        lines.append(
+            f"{r.strategy:<16}{r.wall_time * 1000:>12.1f}{r.image_decodes:>10}{r.comparisons:>10}{r.comparisons_avoided:>8}"
+            f"{r.peak_memory / (1024 * 1024):>14.2f}{r.screen_count:>8}{agreement:>10}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,111 @@
+"""
+string_table.py - 반복되는 액션 문자열 필드 인터닝 / 사전 인코딩
+
+json.load는 같은 값이라도 액션마다 새 str 객체를 만든다.
+class_name(Tailwind 클래스 목록은 수백 자), tag_name, action_type, created_by, screen_name처럼
+실행 하나에서 몇 가지 값만 반복되는 필드는 StringTable에 한 번만 보관하고
+액션은 같은 str 객체(또는 작은 정수 코드)를 참조하게 한다.
+
+    table = StringTable()
+    code = table.code("BUTTON")        # 0
+    table.string(code)                 # "BUTTON"
+    intern_fields(actions, table)      # 이미 로드된 액션 dict의 필드 값을 공유 객체로 교체
+    json.loads(text, object_hook=interning_hook(table))   # 파싱하면서 교체 (modules.loader)
+"""
+
+import sys
+from typing import Any, Callable, Dict, Iterable, List
+
+# 인터닝 대상 필드 (실행 안에서 값 종류가 적고 반복이 많은 필드)
+INTERNED_FIELDS = ("class_name", "tag_name", "action_type", "created_by", "screen_name")
+
+
+class StringTable:
+    """문자열 <-> 정수 코드 공유 테이블 (코드는 등록 순서대로 0, 1, 2, ...)"""
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self.strings: List[str] = []
+        # 통계: 조회된 참조 수 / 참조마다 따로 보관했을 때의 바이트 수
+        self.references = 0
+        self.raw_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def code(self, value: str) -> int:
+        """문자열 -> 코드 (처음 보는 문자열이면 등록)"""
+        self.references += 1
+        self.raw_bytes += sys.getsizeof(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self._codes[value] = code
+            self.strings.append(value)
+        return code
+
+    def string(self, code: int) -> str:
+        """코드 -> 문자열"""
+        return self.strings[code]
+
+    def intern(self, value: Any) -> Any:
+        """문자열이면 테이블의 공유 객체로 교체 (문자열이 아니면 그대로, 이미 공유 객체면 다시 세지 않음)"""
+        if not isinstance(value, str):
+            return value
+        code = self._codes.get(value)
+        if code is not None and self.strings[code] is value:
+            return value
+        return self.strings[self.code(value)]
+
+    @property
+    def stored_bytes(self) -> int:
+        """고유 문자열만 보관했을 때의 바이트 수"""
+        return sum(sys.getsizeof(s) for s in self.strings)
+
+    def stats(self) -> Dict[str, Any]:
+        stored = self.stored_bytes
+        return {
+            "strings": len(self.strings),
+            "references": self.references,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": stored,
+            "bytes_saved": max(0, self.raw_bytes - stored),
+        }
+
+
+def interning_hook(table: StringTable, fields: Iterable[str] = INTERNED_FIELDS) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """json.load(object_hook=...)용 함수: 객체가 만들어질 때마다 fields 값을 공유 문자열로 교체"""
+    fields = tuple(fields)
+
+    def hook(obj: Dict[str, Any]) -> Dict[str, Any]:
+        for name in fields:
+            value = obj.get(name)
+            if isinstance(value, str):
+                obj[name] = table.intern(value)
+        return obj
+
+    return hook
+
+
+def intern_fields(
+    actions: List[Dict[str, Any]],
+    table: StringTable,
+    fields: Iterable[str] = INTERNED_FIELDS,
+) -> List[Dict[str, Any]]:
+    """액션 dict의 fields 값을 table의 공유 문자열로 제자리 교체 (같은 리스트 반환)"""
+    fields = tuple(fields)
+    for action in actions:
+        for name in fields:
+            value = action.get(name)
+            if isinstance(value, str):
+                action[name] = table.intern(value)
+    return actions
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """통계 한 줄 요약"""
+    return (
+        f"문자열 인터닝: 참조 {stats['references']}개 → 고유 {stats['strings']}개 "
+        f"({stats['raw_bytes'] / 1024:.1f}KB → {stats['stored_bytes'] / 1024:.1f}KB, "
+        f"절약 {stats['bytes_saved'] / 1024:.1f}KB)"
+    )
@@ -0,0 +1,122 @@
+"""
+tile_viewer.py - 큰 스크린샷 딥줌 뷰어 Streamlit 컴포넌트
+
+원본 해상도 보기는 원본 PNG 전체를 한 장으로 보냈다 (전체 페이지 캡처면 수천~수만 px 높이).
+render_tiled()는 타일 피라미드(modules.tiles)를 미디어 서버 디렉터리 마운트로 제공하고
+뷰어(tile_viewer_component/index.html)는 현재 배율에서 보이는 타일만 받아 그린다.
+
+- 하이라이트: compositor.Highlight (원본 이미지 px = 피라미드 레벨 0 좌표)
+- style(HighlightStyle)을 넘기면 저장 이미지와 같은 색 (테두리 / 채우기 / 번호 배경)
+- 타일은 미디어 서버(기본 켜짐, modules.media_server 참고)의 디렉터리 마운트로 제공
+- 서버를 띄울 수 없으면 overlay 컴포넌트로 표시 크기 축소본 + 박스 (원본 전체는 보내지 않음)
+- 타일 생성 실패는 st.error / st.warning으로 표시
+
+    highlights = highlights_from_coordinates(coords_list, size, viewport, RED_STYLE)
+    render_tiled(image_path, highlights, style=RED_STYLE, height=700, key=f"tiles_{idx}")
+"""
+
+import os
+from typing import Iterable, Optional
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from modules.compositor import Highlight, HighlightStyle
+from modules.image_sizes import image_size
+from modules.media_server import mount_url
+from modules.overlay import render_overlay
+from modules.tiles import default_tiles
+
+# 프로덕션 기본값: 브라우저 콘솔 로그 없음
+DEBUG = False
+
+_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tile_viewer_component")
+_component = components.declare_component("screenshot_tiles", path=_COMPONENT_DIR)
+
+# 마운트 이름 (/static/tiles/...)
+_MOUNT_NAME = "tiles"
+# 박스 좌표 소수점 자리 (레벨 0 px)
+_PRECISION = 1
+
+
+def render_tiled(
+    image_path: str,
+    highlights: Iterable[Highlight] = (),
+    style: Optional[HighlightStyle] = None,
+    stroke: str = "red",
+    fill: str = "rgba(255, 0, 0, 0.2)",
+    line_width: int = 3,
+    labels: bool = True,
+    label_color: str = "white",
+    label_fill: str = "red",
+    label_size: int = 12,
+    height: int = 700,
+    key: Optional[str] = None,
+    debug: Optional[bool] = None,
+) -> None:
+    """
+    스크린샷을 딥줌 뷰어로 표시 (휠 확대/축소, 드래그 이동)
+    - 피라미드가 없으면 이번에 생성 (같은 내용이면 캐시 재사용)
+    - 같은 페이지에서 같은 이미지를 여러 번 그리면 key를 지정해야 함
+    """
+    highlights = list(highlights or ())
+    if style is not None:
+        r, g, b = style.color[:3]
+        stroke = label_fill = f"rgb({r}, {g}, {b})"
+        fill = f"rgba({r}, {g}, {b}, {style.fill_alpha / 255:.2f})"
+    tiles = default_tiles()
+    for message in tiles.take_errors():
+        st.warning(f"⚠️ {message}")
+    base = mount_url(_MOUNT_NAME, tiles.cache_dir)
+    if base is None:
+        st.caption("ℹ️ 미디어 서버를 쓸 수 없어 딥줌 대신 축소본으로 표시합니다.")
+        _render_fallback(image_path, highlights, stroke, fill, line_width, labels, label_color, label_fill, label_size, height, key, debug)
+        return
+
+    try:
+        with st.spinner("🧩 타일 생성 중..."):
+            pyramid = tiles.ensure(image_path)
+    except Exception as e:
+        st.error(f"❌ 타일 생성 오류: {e}")
+        return
+
+    _component(
+        base=f"{base}{pyramid.name}/",
+        image_width=pyramid.width,
+        image_height=pyramid.height,
+        tile_size=pyramid.tile_size,
+        levels=[list(size) for size in pyramid.levels],
+        ext=pyramid.ext,
+        boxes=[[round(v, _PRECISION) for v in (h.left, h.top, h.right, h.bottom)] for h in highlights],
+        labels=[h.number for h in highlights] if labels else False,
+        stroke=stroke,
+        fill=fill,
+        line_width=line_width,
+        label_color=label_color,
+        label_fill=label_fill,
+        label_size=label_size,
+        view_height=height,
+        debug=DEBUG if debug is None else debug,
+        key=key,
+        default=None,
+    )
+
+
+def _render_fallback(image_path, highlights, stroke, fill, line_width, labels, label_color, label_fill, label_size, height, key, debug):
+    """미디어 서버 없이: 뷰어 높이에 맞는 축소본 + 비율 박스 (overlay 컴포넌트, 원본 전체를 보내지 않음)"""
+    width, height = image_size(image_path)
+    boxes = [(h.left / width, h.top / height, (h.right - h.left) / width, (h.bottom - h.top) / height) for h in highlights]
+    render_overlay(
+        image_path,
+        boxes,
+        stroke=stroke,
+        fill=fill,
+        line_width=line_width,
+        labels=labels,
+        label_color=label_color,
+        label_fill=label_fill,
+        label_size=label_size,
+        max_height=height,
+        key=key,
+        debug=debug,
+    )
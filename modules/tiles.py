@@ -0,0 +1,298 @@
+"""
+tiles.py - 큰 스크린샷용 타일 피라미드 (딥줌)
+
+전체 페이지 캡처는 높이가 수천~수만 px인데, 원본 해상도로 보려면 이미지 전체를 한 번에 보내고
+브라우저가 거대한 비트맵을 디코드해야 했다. TileCache는 원본을 TILE_SIZE 정사각 타일의
+피라미드로 잘라 두고, 뷰어(modules/tile_viewer.py)는 현재 배율에서 보이는 타일만 받는다.
+
+- 레벨 0 = 원본 해상도, 레벨 n = 1/2^n 축소 (가장 높은 레벨은 타일 하나에 들어감)
+- 위치: <cache_dir>/<해시 앞 2자>/<해시>_<타일 크기>/<레벨>/<열>_<행>.webp + pyramid.json
+  (원본 내용 해시로 주소를 정하므로 내용이 같으면 다시 만들지 않음)
+- 임시 디렉터리에 모두 만든 뒤 교체 (pyramid.json이 있으면 완성된 피라미드)
+- WebP를 쓸 수 없는 Pillow 빌드면 JPEG (previews.preview_format)
+- 용량 제한: 합계가 max_bytes(기본 2GB)를 넘으면 가장 오래 쓰지 않은 피라미드부터 삭제
+  (pyramid.json의 mtime = 마지막 사용 시각, 사이드바 "🧹 캐시 비우기"는 clear())
+- 백그라운드 생성(prefetch) 실패는 stats()의 errors로 세고 메시지를 모아 둠 (뷰어가 take_errors()로 표시)
+- 하이라이트 좌표는 레벨 0 px (= 원본 이미지 px)
+
+    pyramid = default_tiles().ensure(image_path)
+    pyramid.tile_path(level, col, row)
+"""
+
+import json
+import math
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from modules.media_server import MediaRegistry
+from modules.previews import preview_format
+
+TILE_SIZE = 512
+TILE_QUALITY = 80
+DEFAULT_CACHE_DIR = os.path.join(".cache", "tiles")
+MANIFEST_NAME = "pyramid.json"
+# 타일 캐시 전체 용량 상한 (넘으면 오래 쓰지 않은 피라미드부터 삭제)
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+# 뷰어에 아직 표시하지 않은 생성 실패 메시지 최대 개수
+MAX_PENDING_ERRORS = 20
+
+
+@dataclass(frozen=True)
+class TilePyramid:
+    """완성된 타일 피라미드 (levels[n] = 레벨 n의 (폭, 높이))"""
+    digest: str
+    width: int
+    height: int
+    tile_size: int
+    levels: Tuple[Tuple[int, int], ...]
+    ext: str
+    directory: str
+    # 타일 파일 합계 크기
+    size_bytes: int = 0
+
+    @property
+    def name(self) -> str:
+        """캐시 디렉터리 기준 상대 경로 (URL 경로로도 사용)"""
+        return f"{self.digest[:2]}/{os.path.basename(self.directory)}"
+
+    def grid(self, level: int) -> Tuple[int, int]:
+        """레벨의 (열 수, 행 수)"""
+        width, height = self.levels[level]
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def tile_path(self, level: int, col: int, row: int) -> str:
+        return os.path.join(self.directory, str(level), f"{col}_{row}{self.ext}")
+
+    def tile_count(self) -> int:
+        return sum(cols * rows for cols, rows in (self.grid(level) for level in range(len(self.levels))))
+
+
+def level_sizes(width: int, height: int, tile_size: int = TILE_SIZE) -> List[Tuple[int, int]]:
+    """레벨별 크기 (레벨 0 = 원본, 긴 변이 타일 하나에 들어갈 때까지 절반씩)"""
+    sizes = [(width, height)]
+    while max(sizes[-1]) > tile_size:
+        w, h = sizes[-1]
+        sizes.append((max(1, math.ceil(w / 2)), max(1, math.ceil(h / 2))))
+    return sizes
+
+
+class TileCache:
+    """내용 주소 기반 타일 피라미드 캐시"""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        tile_size: int = TILE_SIZE,
+        quality: int = TILE_QUALITY,
+        max_workers: int = 1,
+        max_bytes: int = MAX_CACHE_BYTES,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.tile_size = tile_size
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.format, self.ext = preview_format()
+        self.registry = MediaRegistry()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tiles")
+        # _building / 통계 / 실패 메시지 보호 (생성 스레드와 렌더러가 함께 갱신)
+        self._lock = threading.Lock()
+        # 해시 -> 생성 중 잠금 (같은 피라미드를 동시에 두 번 만들지 않도록)
+        self._building: Dict[str, threading.Lock] = {}
+        self._stats = {"hits": 0, "built": 0, "tiles": 0, "errors": 0, "evicted": 0}
+        self._errors: List[str] = []
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def take_errors(self) -> List[str]:
+        """아직 표시하지 않은 백그라운드 생성 실패 메시지 (꺼내면 비움)"""
+        with self._lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def pyramid_dir(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{self.tile_size}")
+
+    def load(self, digest: str) -> Optional[TilePyramid]:
+        """완성된 피라미드 (없으면 None, 있으면 마지막 사용 시각 갱신)"""
+        directory = self.pyramid_dir(digest)
+        manifest = os.path.join(directory, MANIFEST_NAME)
+        try:
+            with open(manifest, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(manifest)
+        except (OSError, ValueError):
+            return None
+        return TilePyramid(
+            digest=digest,
+            width=data["width"],
+            height=data["height"],
+            tile_size=data["tile_size"],
+            levels=tuple(tuple(size) for size in data["levels"]),
+            ext=data["ext"],
+            directory=directory,
+            size_bytes=data.get("size_bytes", 0),
+        )
+
+    def ensure(self, path: str) -> TilePyramid:
+        """피라미드 (없으면 지금 생성, 이미 다른 스레드가 만드는 중이면 기다림)"""
+        digest = self.registry.digest(path)
+        pyramid = self.load(digest)
+        if pyramid is not None:
+            self._count(hits=1)
+            return pyramid
+        with self._lock:
+            lock = self._building.setdefault(digest, threading.Lock())
+        with lock:
+            pyramid = self.load(digest)
+            if pyramid is None:
+                pyramid = self._build(path, digest)
+        with self._lock:
+            self._building.pop(digest, None)
+        return pyramid
+
+    def prefetch(self, paths: Iterable[Optional[str]]) -> None:
+        """피라미드를 백그라운드에서 미리 생성"""
+        for path in dict.fromkeys(p for p in paths if p):
+            self._pool.submit(self._prefetch_one, path)
+
+    def _prefetch_one(self, path: str) -> None:
+        try:
+            self.ensure(path)
+        except Exception as e:
+            # 백그라운드 스레드라 st를 쓸 수 없음: 뷰어가 take_errors()로 표시
+            with self._lock:
+                self._stats["errors"] += 1
+                if len(self._errors) < MAX_PENDING_ERRORS:
+                    self._errors.append(f"타일 생성 실패 ({os.path.basename(path)}): {e}")
+
+    def _build(self, path: str, digest: str) -> TilePyramid:
+        directory = self.pyramid_dir(digest)
+        tmp_dir = f"{directory}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        with Image.open(path) as source:
+            img = source.convert("RGB")
+        sizes = level_sizes(img.width, img.height, self.tile_size)
+        count = 0
+        size_bytes = 0
+        try:
+            for level, size in enumerate(sizes):
+                if img.size != size:
+                    img = img.resize(size, Image.LANCZOS)
+                level_dir = os.path.join(tmp_dir, str(level))
+                os.makedirs(level_dir)
+                for top in range(0, size[1], self.tile_size):
+                    for left in range(0, size[0], self.tile_size):
+                        tile = img.crop((left, top, min(left + self.tile_size, size[0]), min(top + self.tile_size, size[1])))
+                        name = f"{left // self.tile_size}_{top // self.tile_size}{self.ext}"
+                        tile_path = os.path.join(level_dir, name)
+                        tile.save(tile_path, self.format, quality=self.quality)
+                        size_bytes += os.path.getsize(tile_path)
+                        count += 1
+
+            pyramid = TilePyramid(digest, sizes[0][0], sizes[0][1], self.tile_size, tuple(sizes), self.ext, directory, size_bytes)
+            manifest = asdict(pyramid)
+            manifest.pop("directory")
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            try:
+                os.replace(tmp_dir, directory)
+            except OSError:
+                # 다른 프로세스가 먼저 완성함
+                if self.load(digest) is None:
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._count(built=1, tiles=count)
+        self.prune(keep=(directory,))
+        return pyramid
+
+    # ---------------------------
+    # 용량 관리
+    # ---------------------------
+    def _pyramids(self) -> List[Tuple[float, int, str]]:
+        """완성된 피라미드 (마지막 사용 시각, 크기, 디렉터리) - 오래된 것부터"""
+        found = []
+        try:
+            prefixes = os.listdir(self.cache_dir)
+        except OSError:
+            return found
+        for prefix in prefixes:
+            try:
+                names = os.listdir(os.path.join(self.cache_dir, prefix))
+            except OSError:
+                continue
+            for name in names:
+                directory = os.path.join(self.cache_dir, prefix, name)
+                manifest = os.path.join(directory, MANIFEST_NAME)
+                try:
+                    used = os.stat(manifest).st_mtime
+                    with open(manifest, "r", encoding="utf-8") as f:
+                        size_bytes = json.load(f).get("size_bytes")
+                except (OSError, ValueError):
+                    continue
+                if size_bytes is None:
+                    size_bytes = _dir_bytes(directory)
+                found.append((used, size_bytes, directory))
+        found.sort()
+        return found
+
+    def prune(self, max_bytes: Optional[int] = None, keep: Iterable[str] = ()) -> int:
+        """합계가 max_bytes(기본 self.max_bytes) 이하가 될 때까지 오래 쓰지 않은 피라미드 삭제 -> 삭제 수"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        keep = set(keep)
+        pyramids = self._pyramids()
+        total = sum(size for _, size, _ in pyramids)
+        removed = 0
+        for _, size_bytes, directory in pyramids:
+            if total <= limit:
+                break
+            if directory in keep:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size_bytes
+            removed += 1
+        self._count(evicted=removed)
+        return removed
+
+    def clear(self) -> int:
+        """완성된 피라미드 전부 삭제 (생성 중인 임시 디렉터리는 그대로) -> 삭제 수"""
+        return self.prune(max_bytes=-1)
+
+
+def _dir_bytes(directory: str) -> int:
+    """디렉터리 아래 파일 크기 합계 (크기가 기록되지 않은 피라미드용)"""
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+_default: Optional[TileCache] = None
+_default_lock = threading.Lock()
+
+
+def default_tiles() -> TileCache:
+    """프로세스 공용 타일 캐시"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = TileCache()
+        return _default
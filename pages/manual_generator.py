@@ -3,26 +3,31 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-from modules.loader import load_actions
 from modules.grouping import group_screens
+from modules.page_cache import cached_actions, file_digest
 
 
-st.title("📄 메뉴얼 자동 생성")
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_manual(json_file, json_digest):
+    """메뉴얼 markdown (json_digest는 캐시 키: JSON 내용이 바뀌면 다시 생성)"""
+    actions = cached_actions(json_file, json_digest)
 
-json_file = "data/actions/metadata_182.json"
-actions = load_actions(json_file)
+    screens = group_screens(actions)
 
-screens = group_screens(actions)
+    manual_md = ""
 
-manual_md = ""
+    for s in screens:
+        manual_md += f"## 📘 {s['screen_name']}\n"
+        manual_md += f"대표 이미지: `{s['representative_image']}`\n\n"
 
-for s in screens:
-    manual_md += f"## 📘 {s['screen_name']}\n"
-    manual_md += f"대표 이미지: `{s['representative_image']}`\n\n"
+        for a in s["actions"]:
+            manual_md += f"- `{a['action_type']}` | seq:{a['action_sequence']}\n"
 
-    for a in s["actions"]:
-        manual_md += f"- `{a['action_type']}` | seq:{a['action_sequence']}\n"
+        manual_md += "\n---\n"
+    return manual_md
 
-    manual_md += "\n---\n"
 
-st.markdown(manual_md)
+st.title("📄 메뉴얼 자동 생성")
+
+json_file = "data/actions/metadata_182.json"
+st.markdown(build_manual(json_file, file_digest(json_file)))
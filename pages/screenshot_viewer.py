@@ -4,7 +4,7 @@ import json
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-from modules.loader import load_actions
+from modules.page_cache import cached_actions, file_digest
 import modules.highlighter as highlighter
 from modules.match_dom import match_clicked_dom
 import importlib
@@ -20,7 +20,7 @@ render_point_highlight = getattr(highlighter, 'render_point_highlight', None)
 if render_point_highlight is None:
     import base64
     
-    def render_point_highlight(image_path, x, y, radius=10):
+    def render_point_highlight(image_path, x, y, radius=10, key=None):
         """Render an image with a highlighted point (circle) at x, y coordinates."""
         if image_path is None or not os.path.exists(image_path):
             st.error("❌ 스크린샷 파일이 존재하지 않습니다.")
@@ -51,7 +51,7 @@ if render_point_highlight is None:
 st.title("📸 스크린샷 / 클릭 하이라이트 뷰어")
 
 json_file = "data/actions/metadata_182.json"
-actions = load_actions(json_file)
+actions = cached_actions(json_file, file_digest(json_file))
 
 idx = st.number_input("액션 선택 (index)", 0, len(actions)-1, 0)
 
@@ -137,7 +137,7 @@ if image_path:
             # 이미지 컨테이너
             with st.container():
                 # action 전체를 전달하여 metadata에서 정보 추출
-                render_highlight(action)
+                render_highlight(action, key=f"highlight_{idx}")
             
             # 정보를 컬럼으로 나누어 표시
             col1, col2 = st.columns([2, 1])
@@ -163,7 +163,7 @@ if image_path:
             
             # 이미지 컨테이너
             with st.container():
-                render_point_highlight(image_path, x, y)
+                render_point_highlight(image_path, x, y, key=f"point_{idx}")
             
             # 정보를 컬럼으로 나누어 표시
             col1, col2 = st.columns([2, 1])
@@ -16,8 +16,9 @@ import sys
 import os
 import json
 import argparse
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+import contextlib
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
 
 # 상위 디렉터리를 sys.path에 추가 (modules.loader 사용 위해)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -30,33 +31,24 @@ from skimage.metrics import structural_similarity as ssim
 
 # 프로젝트 내부 로더 (가정)
 from modules.loader import load_actions
+from modules import perf
+from modules.image_sizes import default_index as image_size_index
+from modules import segmentation
+from modules.dom_store import DOM_SNAPSHOT_KEY, DomStore, format_stats, intern_actions
+from modules.lazy_metadata import parse_metadata_lazy
+from modules import string_table
+from modules.string_table import StringTable, intern_fields
+from modules import dom_diff, dom_fingerprint
+from modules.dom_fingerprint import DomFingerprintIndex
+from modules.records import Action, ScreenCluster
 
 
 # =========================
 # 데이터 모델 정의
 # =========================
 
-@dataclass
-class Action:
-    """한 개의 test_execution_action 레코드를 표현하는 모델"""
-    action_id: int
-    execution_id: Optional[int]
-    sequence: Optional[int]
-    action_type: Optional[str]
-    screenshot_path: Optional[str]
-    coordinates: Optional[Dict[str, Any]] = None
-    http_url: Optional[str] = None
-    screen_name: Optional[str] = None
-    raw: Dict[str, Any] = field(default_factory=dict)
-
-
-@dataclass
-class ScreenCluster:
-    """한 화면(클러스터) 정보를 표현"""
-    cluster_id: int
-    representative_image: str
-    image_paths: List[str]
-    actions: List[Action]
+# Action / ScreenCluster는 modules.records의 __slots__ 레코드 (좌표는 Coordinates/Bounds 하위 구조)
+# 원본 액션 dict는 UIScreenshotAnalyzer(keep_raw=True)일 때만 Action.raw에 보관
 
 
 # =========================
@@ -68,7 +60,11 @@ def load_image(path: str, size: Tuple[int, int] = (384, 384)) -> Optional[Image.
     if not os.path.exists(path):
         return None
     try:
-        img = Image.open(path).convert("RGB")
+        with Image.open(path) as source:
+            # 원본 크기는 크기 색인에 기록 (렌더러가 다시 열지 않도록)
+            image_size_index().record(path, source.size)
+            img = source.convert("RGB")
+        perf.count(perf.IMAGE_DECODES)
         if size:
             img = img.resize(size)
         return img
@@ -92,6 +88,7 @@ def phash_distance(h1: Optional[imagehash.ImageHash],
     """pHash 간 거리 계산 (헤밍 거리)"""
     if h1 is None or h2 is None:
         return float("inf")
+    perf.count(perf.COMPARISONS)
     return h1 - h2
 
 
@@ -100,6 +97,7 @@ def calc_ssim(img1: Optional[Image.Image],
     """두 이미지 간 SSIM 계산 (0~1)"""
     if img1 is None or img2 is None:
         return 0.0
+    perf.count(perf.COMPARISONS)
     try:
         a1 = np.asarray(img1.convert("L"), dtype=np.float32)
         a2 = np.asarray(img2.convert("L"), dtype=np.float32)
@@ -112,7 +110,7 @@ def calc_ssim(img1: Optional[Image.Image],
 def safe_parse_metadata(metadata: Any) -> Dict[str, Any]:
     """
     metadata가 dict일 수도 있고 JSON string일 수도 있다고 가정하고,
-    dict로 안전하게 파싱.
+    dict로 안전하게 파싱. domSnapshot은 처음 접근할 때 디코딩된다 (읽기 전용 공유 dict).
     """
     if metadata is None:
         return {}
@@ -120,12 +118,42 @@ def safe_parse_metadata(metadata: Any) -> Dict[str, Any]:
         return metadata
     if isinstance(metadata, str):
         try:
-            return json.loads(metadata)
+            return parse_metadata_lazy(metadata)
         except json.JSONDecodeError:
             return {}
     return {}
 
 
+def cluster_to_dict(
+    sc: ScreenCluster,
+    hashes: Optional[Dict[str, imagehash.ImageHash]] = None,
+) -> Dict[str, Any]:
+    """
+    ScreenCluster -> JSON 직렬화 가능한 dict (다른 프로세스/도구용 결과 포맷)
+    hashes를 넘기면 이미지별 pHash(hex)도 포함 (소비 측에서 다시 해시 계산할 필요 없음)
+    """
+    click_actions = [a for a in sc.actions if a.coordinates]
+    urls = sorted({a.http_url for a in sc.actions if a.action_type == "request" and a.http_url})
+    return {
+        "cluster_id": sc.cluster_id,
+        "representative_image": sc.representative_image,
+        "image_paths": list(sc.image_paths),
+        "action_ids": [a.action_id for a in sc.actions],
+        "clicks": [
+            {
+                "action_id": a.action_id,
+                "sequence": a.sequence,
+                "coordinates": a.coordinates.to_dict(),
+            }
+            for a in click_actions
+        ],
+        "urls": urls,
+        "image_hashes": {
+            p: str(hashes[p]) for p in sc.image_paths if hashes and hashes.get(p) is not None
+        },
+    }
+
+
 # =========================
 # 메인 분석 클래스
 # =========================
@@ -143,59 +171,91 @@ class UIScreenshotAnalyzer:
         json_path: str,
         phash_threshold: int = 18,
         ssim_threshold: float = 0.95,
-        filter_no_clicks: bool = True
+        filter_no_clicks: bool = True,
+        segmentation: str = "greedy",
+        penalty: float = segmentation.DEFAULT_PENALTY,
+        use_dom_fingerprint: bool = True,
+        on_cluster: Optional[Callable[[ScreenCluster], None]] = None,
+        keep_raw: bool = False,
     ) -> None:
         self.json_path = json_path
         self.phash_threshold = phash_threshold
         self.ssim_threshold = ssim_threshold
         self.filter_no_clicks = filter_no_clicks
+        # 화면 경계 결정 방식: "greedy"(인접 비교 즉시 분할) / "pelt"(변화점 최적 분할)
+        self.segmentation = segmentation
+        self.penalty = penalty
+        # domSnapshot 골격 지문으로 이웃 화면을 먼저 판단 (모호하거나 DOM이 없을 때만 이미지 비교)
+        self.use_dom_fingerprint = use_dom_fingerprint
+        self.dom_index = DomFingerprintIndex()
+        self._dom_decisions: Optional[List[Optional[bool]]] = None
+        # DOM diff상 팝업(오버레이) 열림/닫힘뿐이라 같은 화면으로 본 인접 쌍 수
+        self.overlay_transitions = 0
+        # ScreenCluster가 확정될 때마다 호출 (CLI 스트리밍 출력용)
+        self.on_cluster = on_cluster
+        # Action.raw에 원본 dict 보관 여부 (원본 액션이 필요한 소비자용, 기본은 보관 안 함)
+        self.keep_raw = keep_raw
 
         self.actions: List[Action] = []
         self.image_paths: List[str] = []
         self.images: Dict[str, Image.Image] = {}
         self.hashes: Dict[str, imagehash.ImageHash] = {}
         self.clusters: List[ScreenCluster] = []
+        # 실행 단위 DOM 스냅샷 저장소 (액션은 dom_snapshot_id로 참조)
+        self.dom_store = DomStore()
+        # 실행 단위 공유 문자열 테이블 (class_name, tag_name 등 반복 필드)
+        self.string_table = StringTable()
+        # 단계별 실행 시간 (초)
+        self.timings: Dict[str, float] = {}
+
+    # ---------- 0. 전체 파이프라인 ----------
+
+    def run(self) -> List[ScreenCluster]:
+        """액션 로드 → 경로 수집 → 이미지/해시 → 플로우 생성 순서로 실행하며 단계별 시간 기록"""
+        stages = [
+            ("load_actions", self.load_actions),
+            ("collect_screenshot_paths", self.collect_screenshot_paths),
+            ("load_images_and_hashes", self.load_images_and_hashes),
+            ("build_screen_summary", self.build_screen_summary),
+        ]
+        self.timings = {}
+        total_start = time.perf_counter()
+        for name, stage in stages:
+            start = time.perf_counter()
+            stage()
+            self.timings[name] = time.perf_counter() - start
+        self.timings["total"] = time.perf_counter() - total_start
+        return self.clusters
 
     # ---------- 1. 액션 로드 ----------
 
     def load_actions(self) -> None:
         """JSON 파일에서 액션 로드 + Action 모델 리스트로 변환"""
         print(f"[1/6] 액션 로드 중... ({self.json_path})")
-        raw_actions = load_actions(self.json_path)
+        self.load_raw_actions(load_actions(self.json_path, string_table=self.string_table))
 
+    def load_raw_actions(self, raw_actions: List[Dict[str, Any]]) -> None:
+        """이미 로드된 raw 액션 dict 리스트를 Action 모델 리스트로 변환"""
         result: List[Action] = []
+        intern_fields(raw_actions, self.string_table)
+        raw_actions = intern_actions(raw_actions, self.dom_store)
         for raw in raw_actions:
-            metadata = safe_parse_metadata(raw.get("metadata"))
-
-            # 스크린샷 경로 (우선순위: screenshot_real_path > screenshot_path)
-            screenshot_path = (
-                raw.get("screenshot_real_path")
-                or raw.get("screenshot_path")
-                or metadata.get("screenshot_real_path")
-                or metadata.get("screenshot_path")
-            )
-
-            # 좌표
-            coordinates = raw.get("coordinates") or metadata.get("coordinates")
-
-            # URL (request 타입일 때 주로 의미 있음)
-            http_url = raw.get("http_url") or metadata.get("http_url")
-
-            action = Action(
-                action_id=raw.get("action_id"),
-                execution_id=raw.get("execution_id"),
-                sequence=raw.get("action_sequence"),
-                action_type=raw.get("action_type"),
-                screenshot_path=screenshot_path,
-                coordinates=coordinates,
-                http_url=http_url,
-                screen_name=raw.get("screen_name"),
-                raw=raw,
-            )
-            result.append(action)
+            result.append(Action.from_dict(raw, keep_raw=self.keep_raw))
 
         self.actions = result
         print(f"  ✅ 액션 {len(self.actions)}개 로드 완료")
+        if self.string_table.references:
+            print(f"  ✅ {string_table.format_stats(self.string_table.stats())}")
+        if self.dom_store.snapshots_added:
+            print(f"  ✅ {format_stats(self.dom_store.stats())}")
+
+    def dom_snapshot(self, action: Action) -> Optional[Dict[str, Any]]:
+        """액션의 DOM 스냅샷 (저장소 공유 객체, 읽기 전용)"""
+        if action.dom_snapshot_id is not None:
+            return self.dom_store.get(action.dom_snapshot_id)
+        if action.raw is not None:
+            return safe_parse_metadata(action.raw.get("metadata")).get(DOM_SNAPSHOT_KEY)
+        return None
 
     # ---------- 2. 스크린샷 경로 수집 ----------
 
@@ -223,13 +283,22 @@ class UIScreenshotAnalyzer:
     # ---------- 3. 이미지 로드 + pHash 계산 ----------
 
     def load_images_and_hashes(self) -> None:
-        """이미지 로드 및 pHash 계산"""
+        """이미지 로드 및 pHash 계산 (DOM 지문으로 판단이 끝난 이웃 쌍의 이미지는 생략)"""
         print("[3/6] 이미지 로드 및 pHash 계산 중...")
         images: Dict[str, Image.Image] = {}
         hashes: Dict[str, imagehash.ImageHash] = {}
 
-        total = len(self.image_paths)
-        for idx, path in enumerate(self.image_paths, 1):
+        paths = self.image_paths
+        needed = self._paths_needing_images()
+        if needed is not None:
+            paths = [p for p in self.image_paths if p in needed]
+            skipped = len(self.image_paths) - len(paths)
+            self.dom_index.record_avoided(0, skipped)
+            if skipped:
+                print(f"  - DOM 지문으로 이미지 {skipped}개 로드 생략")
+
+        total = len(paths)
+        for idx, path in enumerate(paths, 1):
             img = load_image(path)
             if img is None:
                 continue
@@ -244,6 +313,67 @@ class UIScreenshotAnalyzer:
         self.hashes = hashes
         print(f"  ✅ 이미지 로드: {len(self.images)}개, pHash 계산 완료")
 
+    # ---------- DOM 지문 사전 판별 ----------
+
+    def _sorted_screenshot_actions(self) -> List[Action]:
+        """스크린샷이 있는 액션을 sequence 순서대로 정렬 (순서 보존 필수)"""
+        return sorted(
+            [a for a in self.actions if a.screenshot_path and os.path.exists(a.screenshot_path)],
+            key=lambda a: (
+                a.sequence if a.sequence is not None else float('inf'),
+                a.action_id if a.action_id is not None else float('inf')
+            )
+        )
+
+    def _dom_signature(self, action: Action) -> Optional[dom_fingerprint.DomSignature]:
+        snapshot = self.dom_snapshot(action)
+        if snapshot is None:
+            return None
+        return self.dom_index.signature_for(snapshot, key=action.dom_snapshot_id)
+
+    def _neighbour_dom_decisions(self, sorted_actions: List[Action]) -> List[Optional[bool]]:
+        """
+        인접 액션 쌍별 DOM 판단 (True=같은 화면, False=다른 화면, None=이미지로 판단)
+        같은 스크린샷 경로인 쌍은 원래도 비교하지 않으므로 None
+        """
+        if self._dom_decisions is not None and len(self._dom_decisions) == max(0, len(sorted_actions) - 1):
+            return self._dom_decisions
+
+        decisions: List[Optional[bool]] = []
+        self.overlay_transitions = 0
+        for prev_action, curr_action in zip(sorted_actions, sorted_actions[1:]):
+            if (not self.use_dom_fingerprint
+                    or self.segmentation != "greedy"
+                    or prev_action.screenshot_path == curr_action.screenshot_path):
+                decisions.append(None)
+                continue
+            # 구조 diff상 팝업이 열리거나 닫힌 것뿐이면 같은 화면 (골격 지문보다 우선)
+            prev_snapshot = self.dom_snapshot(prev_action)
+            curr_snapshot = self.dom_snapshot(curr_action)
+            if prev_snapshot is not None and curr_snapshot is not None:
+                if dom_diff.diff(prev_snapshot, curr_snapshot).overlay_only:
+                    self.overlay_transitions += 1
+                    decisions.append(True)
+                    continue
+            decisions.append(self.dom_index.decide(
+                self._dom_signature(prev_action), self._dom_signature(curr_action)
+            ))
+        self._dom_decisions = decisions
+        return decisions
+
+    def _paths_needing_images(self) -> Optional[set]:
+        """이미지 비교가 필요한 경로 집합 (DOM 지문을 쓰지 않으면 None = 전부)"""
+        if not self.use_dom_fingerprint or self.segmentation != "greedy":
+            return None
+        sorted_actions = self._sorted_screenshot_actions()
+        decisions = self._neighbour_dom_decisions(sorted_actions)
+        needed = set()
+        for (prev_action, curr_action), decision in zip(zip(sorted_actions, sorted_actions[1:]), decisions):
+            if decision is None and prev_action.screenshot_path != curr_action.screenshot_path:
+                needed.add(prev_action.screenshot_path)
+                needed.add(curr_action.screenshot_path)
+        return needed
+
     # ---------- 4. 이미지 클러스터링 ----------
 
     def cluster_images(self) -> None:
@@ -313,13 +443,7 @@ class UIScreenshotAnalyzer:
         print("[5/6] 순서 기반 플로우 생성 및 화면 전환 감지 중...")
 
         # 1) 액션을 sequence 순서대로 정렬 (순서 보존 필수)
-        sorted_actions = sorted(
-            [a for a in self.actions if a.screenshot_path and os.path.exists(a.screenshot_path)],
-            key=lambda a: (
-                a.sequence if a.sequence is not None else float('inf'),
-                a.action_id if a.action_id is not None else float('inf')
-            )
-        )
+        sorted_actions = self._sorted_screenshot_actions()
 
         if not sorted_actions:
             self.clusters = []
@@ -327,7 +451,55 @@ class UIScreenshotAnalyzer:
             return
 
         # 2) 순서대로 플로우 생성하면서 화면 전환 감지
-        flows: List[List[Action]] = []
+        #    플로우가 끝나는 즉시 ScreenCluster로 확정 (on_cluster 스트리밍)
+        clusters: List[ScreenCluster] = []
+        flow_count = 0
+        removed_count = 0
+
+        def finalize_flow(flow_actions: List[Action]) -> None:
+            nonlocal flow_count, removed_count
+            idx = flow_count
+            flow_count += 1
+            if not flow_actions:
+                return
+
+            # 플로우 내의 고유한 이미지 경로 수집
+            flow_image_paths: List[str] = []
+            seen_paths: set[str] = set()
+            for action in flow_actions:
+                if action.screenshot_path and action.screenshot_path not in seen_paths:
+                    flow_image_paths.append(action.screenshot_path)
+                    seen_paths.add(action.screenshot_path)
+
+            if not flow_image_paths:
+                return
+
+            # 클릭이 없는 클러스터 필터링 (옵션)
+            if self.filter_no_clicks and not any(a.coordinates for a in flow_actions):
+                removed_count += 1
+                return
+
+            # 대표 이미지 = 마지막 화면 (마지막 액션의 스크린샷)
+            sc = ScreenCluster(
+                cluster_id=idx,
+                representative_image=flow_actions[-1].screenshot_path,
+                image_paths=flow_image_paths,
+                actions=flow_actions,  # 이미 순서대로 정렬되어 있음
+            )
+            clusters.append(sc)
+            if self.on_cluster:
+                self.on_cluster(sc)
+
+        if self.segmentation == "pelt":
+            for flow_actions in self._pelt_flows(sorted_actions):
+                finalize_flow(flow_actions)
+            if removed_count > 0:
+                print(f"  ⚠️ 클릭이 없는 플로우 {removed_count}개 제외됨")
+            self.clusters = clusters
+            print(f"  ✅ PELT(penalty={self.penalty}) {flow_count}개 플로우 생성, {len(self.clusters)}개 ScreenCluster 생성 완료")
+            return
+
+        dom_decisions = self._neighbour_dom_decisions(sorted_actions)
         current_flow: List[Action] = [sorted_actions[0]]
 
         for i in range(1, len(sorted_actions)):
@@ -342,7 +514,11 @@ class UIScreenshotAnalyzer:
 
             if prev_path and curr_path and prev_path != curr_path:
                 # 이미지가 다르면 화면 전환 가능성 체크
-                if prev_path in self.images and curr_path in self.images:
+                if dom_decisions[i - 1] is not None:
+                    # DOM 골격 지문으로 판단 완료 (pHash/SSIM 비교 생략)
+                    is_screen_change = not dom_decisions[i - 1]
+                    self.dom_index.record_avoided(2)
+                elif prev_path in self.images and curr_path in self.images:
                     prev_img = self.images[prev_path]
                     curr_img = self.images[curr_path]
                     prev_hash = self.hashes.get(prev_path)
@@ -361,60 +537,38 @@ class UIScreenshotAnalyzer:
 
             if is_screen_change:
                 # 화면 전환 감지 → 현재 플로우 종료, 새 플로우 시작
-                flows.append(current_flow)
+                finalize_flow(current_flow)
                 current_flow = [curr_action]
             else:
                 # 같은 화면 → 현재 플로우에 추가
                 current_flow.append(curr_action)
 
-        # 마지막 플로우 추가
+        # 마지막 플로우 확정
         if current_flow:
-            flows.append(current_flow)
+            finalize_flow(current_flow)
 
-        # 3) 각 플로우를 ScreenCluster로 변환 (대표 이미지 = 마지막 화면)
-        clusters: List[ScreenCluster] = []
-        for idx, flow_actions in enumerate(flows):
-            if not flow_actions:
-                continue
-
-            # 플로우 내의 고유한 이미지 경로 수집
-            flow_image_paths: List[str] = []
-            seen_paths: set[str] = set()
-            for action in flow_actions:
-                if action.screenshot_path and action.screenshot_path not in seen_paths:
-                    flow_image_paths.append(action.screenshot_path)
-                    seen_paths.add(action.screenshot_path)
-
-            if not flow_image_paths:
-                continue
+        if removed_count > 0:
+            print(f"  ⚠️ 클릭이 없는 플로우 {removed_count}개 제외됨")
+        if self.use_dom_fingerprint and any(d is not None for d in dom_decisions):
+            print(f"  - {dom_fingerprint.format_stats(self.dom_index.stats())}")
+        if self.overlay_transitions:
+            print(f"  - DOM diff: 팝업 열림/닫힘 {self.overlay_transitions}곳을 같은 화면으로 처리")
 
-            # 대표 이미지 = 마지막 화면 (마지막 액션의 스크린샷)
-            representative_image = flow_actions[-1].screenshot_path
+        self.clusters = clusters
+        print(f"  ✅ {flow_count}개 플로우 생성, {len(self.clusters)}개 ScreenCluster 생성 완료")
 
-            sc = ScreenCluster(
-                cluster_id=idx,
-                representative_image=representative_image,
-                image_paths=flow_image_paths,
-                actions=flow_actions,  # 이미 순서대로 정렬되어 있음
-            )
-            clusters.append(sc)
+    def _pelt_flows(self, sorted_actions: List[Action]) -> List[List[Action]]:
+        """프레임별 pHash 비트 특징에 PELT를 적용해 플로우 경계 결정 (추가 이미지 비교 없음)"""
+        frame_hashes = [self.hashes.get(a.screenshot_path) for a in sorted_actions]
+        segments = segmentation.segment_hashes(frame_hashes, self.penalty)
 
-        # 클릭이 없는 클러스터 필터링 (옵션)
-        if self.filter_no_clicks:
-            filtered_clusters = []
-            removed_count = 0
-            for sc in clusters:
-                click_actions = [a for a in sc.actions if a.coordinates]
-                if click_actions:
-                    filtered_clusters.append(sc)
-                else:
-                    removed_count += 1
-            clusters = filtered_clusters
-            if removed_count > 0:
-                print(f"  ⚠️ 클릭이 없는 플로우 {removed_count}개 제외됨")
+        loaded = [h for h in frame_hashes if h is not None]
+        if len(loaded) == len(frame_hashes):
+            signal = segmentation.neighbour_distances(segmentation.hash_bits(loaded))
+            jumps = int(np.count_nonzero(signal > self.phash_threshold))
+            print(f"  - 인접 pHash 거리 > {self.phash_threshold}: {jumps}곳, PELT 경계: {len(segments) - 1}곳")
 
-        self.clusters = clusters
-        print(f"  ✅ {len(flows)}개 플로우 생성, {len(self.clusters)}개 ScreenCluster 생성 완료")
+        return [sorted_actions[start:end] for start, end in segments]
 
     # ---------- 6. 결과 출력 ----------
 
@@ -445,7 +599,7 @@ class UIScreenshotAnalyzer:
             for a in click_actions:
                 print(
                     f"      - action_id={a.action_id}, seq={a.sequence}, "
-                    f"coords={a.coordinates}"
+                    f"coords={a.coordinates.to_dict()}"
                 )
 
             # API URL 출력
@@ -475,8 +629,95 @@ class UIScreenshotAnalyzer:
             print(f"  ▸ 평균 이미지/클러스터: {total_images / len(self.clusters):.2f}개")
             print(f"  ▸ 최소 클러스터 크기: {min(cluster_sizes)}개")
             print(f"  ▸ 최대 클러스터 크기: {max(cluster_sizes)}개")
+        for stage, seconds in self.timings.items():
+            print(f"  ▸ 실행 시간 [{stage}]: {seconds:.3f}s")
         print("=" * 100)
 
+    def params(self) -> Dict[str, Any]:
+        """분석 파라미터 (to_dict / ClusterWriter 헤더 공용)"""
+        return {
+            "phash_threshold": self.phash_threshold,
+            "ssim_threshold": self.ssim_threshold,
+            "filter_no_clicks": self.filter_no_clicks,
+            "segmentation": self.segmentation,
+            "penalty": self.penalty,
+            "use_dom_fingerprint": self.use_dom_fingerprint,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """분석 결과 전체를 JSON 직렬화 가능한 dict로 반환"""
+        return {
+            "json_path": self.json_path,
+            "params": self.params(),
+            "clusters": [cluster_to_dict(sc, self.hashes) for sc in self.clusters],
+            "stats": self.stats(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """통계 정보 + 단계별 실행 시간 + 성능 카운터"""
+        return {
+            "actions": len(self.actions),
+            "images": len(self.images),
+            "clusters": len(self.clusters),
+            "timings": dict(self.timings),
+            "counters": perf.snapshot(),
+            "dom_store": self.dom_store.stats(),
+            "string_table": self.string_table.stats(),
+            "dom_fingerprint": self.dom_index.stats(),
+            "dom_diff": {"overlay_transitions": self.overlay_transitions},
+        }
+
+
+# =========================
+# 기계 판독용 출력 (json / ndjson)
+# =========================
+
+class ClusterWriter:
+    """
+    ScreenCluster를 확정되는 즉시 스트림에 기록
+    - ndjson: 한 줄에 하나씩 {"type": "cluster", ...}, 마지막 줄 {"type": "stats", ...}
+    - json:   {"json_path": ..., "params": ..., "clusters": [...], "stats": {...}} 한 문서를 점진적으로 기록
+    - 분석 중 예외가 나도 end(error)로 닫아서 항상 올바른 JSON (stats에 "error" 추가)
+    """
+
+    def __init__(self, analyzer: UIScreenshotAnalyzer, stream: TextIO, fmt: str = "ndjson") -> None:
+        self.analyzer = analyzer
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+
+    def _dump(self, data: Any) -> str:
+        return json.dumps(data, ensure_ascii=False)
+
+    def begin(self) -> None:
+        if self.fmt == "json":
+            header = {"json_path": self.analyzer.json_path, "params": self.analyzer.params()}
+            # 마지막 "}"를 떼고 clusters 배열을 이어서 기록
+            self.stream.write(self._dump(header)[:-1] + ', "clusters": [')
+            self.stream.flush()
+
+    def write_cluster(self, sc: ScreenCluster) -> None:
+        data = cluster_to_dict(sc, self.analyzer.hashes)
+        if self.fmt == "json":
+            self.stream.write(("," if self.count else "") + "\n  " + self._dump(data))
+        else:
+            self.stream.write(self._dump({"type": "cluster", **data}) + "\n")
+        self.count += 1
+        self.stream.flush()
+
+    def end(self, error: Optional[str] = None) -> None:
+        try:
+            stats = self.analyzer.stats()
+        except Exception as e:
+            stats = {"stats_error": f"{type(e).__name__}: {e}"}
+        if error is not None:
+            stats["error"] = error
+        if self.fmt == "json":
+            self.stream.write('\n], "stats": ' + self._dump(stats) + "}\n")
+        else:
+            self.stream.write(self._dump({"type": "stats", **stats}) + "\n")
+        self.stream.flush()
+
 
 # =========================
 # main
@@ -508,22 +749,86 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="클릭이 없는 클러스터도 포함 (기본: 클릭 없는 클러스터 제외)",
     )
+    parser.add_argument(
+        "--segmentation",
+        choices=["greedy", "pelt"],
+        default="greedy",
+        help="화면 경계 결정 방식 (greedy=인접 비교 즉시 분할, pelt=변화점 최적 분할, 기본=greedy)",
+    )
+    parser.add_argument(
+        "--penalty",
+        type=float,
+        default=segmentation.DEFAULT_PENALTY,
+        help=f"PELT 경계당 페널티 (클수록 경계 감소, 기본={segmentation.DEFAULT_PENALTY})",
+    )
+    parser.add_argument(
+        "--no-dom-fingerprint",
+        action="store_true",
+        help="DOM 골격 지문 사전 판별 끄기 (항상 이미지로 비교)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "ndjson"],
+        default="text",
+        help="출력 형식 (json/ndjson은 클러스터를 확정 즉시 출력, 진행 로그는 stderr, 기본=text)",
+    )
+    parser.add_argument(
+        "--output",
+        help="json/ndjson 결과 파일 경로 (기본: stdout)",
+    )
     return parser.parse_args()
 
 
+def run_machine_output(args: argparse.Namespace) -> None:
+    """json/ndjson 출력: 결과만 stdout(또는 --output)에, 엔진 진행 로그는 stderr로"""
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        analyzer = UIScreenshotAnalyzer(
+            json_path=args.json,
+            phash_threshold=args.phash_threshold,
+            ssim_threshold=args.ssim_threshold,
+            filter_no_clicks=not args.no_filter_clicks,
+            segmentation=args.segmentation,
+            penalty=args.penalty,
+            use_dom_fingerprint=not args.no_dom_fingerprint,
+        )
+        writer = ClusterWriter(analyzer, stream, fmt=args.format)
+        analyzer.on_cluster = writer.write_cluster
+
+        writer.begin()
+        error = None
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                analyzer.run()
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # 실패해도 clusters 배열과 문서를 닫음 (error는 stats 꼬리에 기록)
+            writer.end(error)
+    finally:
+        if args.output:
+            stream.close()
+
+
 def main() -> None:
     args = parse_args()
 
     if not os.path.exists(args.json):
-        print(f"❌ 오류: JSON 파일을 찾을 수 없습니다: {args.json}")
+        print(f"❌ 오류: JSON 파일을 찾을 수 없습니다: {args.json}", file=sys.stderr)
         sys.exit(1)
 
+    if args.format != "text":
+        run_machine_output(args)
+        return
+
     print("=" * 100)
     print("🧪 메뉴얼 에이전트 - 스크린샷 기반 화면 그룹핑 & 좌표/API 로직 검증 (test2)")
     print("=" * 100)
     print(f"  ▸ JSON 파일: {args.json}")
     print(f"  ▸ pHash 임계값: {args.phash_threshold}")
     print(f"  ▸ SSIM 임계값: {args.ssim_threshold}")
+    print(f"  ▸ 화면 경계 결정: {args.segmentation}" + (f" (penalty={args.penalty})" if args.segmentation == "pelt" else ""))
     print("=" * 100)
 
     analyzer = UIScreenshotAnalyzer(
@@ -531,13 +836,14 @@ def main() -> None:
         phash_threshold=args.phash_threshold,
         ssim_threshold=args.ssim_threshold,
         filter_no_clicks=not args.no_filter_clicks,
+        segmentation=args.segmentation,
+        penalty=args.penalty,
+        use_dom_fingerprint=not args.no_dom_fingerprint,
     )
 
-    analyzer.load_actions()
-    analyzer.collect_screenshot_paths()
-    analyzer.load_images_and_hashes()  # 이미지와 해시 로드 (화면 전환 감지에 필요)
-    # cluster_images()는 더 이상 사용하지 않음 (순서 기반 플로우 생성으로 변경)
-    analyzer.build_screen_summary()  # 순서 기반 플로우 생성 및 화면 전환 감지
+    # 액션 로드 → 이미지/해시 로드 → 순서 기반 플로우 생성 및 화면 전환 감지
+    # (cluster_images()는 더 이상 사용하지 않음)
+    analyzer.run()
     analyzer.print_summary()
 
     print("\n✅ test2 로직 검증 완료!")
@@ -9,12 +9,9 @@ test2_visualizer.py - test2.py 분석 결과를 Streamlit으로 시각화
 """
 
 import streamlit as st
-import streamlit.components.v1 as components
 import sys
 import os
-import json
 import importlib
-import base64
 from typing import Any, Dict, List, Optional, Tuple
 from PIL import Image
 import imagehash
@@ -70,8 +67,13 @@ if not hasattr(st.session_state, 'test2_visualizer_css_injected'):
 # 상위 디렉터리를 sys.path에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modules.loader import load_actions
-from modules.match_dom import match_clicked_dom
+from modules.page_cache import cached_actions, file_digest, ingest_image_sizes, render_cache_controls, screenshots_digest
+from modules.image_sizes import image_size
+from modules.match_dom import click_point, match_clicked_dom_batch
+from modules.previews import default_cache
+from modules.compositor import RED_STYLE, highlights_from_coordinates
+from modules.tile_viewer import render_tiled
+from modules.overlay import ratio_point, render_overlay
 
 # test2 모듈을 동적으로 import하고 reload (Streamlit 캐시 문제 해결)
 import pages.test2 as test2_module
@@ -81,13 +83,40 @@ from pages.test2 import (
     UIScreenshotAnalyzer,
     Action,
     ScreenCluster,
-    safe_parse_metadata,
     load_image,
     compute_phash,
     phash_distance,
     calc_ssim,
 )
 
+
+def match_cluster_clicks(
+    analyzer: UIScreenshotAnalyzer,
+    click_actions: List[Action],
+) -> List[Tuple[bool, Optional[Dict[str, Any]]]]:
+    """
+    클러스터의 모든 클릭을 DOM 스냅샷별로 묶어 한 번에 매칭
+    (같은 내용의 스냅샷은 DomStore에서 같은 객체이므로 한 묶음이 됨)
+    반환: 클릭 순서대로 (DOM 매칭 시도 여부, 매칭 결과 또는 None)
+    """
+    results: List[Tuple[bool, Optional[Dict[str, Any]]]] = [(False, None)] * len(click_actions)
+    groups: Dict[int, Tuple[Dict[str, Any], List[int], List[Tuple[Any, Any]]]] = {}
+
+    for i, action in enumerate(click_actions):
+        dom_snapshot = analyzer.dom_snapshot(action)
+        x, y = action.coordinates.point() if action.coordinates else (None, None)
+        if not dom_snapshot or x is None or y is None:
+            continue
+        _, indices, points = groups.setdefault(id(dom_snapshot), (dom_snapshot, [], []))
+        indices.append(i)
+        points.append((x, y))
+
+    for dom_snapshot, indices, points in groups.values():
+        for i, matched in zip(indices, match_clicked_dom_batch(dom_snapshot, points)):
+            results[i] = (True, matched)
+    return results
+
+
 st.set_page_config(
     page_title="화면 그룹핑 & DOM 매칭 분석",
     page_icon="🖼️",
@@ -158,6 +187,43 @@ with st.sidebar:
         st.session_state.ssim_threshold = ssim_threshold
         st.session_state.filter_no_clicks = filter_no_clicks
 
+render_cache_controls()
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def cached_analysis(json_path, json_digest, shots_digest, phash_threshold, ssim_threshold, filter_no_clicks, _on_step=None):
+    """
+    UIScreenshotAnalyzer 실행 결과 (이미지 로드 / pHash / 클러스터링)
+    - 키: JSON 경로와 내용 해시, 스크린샷 파일 해시, 클러스터링 파라미터
+    - _on_step(step, message): 진행 표시 (캐시 적중이면 호출되지 않음)
+    """
+    on_step = _on_step or (lambda step, message: None)
+    analyzer = UIScreenshotAnalyzer(
+        json_path=json_path,
+        phash_threshold=phash_threshold,
+        ssim_threshold=ssim_threshold,
+        filter_no_clicks=filter_no_clicks,
+    )
+    
+    on_step(1, "액션 로드 중...")
+    analyzer.load_actions()
+    
+    on_step(2, "스크린샷 경로 수집 중...")
+    analyzer.collect_screenshot_paths()
+    
+    on_step(3, "이미지 로드 및 pHash 계산 중...")
+    analyzer.load_images_and_hashes()
+    
+    on_step(4, "이미지 클러스터링 중...")
+    analyzer.cluster_images()
+    
+    on_step(5, "화면별 요약 정보 생성 중...")
+    analyzer.build_screen_summary()
+    
+    on_step(6, "완료!")
+    return analyzer
+
+
 # 분석 실행
 if st.session_state.get("analyze_clicked", False):
     json_path = st.session_state.get("json_path", json_path)
@@ -169,41 +235,21 @@ if st.session_state.get("analyze_clicked", False):
         st.error(f"❌ JSON 파일을 찾을 수 없습니다: {json_path}")
         st.stop()
     
-    # 진행 상황 표시
+    # 진행 상황 표시 (캐시 적중이면 분석 단계를 건너뜀)
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    # 분석기 초기화 및 실행
+    def update_step(step, message):
+        status_text.text(f"[{step}/6] {message}")
+        progress_bar.progress(step / 6)
+    
+    # 분석기 초기화 및 실행 (JSON 내용 / 스크린샷 파일 / 파라미터가 같으면 이전 결과 재사용)
+    json_digest = file_digest(json_path)
+    raw_actions = cached_actions(json_path, json_digest)
+    shots_digest = screenshots_digest(raw_actions)
+    ingest_image_sizes(shots_digest, raw_actions)
     with st.spinner("분석 중..."):
-        analyzer = UIScreenshotAnalyzer(
-            json_path=json_path,
-            phash_threshold=phash_threshold,
-            ssim_threshold=ssim_threshold,
-            filter_no_clicks=filter_no_clicks,
-        )
-        
-        status_text.text("[1/6] 액션 로드 중...")
-        progress_bar.progress(1/6)
-        analyzer.load_actions()
-        
-        status_text.text("[2/6] 스크린샷 경로 수집 중...")
-        progress_bar.progress(2/6)
-        analyzer.collect_screenshot_paths()
-        
-        status_text.text("[3/6] 이미지 로드 및 pHash 계산 중...")
-        progress_bar.progress(3/6)
-        analyzer.load_images_and_hashes()
-        
-        status_text.text("[4/6] 이미지 클러스터링 중...")
-        progress_bar.progress(4/6)
-        analyzer.cluster_images()
-        
-        status_text.text("[5/6] 화면별 요약 정보 생성 중...")
-        progress_bar.progress(5/6)
-        analyzer.build_screen_summary()
-        
-        status_text.text("[6/6] 완료!")
-        progress_bar.progress(1.0)
+        analyzer = cached_analysis(json_path, json_digest, shots_digest, phash_threshold, ssim_threshold, filter_no_clicks, update_step)
     
     # 결과를 세션 상태에 저장
     st.session_state.analyzer = analyzer
@@ -215,6 +261,12 @@ if st.session_state.get("analyze_clicked", False):
 # 결과 표시
 if st.session_state.get("analysis_complete", False):
     analyzer = st.session_state.analyzer
+
+    # 대표 이미지 축소본 미리 생성 (백그라운드)
+    default_cache().prefetch(sc.representative_image for sc in analyzer.clusters)
+    # 지난 렌더 이후 실패한 축소본 생성 (해당 이미지는 원본으로 표시됨)
+    for message in default_cache().take_errors():
+        st.warning(f"⚠️ {message}")
     
     # 전체 통계
     total_images = sum(len(sc.image_paths) for sc in analyzer.clusters)
@@ -269,311 +321,70 @@ if st.session_state.get("analysis_complete", False):
             for action in all_click_actions:
                 if not action.coordinates:
                     continue
-                coords = action.coordinates or {}
-                bounds = coords.get("elementBounds")
-                x = coords.get("pageX") or coords.get("clientX") or coords.get("x")
-                y = coords.get("pageY") or coords.get("clientY") or coords.get("y")
+                coords = action.coordinates
+                bounds = coords.element_bounds
+                x, y = coords.point()
                 
                 if bounds or (x is not None and y is not None):
                     valid_actions.append(action)
             
             if len(valid_actions) > 0:
-                # 이미지 크기 읽기
+                # 이미지 크기 (크기 색인)
                 try:
-                    with Image.open(cluster.representative_image) as pil_img:
-                        image_width = pil_img.width
-                        image_height = pil_img.height
+                    image_width, image_height = image_size(cluster.representative_image)
                 except Exception as e:
                     st.error(f"❌ 이미지 읽기 오류: {e}")
                     image_width = 1920
                     image_height = 1080
                 
                 # 첫 액션에서 viewport 크기 획득
-                first_coords = valid_actions[0].coordinates or {}
-                vp_w = int(first_coords.get("viewportWidth", image_width))
-                vp_h = int(first_coords.get("viewportHeight", image_height))
-                
-                # 이미지 base64 변환
-                with open(cluster.representative_image, "rb") as f:
-                    img_bytes = f.read()
-                    img_b64 = base64.b64encode(img_bytes).decode()
+                first_coords = valid_actions[0].coordinates
+                vp_w = int(first_coords.viewport_width if first_coords.viewport_width is not None else image_width)
+                vp_h = int(first_coords.viewport_height if first_coords.viewport_height is not None else image_height)
                 
-                # 고유 ID 생성
-                wrapper_id = f"wrapper-{abs(hash(cluster.representative_image))}-{cluster.cluster_id}"
-                img_id = f"img-{abs(hash(cluster.representative_image))}-{cluster.cluster_id}"
+                # 기본은 표시 크기 축소본, 원본 해상도는 선택 시 딥줌 뷰어로
+                zoom = st.checkbox("🔍 원본 해상도 (딥줌)", key=f"zoom_{cluster.cluster_id}")
                 
-                # 하이라이트 데이터 수집 (screen_grouping.py 방식)
-                bounds_data = []
-                for idx, action in enumerate(valid_actions):
-                    coords = action.coordinates or {}
-                    bounds = coords.get("elementBounds", {})
+                # 하이라이트 박스 수집 (이미지 대비 비율, 번호 라벨은 박스 순서대로)
+                boxes = []
+                for action in valid_actions:
+                    coords = action.coordinates
+                    bounds = coords.element_bounds
                     
-                    # elementBounds 우선 사용 (ratio 기반)
+                    # elementBounds 우선 사용 (ratio가 있을 때만)
                     if bounds:
-                        top_ratio = bounds.get("topRatio")
-                        left_ratio = bounds.get("leftRatio")
-                        width_ratio = bounds.get("widthRatio")
-                        height_ratio = bounds.get("heightRatio")
-                        
-                        if all(r is not None for r in [top_ratio, left_ratio, width_ratio, height_ratio]):
-                            bounds_data.append({
-                                'idx': idx + 1,
-                                'type': 'bounds',
-                                'topRatio': top_ratio,
-                                'leftRatio': left_ratio,
-                                'widthRatio': width_ratio,
-                                'heightRatio': height_ratio
-                            })
+                        if bounds.has_ratios:
+                            boxes.append((bounds.left_ratio, bounds.top_ratio, bounds.width_ratio, bounds.height_ratio))
                     else:
-                        # x, y 좌표 사용
-                        x = coords.get("x") or coords.get("pageX") or coords.get("clientX")
-                        y = coords.get("y") or coords.get("pageY") or coords.get("clientY")
-                        
-                        if x is not None and y is not None:
-                            bounds_data.append({
-                                'idx': idx + 1,
-                                'type': 'point',
-                                'top': y - 10,
-                                'left': x - 10,
-                                'width': 20,
-                                'height': 20,
-                                'x': x,
-                                'y': y
-                            })
+                        # x, y 좌표 사용 (20px 원)
+                        x = coords.x or coords.page_x or coords.client_x
+                        y = coords.y or coords.page_y or coords.client_y
+                        point = ratio_point(x, y, (vp_w, vp_h))
+                        if point is not None:
+                            boxes.append(point)
                 
-                # overlay HTML 구성
-                overlay_html = ""
-                for data in bounds_data:
-                    box_id = f"box-{wrapper_id}-{data['idx']}"
-                    label_id = f"label-{wrapper_id}-{data['idx']}"
-                    
-                    # 초기값 계산
-                    if data.get('type') == 'point':
-                        scale_x_init = image_width / vp_w if vp_w > 0 else 1.0
-                        scale_y_init = image_height / vp_h if vp_h > 0 else 1.0
-                        center_x = data.get('x', 0) * scale_x_init
-                        center_y = data.get('y', 0) * scale_y_init
-                        box_size = 30
-                        init_left = center_x - box_size / 2
-                        init_top = center_y - box_size / 2
-                        init_width = box_size
-                        init_height = box_size
-                    else:
-                        top_ratio = data.get('topRatio', 0)
-                        left_ratio = data.get('leftRatio', 0)
-                        width_ratio = data.get('widthRatio', 0)
-                        height_ratio = data.get('heightRatio', 0)
-                        
-                        init_top = top_ratio * image_height
-                        init_left = left_ratio * image_width
-                        init_width = width_ratio * image_width
-                        init_height = height_ratio * image_height
-                    
-                    overlay_html += f'<div id="{box_id}" class="highlight-box" style="position:absolute!important;top:{init_top}px!important;left:{init_left}px!important;width:{init_width}px!important;height:{init_height}px!important;border:4px solid red!important;background-color:rgba(255,0,0,0.5)!important;box-sizing:border-box!important;pointer-events:none!important;z-index:10!important;display:block!important;"></div>'
-                    label_top_init = max(0, init_top - 15)
-                    label_left_init = max(0, init_left - 15)
-                    overlay_html += f'<div id="{label_id}" class="highlight-label" style="position:absolute!important;top:{label_top_init}px!important;left:{label_left_init}px!important;background:white!important;color:red!important;border:1px solid red!important;width:12px!important;height:12px!important;border-radius:50%!important;line-height:12px!important;text-align:center!important;font-weight:bold!important;font-size:7px!important;z-index:20!important;display:block!important;">{data["idx"]}</div>'
-                
-                # JavaScript로 스케일링 (screen_grouping.py 방식)
-                bounds_json = json.dumps(bounds_data)
-                js_code = f"""
-                <script>
-                (function() {{
-                    const wrapperId = '{wrapper_id}';
-                    const wrapper = document.getElementById(wrapperId);
-                    const imgId = '{img_id}';
-                    const img = document.getElementById(imgId);
-                    
-                    if (!wrapper || !img) {{
-                        console.error('요소를 찾을 수 없습니다:', {{wrapperId, imgId}});
-                        return;
-                    }}
-                    
-                    const viewportWidth = {vp_w};
-                    const viewportHeight = {vp_h};
-                    const boundsData = {bounds_json};
-                    
-                    function adjustHighlights() {{
-                        if (!img.complete || img.naturalWidth === 0 || img.naturalHeight === 0) {{
-                            setTimeout(adjustHighlights, 500);
-                            return;
-                        }}
-                        
-                        let imgDisplayWidth = img.offsetWidth || img.clientWidth;
-                        let imgDisplayHeight = img.offsetHeight || img.clientHeight;
-                        
-                        if (imgDisplayWidth === 0 || imgDisplayHeight === 0) {{
-                            const rect = img.getBoundingClientRect();
-                            imgDisplayWidth = rect.width;
-                            imgDisplayHeight = rect.height;
-                        }}
-                        
-                        if (imgDisplayWidth === 0 || imgDisplayHeight === 0) {{
-                            imgDisplayWidth = img.naturalWidth;
-                            imgDisplayHeight = img.naturalHeight;
-                        }}
-                        
-                        const scaleX = imgDisplayWidth / viewportWidth;
-                        const scaleY = imgDisplayHeight / viewportHeight;
-                        
-                        boundsData.forEach(function(data) {{
-                            const boxId = 'box-' + wrapperId + '-' + data.idx;
-                            const labelId = 'label-' + wrapperId + '-' + data.idx;
-                            
-                            const box = document.getElementById(boxId);
-                            const label = document.getElementById(labelId);
-                            
-                            if (!box || !label) return;
-                            
-                            let drawTop, drawLeft, drawWidth, drawHeight;
-                            
-                            if (data.type === 'point') {{
-                                const centerX = data.x * scaleX;
-                                const centerY = data.y * scaleY;
-                                const boxSize = 20;
-                                drawLeft = centerX - boxSize / 2;
-                                drawTop = centerY - boxSize / 2;
-                                drawWidth = boxSize;
-                                drawHeight = boxSize;
-                                box.style.setProperty('border-radius', '50%', 'important');
-                            }} else {{
-                                drawTop = data.topRatio * imgDisplayHeight;
-                                drawLeft = data.leftRatio * imgDisplayWidth;
-                                drawWidth = data.widthRatio * imgDisplayWidth;
-                                drawHeight = data.heightRatio * imgDisplayHeight;
-                                box.style.setProperty('border-radius', '0%', 'important');
-                            }}
-                            
-                            box.style.setProperty('top', drawTop + 'px', 'important');
-                            box.style.setProperty('left', drawLeft + 'px', 'important');
-                            box.style.setProperty('width', Math.max(10, drawWidth) + 'px', 'important');
-                            box.style.setProperty('height', Math.max(10, drawHeight) + 'px', 'important');
-                            box.style.setProperty('display', 'block', 'important');
-                            box.style.setProperty('border', '4px solid #ff0000', 'important');
-                            box.style.setProperty('background-color', 'rgba(255, 0, 0, 0.5)', 'important');
-                            box.style.setProperty('z-index', '100', 'important');
-                            box.style.setProperty('opacity', '1', 'important');
-                            
-                            // 라벨 설정 (screen_grouping.py와 동일)
-                            const labelTop = Math.max(0, drawTop - 10);
-                            const labelLeft = Math.max(0, drawLeft - 10);
-                            label.style.setProperty('top', labelTop + 'px', 'important');
-                            label.style.setProperty('left', labelLeft + 'px', 'important');
-                            label.style.setProperty('display', 'block', 'important');
-                            label.style.setProperty('position', 'absolute', 'important');
-                            label.style.setProperty('z-index', '20', 'important');
-                            label.style.setProperty('background', 'white', 'important');
-                            label.style.setProperty('color', 'red', 'important');
-                            label.style.setProperty('border', '1px solid red', 'important');
-                            label.style.setProperty('width', '10px', 'important');
-                            label.style.setProperty('height', '10px', 'important');
-                            label.style.setProperty('border-radius', '50%', 'important');
-                            label.style.setProperty('line-height', '10px', 'important');
-                            label.style.setProperty('text-align', 'center', 'important');
-                            label.style.setProperty('font-weight', 'bold', 'important');
-                            label.style.setProperty('font-size', '6px', 'important');
-                            label.style.setProperty('pointer-events', 'none', 'important');
-                        }});
-                    }}
-                    
-                    if (img.complete) {{
-                        setTimeout(adjustHighlights, 500);
-                    }} else {{
-                        img.addEventListener('load', function() {{
-                            setTimeout(adjustHighlights, 500);
-                        }});
-                    }}
-                    
-                    let attempts = 0;
-                    const checkInterval = setInterval(function() {{
-                        attempts++;
-                        const width = img.offsetWidth || img.getBoundingClientRect().width;
-                        if (width > 0 || attempts >= 50) {{
-                            clearInterval(checkInterval);
-                            adjustHighlights();
-                            setTimeout(adjustHighlights, 1000);
-                            setTimeout(adjustHighlights, 2000);
-                        }}
-                    }}, 200);
-                }})();
-                </script>
-                """
-                
-                # 전체 HTML 구성 (screen_grouping.py와 동일한 구조)
-                html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{
-            margin: 0 !important;
-            padding: 0 !important;
-            overflow: hidden !important;
-        }}
-        .container {{
-            width: 100% !important;
-            height: 100vh !important;
-            display: flex !important;
-            justify-content: center !important;
-            align-items: center !important;
-            overflow: hidden !important;
-        }}
-        .highlight-img {{
-            max-width: 100% !important;
-            max-height: 100vh !important;
-            width: auto !important;
-            height: auto !important;
-            object-fit: contain !important;
-            position: relative !important;
-            z-index: 1 !important;
-            display: block !important;
-        }}
-        .highlight-wrapper {{
-            position: relative !important;
-            display: inline-block !important;
-            max-width: 100% !important;
-            max-height: 100vh !important;
-        }}
-        .highlight-box {{
-            position: absolute !important;
-            border: 4px solid red !important;
-            background-color: rgba(255, 0, 0, 0.5) !important;
-            pointer-events: none !important;
-            box-sizing: border-box !important;
-            z-index: 10 !important;
-        }}
-        .highlight-label {{
-            position: absolute !important;
-            background: white !important;
-            color: red !important;
-            border: 1px solid red !important;
-            width: 10px !important;
-            height: 10px !important;
-            border-radius: 50% !important;
-            line-height: 10px !important;
-            text-align: center !important;
-            font-weight: bold !important;
-            font-size: 6px !important;
-            pointer-events: none !important;
-            z-index: 20 !important;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div id="{wrapper_id}" class="highlight-wrapper">
-            <img id="{img_id}" class="highlight-img"
-                 src="data:image/png;base64,{img_b64}">
-            {overlay_html}
-        </div>
-    </div>
-    {js_code}
-</body>
-</html>
-                """
-                
-                st.info(f"대표 이미지에 {len(bounds_data)}개의 클릭 위치가 표시됩니다.")
-                components.html(html, height=min(image_height + 100, 800), scrolling=False)
+                st.info(f"대표 이미지에 {len(boxes)}개의 클릭 위치가 표시됩니다.")
+                if zoom:
+                    # 보이는 타일만 받는 딥줌 뷰어 (하이라이트는 원본 px = 피라미드 레벨 0 좌표)
+                    coords_list = [action.coordinates.to_dict() for action in valid_actions]
+                    highlights = highlights_from_coordinates(coords_list, (image_width, image_height), (vp_w, vp_h), RED_STYLE)
+                    render_tiled(cluster.representative_image, highlights, style=RED_STYLE, height=800, key=f"tiles_{cluster.cluster_id}")
+                else:
+                    # 표시 크기 축소본 + 공용 overlay 컴포넌트 (screen_grouping.py와 같은 스타일)
+                    render_overlay(
+                        cluster.representative_image,
+                        boxes,
+                        stroke="#ff0000",
+                        fill="rgba(255, 0, 0, 0.5)",
+                        line_width=4,
+                        labels=True,
+                        label_color="red",
+                        label_fill="white",
+                        label_size=10,
+                        point_size=20,
+                        max_height=min(image_height + 100, 800),
+                        key=f"overlay_{cluster.cluster_id}",
+                    )
             else:
                 # 하이라이트할 액션이 없으면 일반 이미지만 표시
                 rep_img = Image.open(cluster.representative_image)
@@ -587,6 +398,14 @@ if st.session_state.get("analysis_complete", False):
         if click_actions:
             st.markdown("### 🖱️ 클릭 좌표 및 DOM 매칭")
             
+            # 클러스터 전체 클릭을 스냅샷별로 한 번에 매칭
+            dom_error = None
+            try:
+                dom_results = match_cluster_clicks(analyzer, click_actions)
+            except Exception as e:
+                dom_error = e
+                dom_results = [(False, None)] * len(click_actions)
+            
             for idx, action in enumerate(click_actions, 1):
                 with st.expander(f"클릭 #{idx} - Action ID: {action.action_id}, Sequence: {action.sequence}", expanded=False):
                     col1, col2 = st.columns([2, 1])
@@ -602,32 +421,25 @@ if st.session_state.get("analysis_complete", False):
                     with col2:
                         # 좌표 정보
                         st.markdown("**📍 좌표 정보**")
-                        coords = action.coordinates or {}
+                        coords = action.coordinates.to_dict() if action.coordinates else {}
                         if coords:
                             st.json(coords)
                         else:
                             st.info("좌표 정보 없음")
                         
-                        # 좌표 추출 (DOM 매칭에 필요)
-                        x = coords.get("pageX") or coords.get("clientX") or coords.get("x")
-                        y = coords.get("pageY") or coords.get("clientY") or coords.get("y")
+                        # 좌표 추출 (매칭 점수 계산에 필요)
+                        x, y = click_point(coords)
                         
-                        # DOM 매칭 시도
+                        # DOM 매칭 결과 (match_cluster_clicks에서 일괄 계산)
                         st.markdown("**🔍 DOM 매칭 결과**")
-                        dom_matched = None
+                        dom_attempted, dom_matched = dom_results[idx - 1]
                         dom_match_info = {}
                         
                         try:
-                            metadata = safe_parse_metadata(action.raw.get("metadata"))
-                            dom_snapshot = metadata.get("domSnapshot") if metadata else None
+                            if dom_error is not None:
+                                raise dom_error
                             
-                            if dom_snapshot and x is not None and y is not None:
-                                temp_action = action.raw.copy()
-                                if isinstance(temp_action.get("metadata"), str):
-                                    temp_action["metadata"] = metadata
-                                
-                                dom_matched = match_clicked_dom(temp_action, dom_snapshot)
-                                
+                            if dom_attempted:
                                 if dom_matched:
                                     dom_match_info = {
                                         "태그": dom_matched.get("tag", "N/A"),
@@ -11,7 +11,7 @@ print("=" * 100, flush=True)
 print("🧪 메뉴얼 에이전트 - 스크린샷 기반 화면 그룹핑 & 좌표/API 로직 검증 (test2)", flush=True)
 print("=" * 100, flush=True)
 
-json_path = 'data/actions/metadata_182.json'
+json_path = sys.argv[1] if len(sys.argv) > 1 else 'data/actions/metadata_182.json'
 print(f"  ▸ JSON 파일: {json_path}", flush=True)
 print(f"  ▸ pHash 임계값: 18", flush=True)
 print(f"  ▸ SSIM 임계값: 0.95", flush=True)